@@ -0,0 +1,105 @@
+"""
+목록 응답 직렬화 방식별 CPU 시간 비교 (DB 없이 실행)
+
+    python -m app.api.bench_serialization --rows 10000 --repeat 20
+
+- 같은 row dict(목록 SQL 결과와 같은 AppOut 모양) N개를 네 가지 방식으로 응답하는 route를 만들어 TestClient로 호출
+  1) model_per_row : [AppOut(**r) ...] 반환 + response_model (예전 list_apps_api, 검증 2번)
+  2) response_model: dict 그대로 반환 + response_model (FastAPI 검증 + jsonable_encoder + orjson)
+  3) adapter       : ListSerializer(AppListItem) (TypeAdapter 검증 + JSON 직렬화 1회)
+  4) trusted       : ListSerializer(AppListItem, trusted=True) (orjson.dumps 바로)
+- 요청 1회당 process CPU 시간(ms, TestClient의 HTTP 처리 포함)과 1) 대비 절감률 출력
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+
+from app.api.serializers import ListSerializer
+from app.schemas.apps import AppListItem, AppOut
+
+
+def make_rows(n: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "category_id": i % 12 + 1,
+            "app_key": f"app-{i:05d}",
+            "name": f"App {i}",
+            "summary": "사내 업무 자동화 도구" if i % 3 else None,
+            "description": None,
+            "icon": f"/api/static/images/app-{i}.png",
+            "manual": None,
+            "voc": None,
+            "app_kind": "native" if i % 2 else "web",
+            "web_launch_url": None if i % 2 else f"https://apps.example.com/{i}",
+            "is_active": 1,
+            "requires_app_approval": int(i % 5 == 0),
+            "latest_version_id": i * 3,
+            "created_by": 1,
+        }
+        for i in range(n)
+    ]
+
+
+def build_app(rows: list[dict]) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    adapter = ListSerializer(AppListItem)
+    trusted = ListSerializer(AppListItem, trusted=True)
+
+    @app.get("/model_per_row", response_model=list[AppOut])
+    async def model_per_row():
+        return [AppOut(**r) for r in rows]
+
+    @app.get("/response_model", response_model=list[AppListItem], response_model_exclude_unset=True)
+    async def response_model():
+        return rows
+
+    @app.get("/adapter", response_model=list[AppListItem])
+    async def adapter_route():
+        return adapter.response(rows)
+
+    @app.get("/trusted", response_model=list[AppListItem])
+    async def trusted_route():
+        return trusted.response(rows)
+
+    return app
+
+
+def run(rows: int, repeat: int) -> None:
+    client = TestClient(build_app(make_rows(rows)))
+    variants = ["model_per_row", "response_model", "adapter", "trusted"]
+
+    bodies = {}
+    for v in variants:
+        # warm-up (route/adapter 최초 호출 비용 제외) + 응답 동일성 확인
+        bodies[v] = client.get(f"/{v}").json()
+    assert all(bodies[v] == bodies["model_per_row"] for v in variants), "response bodies differ"
+
+    results = {}
+    for v in variants:
+        cpu = time.process_time()
+        for _ in range(repeat):
+            client.get(f"/{v}")
+        results[v] = (time.process_time() - cpu) / repeat * 1000
+
+    base = results["model_per_row"]
+    print(f"rows={rows} repeat={repeat}")
+    for v in variants:
+        saved = (1 - results[v] / base) * 100
+        print(f"  {v:<15} {results[v]:8.2f} ms/request   saved {saved:5.1f}%")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser()
+    p.add_argument("--rows", type=int, default=10000)
+    p.add_argument("--repeat", type=int, default=20)
+    args = p.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 from typing import AsyncGenerator, Optional, Callable
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.session import AsyncSessionLocal
-from app.services.user_service import get_user_by_knox_id
+from app.services.query_builder import ListQuery
+from app.services.user_service import get_user_by_knox_id_cached
+from app.utils.cursor import decode_cursor
 
 from typing import Optional
 from fastapi import Header
@@ -47,13 +49,13 @@ async def get_current_user(
 ) -> dict:
     """
     FastAPI dependency:
-    - knox_id로 users 조회
+    - knox_id로 users 조회 (TTL 캐시 우선, miss일 때만 DB)
     - 없으면 401
     - 비활성(is_active=0)이면 403
     반환 형태(서비스에서 dict로 받음):
       {id, knox_id, name, dept_name, role_id, role_name, role_rank, is_active}
     """
-    me = await get_user_by_knox_id(db, knox_id)
+    me = await get_user_by_knox_id_cached(db, knox_id)
     if not me:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown user")
     if int(me.get("is_active", 1)) != 1:
@@ -72,3 +74,28 @@ def require_min_role_rank(min_rank: int) -> Callable:
         return me
 
     return _checker
+
+
+def parse_cursor(cursor: str | None, datetime_sort: bool = False) -> tuple:
+    """목록 API ?cursor= 해석 (잘못된 토큰이면 400)"""
+    try:
+        return decode_cursor(cursor, datetime_sort=datetime_sort)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def list_fields(query: ListQuery) -> Callable:
+    """
+    목록 API ?fields= (SELECT 컬럼까지 줄임)
+    예: fields: tuple = Depends(list_fields(SQL_LIST_NOTICES))
+    - 없으면 목록 기본 필드, "*"면 전체, 모르는 필드면 400
+    """
+    description = f"쉼표 구분 필드, * = 전체 (가능: {', '.join(query.all_fields)})"
+
+    def _fields(fields: str | None = Query(default=None, description=description)) -> tuple[str, ...]:
+        try:
+            return query.fields_for(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return _fields
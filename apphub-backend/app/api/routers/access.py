@@ -2,26 +2,41 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, require_min_role_rank
-from app.schemas.access import AccessRowOut, AccessDecision
+from app.api.deps import get_db, get_current_user, list_fields, parse_cursor, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.schemas.access import AccessRowListItem, AccessDecision
+from app.utils.cursor import cursor_headers
 from app.services.access_service import (
+    SQL_LIST_APP, SQL_LIST_CAT,
     list_category_access, get_category_access, decide_category_access, delete_category_access,
     list_app_access, get_app_access, decide_app_access, delete_app_access,
 )
 
 router = APIRouter(prefix="/access")
 
+# 목록 row는 ListQuery 컬럼 그대로 -> orjson 직렬화 1회 (requested_at 등 datetime은 ISO 문자열)
+_ACCESS_LIST = ListSerializer(AccessRowListItem, trusted=True)
+
 
 # ---- Category Access (관리용) ----
-@router.get("/category", response_model=list[AccessRowOut], dependencies=[Depends(require_min_role_rank(40))])
+@router.get(
+    "/category",
+    response_model=list[AccessRowListItem],
+    dependencies=[Depends(require_min_role_rank(40))],
+)
 async def list_category_access_api(
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor (있으면 offset 무시)"),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST_CAT)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
-    rows = await list_category_access(db, limit=limit, offset=offset)
-    return [AccessRowOut(**r) for r in rows]
+    _, cursor_id = parse_cursor(cursor)
+    rows = await list_category_access(
+        db, limit=limit, offset=0 if cursor_id is not None else offset, cursor_id=cursor_id, fields=fields
+    )
+    return _ACCESS_LIST.response(rows, headers=cursor_headers(rows, limit))
 
 
 @router.put("/category/{row_id}", response_model=dict, dependencies=[Depends(require_min_role_rank(40))])
@@ -47,15 +62,24 @@ async def delete_category_access_api(row_id: int, db: AsyncSession = Depends(get
 
 
 # ---- App Access (관리용) ----
-@router.get("/app", response_model=list[AccessRowOut], dependencies=[Depends(require_min_role_rank(40))])
+@router.get(
+    "/app",
+    response_model=list[AccessRowListItem],
+    dependencies=[Depends(require_min_role_rank(40))],
+)
 async def list_app_access_api(
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor (있으면 offset 무시)"),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST_APP)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
-    rows = await list_app_access(db, limit=limit, offset=offset)
-    return [AccessRowOut(**r) for r in rows]
+    _, cursor_id = parse_cursor(cursor)
+    rows = await list_app_access(
+        db, limit=limit, offset=0 if cursor_id is not None else offset, cursor_id=cursor_id, fields=fields
+    )
+    return _ACCESS_LIST.response(rows, headers=cursor_headers(rows, limit))
 
 
 @router.put("/app/{row_id}", response_model=dict, dependencies=[Depends(require_min_role_rank(40))])
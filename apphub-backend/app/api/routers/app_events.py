@@ -1,32 +1,100 @@
 from __future__ import annotations
 
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_knox_id_optional
-from app.services.user_service import get_user_by_knox_id
+from app.core.config import settings
+from app.services.db_helpers import is_duplicate_key
+from app.services.user_service import cached_user_id, resolve_user_id
 from app.services.app_event_service import (
+    cached_session_exists,
     create_run_session,
     end_run_session,
-    get_run_session,
+    session_exists,
+    remember_session,
+    forget_session,
     add_action_event,
+    add_action_events_bulk,
+    find_action_by_idempotency_key,
+    get_existing_action_keys,
+    get_existing_session_ids,
+    idempotent_result,
+    idempotent_session_id,
+    new_session_id,
+    remember_idempotent,
+)
+from app.services.telemetry_buffer import (
+    KIND_ACTION,
+    KIND_END,
+    KIND_SESSION,
+    TelemetryBackpressure,
+    telemetry_buffer,
 )
+from app.services.telemetry_spool import telemetry_spool
+from app.services.realtime_metrics import realtime_metrics
 from app.schemas.app_events import (
     RunSessionStart,
     RunSessionStartResponse,
     RunSessionEnd,
     ActionEventCreate,
     ActionEventResponse,
+    ActionEventBatchItem,
+    ActionEventBatchResult,
+    ActionEventBatchResponse,
 )
 
 router = APIRouter(prefix="/app-events")
 
 
+_action_adapter = TypeAdapter(ActionEventCreate)
+_batch_item_adapter = TypeAdapter(ActionEventBatchItem)
+
+
 def _now_utc() -> datetime:
     return datetime.utcnow()
 
 
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in e.errors()
+    )
+
+
+async def _session_exists(db: AsyncSession, session_id: str) -> bool:
+    # write-behind 모드에서는 아직 flush 안 된 세션도 존재하는 것으로 본다
+    if telemetry_buffer.enabled and telemetry_buffer.is_pending_session(session_id):
+        return True
+    # DB 장애 중(spool)에는 캐시에서 없다고 확인된 id만 거절 (나머지는 replay 때 확인)
+    return await telemetry_spool.read_or_fallback(
+        db,
+        lambda: session_exists(db, session_id),
+        lambda: cached_session_exists(session_id) is not False,
+    )
+
+
+async def _enqueue(kind: str, row: dict) -> None:
+    await _enqueue_many([(kind, row)])
+
+
+async def _enqueue_many(items: list[tuple[str, dict]]) -> None:
+    # 전부 들어가거나 하나도 안 들어감 (503 후 재시도해도 중복 없음)
+    try:
+        await telemetry_buffer.submit_many(items)
+    except TelemetryBackpressure:
+        raise HTTPException(
+            status_code=503,
+            detail="Telemetry queue is full, retry later",
+            headers={"Retry-After": "1"},
+        )
+
+
 @router.post("/sessions/start", response_model=RunSessionStartResponse)
 async def start_session(
     body: RunSessionStart,
@@ -37,28 +105,74 @@ async def start_session(
     # knox_id 우선순위: 헤더 > body
     knox_id = knox_header or body.knox_id
 
+    # 재시도: 같은 client(app_id, knox_id)가 같은 idempotency_key로 이미 만든 세션이면 DB 접근 없이 그 id 반환
+    idem = ("session", body.app_id, knox_id, body.idempotency_key) if body.idempotency_key else None
+    if idem:
+        prev = idempotent_result(idem)
+        if prev is not None:
+            return RunSessionStartResponse(session_id=prev, duplicate=True)
+
     user_id = None
     knox_id_raw = None
     if knox_id:
-        u = await get_user_by_knox_id(db, knox_id)
-        if u:
-            user_id = u["id"]
-        else:
+        user_id = await telemetry_spool.read_or_fallback(
+            db,
+            lambda: resolve_user_id(db, knox_id),
+            lambda: cached_user_id(knox_id),
+        )
+        if user_id is None:
             knox_id_raw = knox_id  # 매핑 실패한 값은 raw로 저장
 
     started_at = body.started_at or _now_utc()
     client_ip = body.client_ip or (request.client.host if request.client else None)
 
-    session_id = await create_run_session(
-        db,
-        user_id=user_id,
-        knox_id_raw=knox_id_raw,
-        app_id=body.app_id,
-        app_version=body.app_version,
-        started_at=started_at,
-        client_ip=client_ip,
-    )
-    return RunSessionStartResponse(session_id=session_id)
+    row = {
+        # 키가 있으면 (app_id, knox_id, key)로 정해지는 id -> 창 밖 재시도/다른 프로세스도 같은 행
+        "id": idempotent_session_id(body.app_id, knox_id, body.idempotency_key) if idem else new_session_id(),
+        "user_id": user_id,
+        "knox_id_raw": knox_id_raw,
+        "app_id": body.app_id,
+        "app_version": body.app_version,
+        "started_at": started_at,
+        "client_ip": client_ip,
+        "idempotency_key": body.idempotency_key,
+    }
+    # 실시간 지표는 DB에 쓴 쪽이 commit 후 기록 (write-behind flush / spool replay는 각자)
+    written = False
+    if telemetry_buffer.enabled:
+        await _enqueue(KIND_SESSION, row)
+    else:
+        try:
+            _, spooled = await telemetry_spool.run_or_spool(
+                db,
+                [(KIND_SESSION, row)],
+                lambda: create_run_session(
+                    db,
+                    session_id=row["id"],
+                    user_id=user_id,
+                    knox_id_raw=knox_id_raw,
+                    app_id=body.app_id,
+                    app_version=body.app_version,
+                    started_at=started_at,
+                    client_ip=client_ip,
+                    idempotency_key=body.idempotency_key,
+                ),
+            )
+        except IntegrityError as e:
+            if not (idem and is_duplicate_key(e)):
+                raise
+            # 창에 없던 재시도 (오래됐거나 다른 프로세스) -> 같은 키면 같은 id이므로 PK 중복 = 이미 만든 세션
+            await db.rollback()
+            remember_session(row["id"])
+            remember_idempotent(idem, row["id"])
+            return RunSessionStartResponse(session_id=row["id"], duplicate=True)
+        written = not spooled
+    remember_session(row["id"])
+    if idem:
+        remember_idempotent(idem, row["id"])
+    if written:
+        realtime_metrics.record_session_start(row["id"], body.app_id, user_id, started_at)
+    return RunSessionStartResponse(session_id=row["id"])
 
 
 @router.post("/sessions/{session_id}/end", response_model=dict)
@@ -68,18 +182,29 @@ async def end_session(
     db: AsyncSession = Depends(get_db),
 ):
     # 존재 확인
-    sess = await get_run_session(db, session_id)
-    if not sess:
+    if not await _session_exists(db, session_id):
         raise HTTPException(status_code=404, detail="Session not found")
 
     ended_at = body.ended_at or _now_utc()
-    await end_run_session(
+    row = {"id": session_id, "ended_at": ended_at, "exit_code": body.exit_code, "end_reason": body.end_reason}
+    if telemetry_buffer.enabled:
+        await _enqueue(KIND_END, row)
+        return {"ok": True, "queued": True}
+
+    _, spooled = await telemetry_spool.run_or_spool(
         db,
-        session_id=session_id,
-        ended_at=ended_at,
-        exit_code=body.exit_code,
-        end_reason=body.end_reason,
+        [(KIND_END, row)],
+        lambda: end_run_session(
+            db,
+            session_id=session_id,
+            ended_at=ended_at,
+            exit_code=body.exit_code,
+            end_reason=body.end_reason,
+        ),
     )
+    if spooled:
+        return {"ok": True, "queued": True}
+    realtime_metrics.record_session_end(session_id, ended_at)
     return {"ok": True}
 
 
@@ -89,22 +214,192 @@ async def post_action(
     body: ActionEventCreate,
     db: AsyncSession = Depends(get_db),
 ):
+    # 재시도: 같은 세션 + idempotency_key로 이미 받은 action이면 no-op
+    idem = ("action", session_id, body.idempotency_key) if body.idempotency_key else None
+    if idem:
+        prev = idempotent_result(idem)
+        if prev is not None:
+            return ActionEventResponse(action_event_id=prev or None, duplicate=True)
+
     # 존재 확인
-    sess = await get_run_session(db, session_id)
-    if not sess:
+    if not await _session_exists(db, session_id):
         raise HTTPException(status_code=404, detail="Session not found")
 
     occurred_at = body.occurred_at or _now_utc()
+    row = body.model_dump()
+    row["session_id"] = session_id
+    row["occurred_at"] = occurred_at
+    if telemetry_buffer.enabled:
+        await _enqueue(KIND_ACTION, row)
+        if idem:
+            remember_idempotent(idem, 0)  # 0: 저장 대기 중 (id 모름)
+        return ActionEventResponse(queued=True)
+
+    try:
+        new_id, spooled = await telemetry_spool.run_or_spool(
+            db,
+            [(KIND_ACTION, row)],
+            lambda: add_action_event(
+                db,
+                session_id=session_id,
+                occurred_at=occurred_at,
+                action_type=body.action_type,
+                action_name=body.action_name,
+                description=body.description,
+                duration_ms=body.duration_ms,
+                severity=body.severity,
+                meta_json=body.meta_json,
+                idempotency_key=body.idempotency_key,
+            ),
+        )
+    except IntegrityError as e:
+        await db.rollback()
+        if idem and is_duplicate_key(e):
+            prev = await find_action_by_idempotency_key(db, session_id, body.idempotency_key)
+            remember_idempotent(idem, prev or 0)
+            return ActionEventResponse(action_event_id=prev, duplicate=True)
+        # 캐시에는 있었지만 그 사이 삭제된 세션 (FK 위반, 003 파티셔닝 전에만 발생)
+        forget_session(session_id)
+        raise HTTPException(status_code=404, detail="Session not found")
+    if idem:
+        remember_idempotent(idem, new_id or 0)
+    if spooled:
+        return ActionEventResponse(queued=True)
+    realtime_metrics.record_actions([row])
+    return ActionEventResponse(action_event_id=new_id)
+
+
+def _split_by_session(
+    rows: list[tuple[int, dict]],
+    existing: set[str],
+) -> tuple[list[tuple[int, dict]], list[ActionEventBatchResult]]:
+    ok = [(idx, row) for idx, row in rows if row["session_id"] in existing]
+    missing = [
+        ActionEventBatchResult(index=idx, ok=False, error="Session not found")
+        for idx, row in rows
+        if row["session_id"] not in existing
+    ]
+    return ok, missing
+
+
+async def _ingest_action_batch(
+    db: AsyncSession,
+    items: list[dict[str, Any]],
+    session_id: str | None,
+) -> ActionEventBatchResponse:
+    """
+    batch 공통 처리
+    1) 항목별 pydantic 검증 (실패 항목만 reject)
+    2) idempotency_key 재시도는 메모리 창에서 걸러서 duplicate 처리
+    3) 세션 존재 확인 SELECT 1회 (IN, 캐시된 세션은 제외)
+    4) 유효 항목 multi-row INSERT 1회 + commit 1회
+    """
+    if len(items) > settings.APP_EVENTS_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many events in one batch (max {settings.APP_EVENTS_BATCH_MAX})",
+        )
+
+    now = _now_utc()
+    adapter = _action_adapter if session_id else _batch_item_adapter
+    results: list[ActionEventBatchResult] = []
+    valid: list[tuple[int, dict]] = []
+    seen_keys: set[tuple] = set()
 
-    new_id = await add_action_event(
+    for idx, raw in enumerate(items):
+        try:
+            ev = adapter.validate_python(raw)
+        except ValidationError as e:
+            results.append(ActionEventBatchResult(index=idx, ok=False, error=_validation_message(e)))
+            continue
+        row = ev.model_dump()
+        row["session_id"] = session_id or row["session_id"]
+        row["occurred_at"] = row["occurred_at"] or now
+        if row["idempotency_key"]:
+            idem = ("action", row["session_id"], row["idempotency_key"])
+            if idem in seen_keys or idempotent_result(idem) is not None:
+                results.append(ActionEventBatchResult(index=idx, ok=True, duplicate=True))
+                continue
+            seen_keys.add(idem)
+        valid.append((idx, row))
+
+    ids = {row["session_id"] for _, row in valid}
+    pending = set()
+    if telemetry_buffer.enabled:
+        pending = {sid for sid in ids if telemetry_buffer.is_pending_session(sid)}
+    existing = pending | await telemetry_spool.read_or_fallback(
         db,
-        session_id=session_id,
-        occurred_at=occurred_at,
-        action_type=body.action_type,
-        action_name=body.action_name,
-        description=body.description,
-        duration_ms=body.duration_ms,
-        severity=body.severity,
-        meta_json=body.meta_json,
+        lambda: get_existing_session_ids(db, ids - pending),
+        lambda: {sid for sid in ids if cached_session_exists(sid) is not False},
     )
-    return ActionEventResponse(action_event_id=new_id)
+    to_insert, not_inserted = _split_by_session(valid, existing)
+
+    async def insert_bulk() -> tuple[list[tuple[int, dict]], list[ActionEventBatchResult]]:
+        try:
+            await add_action_events_bulk(db, [row for _, row in to_insert])
+            return to_insert, []
+        except IntegrityError:
+            # FK 위반(그 사이 삭제된 세션, 003 파티셔닝 전에만) 또는 창에 없던 idempotency_key 중복
+            # -> 캐시 없이 세션/키를 다시 확인 후 1회 재시도
+            await db.rollback()
+            alive = await get_existing_session_ids(
+                db, {row["session_id"] for _, row in to_insert}, use_cache=False
+            )
+            inserted, skipped = _split_by_session(to_insert, alive)
+            stored = await get_existing_action_keys(
+                db, {(row["session_id"], row["idempotency_key"]) for _, row in inserted if row["idempotency_key"]}
+            )
+            skipped += [
+                ActionEventBatchResult(index=idx, ok=True, duplicate=True)
+                for idx, row in inserted
+                if (row["session_id"], row["idempotency_key"]) in stored
+            ]
+            inserted = [(idx, row) for idx, row in inserted if (row["session_id"], row["idempotency_key"]) not in stored]
+            await add_action_events_bulk(db, [row for _, row in inserted])
+            return inserted, skipped
+
+    queued = telemetry_buffer.enabled
+    if queued:
+        await _enqueue_many([(KIND_ACTION, row) for _, row in to_insert])
+    else:
+        written, spooled = await telemetry_spool.run_or_spool(
+            db, [(KIND_ACTION, row) for _, row in to_insert], insert_bulk
+        )
+        if spooled:
+            queued = True
+        else:
+            to_insert, skipped = written
+            not_inserted += skipped
+            realtime_metrics.record_actions([row for _, row in to_insert])
+
+    for _, row in to_insert:
+        if row["idempotency_key"]:
+            remember_idempotent(("action", row["session_id"], row["idempotency_key"]), 0)
+
+    results += not_inserted
+    results += [ActionEventBatchResult(index=idx, ok=True) for idx, _ in to_insert]
+    results.sort(key=lambda r: r.index)
+    return ActionEventBatchResponse(
+        accepted=len(to_insert),
+        rejected=sum(1 for r in results if not r.ok),
+        queued=queued,
+        results=results,
+    )
+
+
+@router.post("/sessions/{session_id}/actions/batch", response_model=ActionEventBatchResponse)
+async def post_actions_batch(
+    session_id: str,
+    body: list[dict[str, Any]] = Body(..., description="ActionEventCreate 배열"),
+    db: AsyncSession = Depends(get_db),
+):
+    # 한 세션의 action 여러 건 (항목별 결과 반환, 잘못된 항목이 있어도 나머지는 저장)
+    return await _ingest_action_batch(db, body, session_id=session_id)
+
+
+@router.post("/actions/batch", response_model=ActionEventBatchResponse)
+async def post_actions_batch_mixed(
+    body: list[dict[str, Any]] = Body(..., description="ActionEventCreate + session_id 배열 (세션 혼합 가능)"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await _ingest_action_batch(db, body, session_id=None)
@@ -1,43 +1,93 @@
 # app/api/routers/app_events_admin.py
 from __future__ import annotations
 
+from datetime import date
 from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
-from app.api.deps import get_current_user, get_db, require_min_role_rank
-from app.schemas.events import AppActionEventOut, AppRunSessionOut, AppEventUpdate
+from app.api.deps import get_current_user, get_db, list_fields, parse_cursor, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.schemas.events import (
+    AppActionEventListItem,
+    AppActionEventOut,
+    AppEventUpdate,
+    AppRunSessionListItem,
+    AppRunSessionOut,
+)
+from app.core.config import settings
+from app.utils.cursor import cursor_headers
+from app.utils.export import MEDIA_TYPES, ExportFormat, encode_export
 from app.services.app_event_admin_service import (
+    ACTION_EXPORT_COLUMNS,
+    SESSION_EXPORT_COLUMNS,
+    SQL_LIST_ACTION_EVENTS,
+    SQL_LIST_RUN_SESSIONS,
+    ExportSlot,
+    acquire_export_slot,
     delete_action_event,
     delete_run_session,
     get_action_event,
     get_run_session,
     list_action_events,
     list_run_sessions,
+    stream_action_events,
+    stream_run_sessions,
     update_action_event,
     update_run_session,
 )
 
 router = APIRouter(prefix="/app-events")
 
+# 목록 row는 서비스에서 schema 모양으로 변환 완료 (session id 문자열, meta_json 객체) -> orjson 직렬화 1회
+_SESSION_LIST = ListSerializer(AppRunSessionListItem, trusted=True)
+_ACTION_LIST = ListSerializer(AppActionEventListItem, trusted=True)
+
+
+def _export_response(
+    chunks, fmt: ExportFormat, columns: list[str], gzip: bool, name: str, slot: ExportSlot
+) -> StreamingResponse:
+    # gzip=true면 Content-Encoding이 아니라 .gz 파일로 내려줌 (브라우저/프록시가 풀지 않고 그대로 저장)
+    filename = f"{name}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        encode_export(chunks, fmt, columns, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        # body 생성기가 한 번도 실행되지 않고 끝난 경우(전송 전 연결 끊김) slot 해제
+        background=BackgroundTask(slot.release),
+    )
+
+
+def _export_slot() -> ExportSlot:
+    # 응답 헤더를 보내기 전에 자리 확보 (꽉 찼으면 바로 429, body 안에서 기다리지 않음)
+    slot = acquire_export_slot()
+    if slot is None:
+        raise HTTPException(status_code=429, detail="Too many exports in progress")
+    return slot
+
 
 # -------------------------
 # Run sessions (app_run_sessions)
 # -------------------------
-@router.get("/sessions", response_model=list[AppRunSessionOut])
+@router.get("/sessions", response_model=list[AppRunSessionListItem])
 async def list_sessions_api(
     app_id: int | None = Query(default=None),
     user_id: int | None = Query(default=None),
     knox_id_raw: str | None = Query(default=None),
-    date_from: str | None = Query(default=None, description="YYYY-MM-DD"),
-    date_to: str | None = Query(default=None, description="YYYY-MM-DD"),
+    date_from: date | None = Query(default=None, description="YYYY-MM-DD"),
+    date_to: date | None = Query(default=None, description="YYYY-MM-DD (미포함)"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor (있으면 offset 무시)"),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST_RUN_SESSIONS)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
+    cursor_ts, cursor_id = parse_cursor(cursor, datetime_sort=True)
     rows = await list_run_sessions(
         db,
         app_id=app_id,
@@ -46,9 +96,36 @@ async def list_sessions_api(
         date_from=date_from,
         date_to=date_to,
         limit=limit,
-        offset=offset,
+        offset=0 if cursor_id is not None else offset,
+        cursor_ts=cursor_ts,
+        cursor_id=cursor_id,
+        fields=fields,
     )
-    return [AppRunSessionOut(**r) for r in rows]
+    return _SESSION_LIST.response(rows, headers=cursor_headers(rows, limit, sort_key="started_at"))
+
+
+@router.get("/sessions/export", dependencies=[Depends(require_min_role_rank(40))])
+async def export_sessions_api(
+    app_id: int | None = Query(default=None),
+    user_id: int | None = Query(default=None),
+    knox_id_raw: str | None = Query(default=None),
+    date_from: date | None = Query(default=None, description="YYYY-MM-DD"),
+    date_to: date | None = Query(default=None, description="YYYY-MM-DD (미포함)"),
+    format: ExportFormat = Query(default="ndjson"),
+    gzip: bool = Query(default=False),
+):
+    # 목록과 같은 필터, 페이지 없이 전체를 chunk 단위로 스트리밍
+    slot = _export_slot()
+    chunks = stream_run_sessions(
+        app_id=app_id,
+        user_id=user_id,
+        knox_id_raw=knox_id_raw,
+        date_from=date_from,
+        date_to=date_to,
+        chunk_rows=settings.EXPORT_CHUNK_ROWS,
+        slot=slot,
+    )
+    return _export_response(chunks, format, SESSION_EXPORT_COLUMNS, gzip, "run_sessions", slot)
 
 
 @router.get("/sessions/{session_id}", response_model=AppRunSessionOut)
@@ -116,19 +193,22 @@ class AppActionUpdate(BaseModel):
     meta_json: dict[str, Any] | None = None
 
 
-@router.get("/actions", response_model=list[AppActionEventOut])
+@router.get("/actions", response_model=list[AppActionEventListItem])
 async def list_actions_api(
     session_id: str | None = Query(default=None),
     app_id: int | None = Query(default=None),
     action_type: str | None = Query(default=None),
     severity: str | None = Query(default=None, description="info|warn|error"),
-    date_from: str | None = Query(default=None, description="YYYY-MM-DD"),
-    date_to: str | None = Query(default=None, description="YYYY-MM-DD"),
+    date_from: date | None = Query(default=None, description="YYYY-MM-DD"),
+    date_to: date | None = Query(default=None, description="YYYY-MM-DD (미포함)"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor (있으면 offset 무시)"),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST_ACTION_EVENTS)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
+    cursor_ts, cursor_id = parse_cursor(cursor, datetime_sort=True)
     rows = await list_action_events(
         db,
         session_id=session_id,
@@ -138,9 +218,37 @@ async def list_actions_api(
         date_from=date_from,
         date_to=date_to,
         limit=limit,
-        offset=offset,
+        offset=0 if cursor_id is not None else offset,
+        cursor_ts=cursor_ts,
+        cursor_id=cursor_id,
+        fields=fields,
+    )
+    return _ACTION_LIST.response(rows, headers=cursor_headers(rows, limit, sort_key="occurred_at"))
+
+
+@router.get("/actions/export", dependencies=[Depends(require_min_role_rank(40))])
+async def export_actions_api(
+    session_id: str | None = Query(default=None),
+    app_id: int | None = Query(default=None),
+    action_type: str | None = Query(default=None),
+    severity: str | None = Query(default=None, description="info|warn|error"),
+    date_from: date | None = Query(default=None, description="YYYY-MM-DD"),
+    date_to: date | None = Query(default=None, description="YYYY-MM-DD (미포함)"),
+    format: ExportFormat = Query(default="ndjson"),
+    gzip: bool = Query(default=False),
+):
+    slot = _export_slot()
+    chunks = stream_action_events(
+        session_id=session_id,
+        app_id=app_id,
+        action_type=action_type,
+        severity=severity,
+        date_from=date_from,
+        date_to=date_to,
+        chunk_rows=settings.EXPORT_CHUNK_ROWS,
+        slot=slot,
     )
-    return [AppActionEventOut(**r) for r in rows]
+    return _export_response(chunks, format, ACTION_EXPORT_COLUMNS, gzip, "action_events", slot)
 
 
 @router.get("/actions/{event_id}", response_model=AppActionEventOut)
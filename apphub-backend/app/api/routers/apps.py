@@ -2,17 +2,25 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, require_min_role_rank
-from app.schemas.apps import AppOut, AppCreate, AppUpdate
-from app.services.app_service import list_apps, get_app, create_app, update_app, delete_app
+from app.api.deps import get_db, get_current_user, list_fields, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.schemas.apps import AppListItem, AppOut, AppCreate, AppUpdate
+from app.services.app_service import SQL_LIST, list_apps, get_app, create_app, update_app, delete_app
 
 router = APIRouter(prefix="/apps")
 
+# 목록 row는 ListQuery 컬럼 그대로 (AppOut 모양) -> orjson 직렬화 1회
+_APP_LIST = ListSerializer(AppListItem, trusted=True)
 
-@router.get("/", response_model=list[AppOut])
-async def list_apps_api(db: AsyncSession = Depends(get_db), _me: dict = Depends(get_current_user)):
-    rows = await list_apps(db, active_only=False)
-    return [AppOut(**r) for r in rows]
+
+@router.get("/", response_model=list[AppListItem])
+async def list_apps_api(
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST)),
+    db: AsyncSession = Depends(get_db),
+    _me: dict = Depends(get_current_user),
+):
+    # 기본 필드에 description 없음 (상세는 GET /apps/{id} 또는 ?fields=*)
+    return _APP_LIST.response(await list_apps(db, active_only=False, fields=fields))
 
 
 @router.get("/{app_id}", response_model=AppOut)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, require_min_role_rank
 from app.schemas.auth import MeResponse
+from app.services.user_service import invalidate_user_cache, user_cache_stats
 
 router = APIRouter(prefix="/auth")
 
@@ -16,3 +17,16 @@ async def me(current=Depends(get_current_user)):
         role_name=current["role_name"],
         role_rank=current["role_rank"],
     )
+
+
+@router.get("/cache", response_model=dict, dependencies=[Depends(require_min_role_rank(50))])
+async def user_cache_stats_api():
+    # 사용자 캐시 hit/miss 카운터 (Admin)
+    return user_cache_stats()
+
+
+@router.delete("/cache", response_model=dict, dependencies=[Depends(require_min_role_rank(50))])
+async def invalidate_user_cache_api(knox_id: str | None = Query(default=None)):
+    # DB에서 role / is_active를 직접 바꾼 경우 즉시 반영용 (knox_id 없으면 전체)
+    invalidate_user_cache(knox_id)
+    return {"ok": True}
@@ -1,24 +1,122 @@
 from __future__ import annotations
-from fastapi import APIRouter, Depends, HTTPException, Query
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, require_min_role_rank
-from app.schemas.events import HubEventOut, HubEventUpdate
-from app.services.hub_event_service import list_hub_events, get_hub_event, update_hub_event, delete_hub_event
+from app.api.deps import get_db, get_current_user, get_knox_id_optional, list_fields, parse_cursor, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.core.config import settings
+from app.schemas.events import (
+    HubEventBeacon,
+    HubEventBeaconResponse,
+    HubEventCreate,
+    HubEventListItem,
+    HubEventOut,
+    HubEventUpdate,
+)
+from app.services.hub_event_service import (
+    SQL_LIST,
+    add_hub_events_bulk,
+    list_hub_events,
+    get_hub_event,
+    update_hub_event,
+    delete_hub_event,
+)
+from app.services.realtime_metrics import realtime_metrics
+from app.services.user_service import resolve_user_id
+from app.utils.cursor import cursor_headers
 
 router = APIRouter(prefix="/hub-events")
 
+_event_adapter = TypeAdapter(HubEventCreate)
+# 목록 row는 서비스에서 schema 모양으로 변환 완료 (meta_json 객체) -> orjson 직렬화 1회
+_HUB_EVENT_LIST = ListSerializer(HubEventListItem, trusted=True)
 
-@router.get("/", response_model=list[HubEventOut], dependencies=[Depends(require_min_role_rank(40))])
+
+async def _read_beacon_body(request: Request) -> bytes:
+    # 인증 전 공개 endpoint: 전체를 메모리에 읽기 전에 크기 제한
+    # - Content-Length가 크면 바로 413, 없거나(chunked) 거짓이어도 읽은 누적이 넘는 순간 413
+    limit = settings.HUB_EVENTS_BEACON_MAX_BYTES
+    declared = request.headers.get("content-length")
+    if declared is not None:
+        try:
+            if int(declared) > limit:
+                raise HTTPException(413, "Beacon payload too large")
+        except ValueError:
+            raise HTTPException(400, "Invalid Content-Length")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(413, "Beacon payload too large")
+    return bytes(body)
+
+
+@router.post("/beacon", response_model=HubEventBeaconResponse, status_code=202)
+async def hub_events_beacon_api(
+    request: Request,
+    knox_id_header: str | None = Depends(get_knox_id_optional),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    프론트 이벤트(page_open/search/filter_change ...) batch 수집
+    - navigator.sendBeacon은 Content-Type이 text/plain 등이라 body를 직접 JSON 파싱
+      (text/plain이면 CORS preflight도 없음)
+    - body: {"knox_id": "...", "events": [HubEventCreate, ...]} 또는 events 배열만 (x-knox-id 헤더)
+    - 사용자 조회 1회(knox_id 캐시) + multi-row INSERT 1회, 잘못된 항목은 버리고 개수만 응답
+    """
+    raw = await _read_beacon_body(request)
+    try:
+        data = orjson.loads(raw)
+        beacon = HubEventBeacon(events=data) if isinstance(data, list) else HubEventBeacon.model_validate(data)
+    except (orjson.JSONDecodeError, ValidationError):
+        raise HTTPException(400, "Invalid beacon payload")
+    if len(beacon.events) > settings.HUB_EVENTS_BATCH_MAX:
+        raise HTTPException(413, f"Too many events in one beacon (max {settings.HUB_EVENTS_BATCH_MAX})")
+
+    knox_id = beacon.knox_id or knox_id_header
+    if not knox_id:
+        raise HTTPException(401, "Missing knox_id")
+    user_id = await resolve_user_id(db, knox_id)
+    if not user_id:
+        raise HTTPException(401, "Unknown user")
+
+    events = []
+    for item in beacon.events:
+        try:
+            events.append(_event_adapter.validate_python(item).model_dump())
+        except ValidationError:
+            continue
+    accepted = await add_hub_events_bulk(db, user_id, events)
+    realtime_metrics.record_hub_events(user_id, events)
+    return HubEventBeaconResponse(accepted=accepted, rejected=len(beacon.events) - accepted)
+
+
+@router.get(
+    "/",
+    response_model=list[HubEventListItem],
+    dependencies=[Depends(require_min_role_rank(40))],
+)
 async def list_hub_events_api(
     user_id: int | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor (있으면 offset 무시)"),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
-    rows = await list_hub_events(db, user_id=user_id, limit=limit, offset=offset)
-    return [HubEventOut(**r) for r in rows]
+    _, cursor_id = parse_cursor(cursor)
+    rows = await list_hub_events(
+        db,
+        user_id=user_id,
+        limit=limit,
+        offset=0 if cursor_id is not None else offset,
+        cursor_id=cursor_id,
+        fields=fields,
+    )
+    return _HUB_EVENT_LIST.response(rows, headers=cursor_headers(rows, limit))
 
 
 @router.get("/{event_id}", response_model=HubEventOut, dependencies=[Depends(require_min_role_rank(40))])
@@ -2,23 +2,31 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, require_min_role_rank
-from app.schemas.jobs import JobOut, JobCreate, JobUpdate
-from app.services.job_service import list_jobs, get_job, create_job, update_job, delete_job
+from app.api.deps import get_db, get_current_user, list_fields, parse_cursor, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.schemas.jobs import JobListItem, JobOut, JobCreate, JobUpdate
+from app.services.job_service import SQL_LIST, list_jobs, get_job, create_job, update_job, delete_job
+from app.utils.cursor import cursor_headers
 
 router = APIRouter(prefix="/jobs")
 
+# 목록 row는 ListQuery 컬럼 그대로 (JobOut 모양) -> orjson 직렬화 1회
+_JOB_LIST = ListSerializer(JobListItem, trusted=True)
 
-@router.get("/", response_model=list[JobOut])
+
+@router.get("/", response_model=list[JobListItem])
 async def list_jobs_api(
     user_id: int | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="이전 응답의 X-Next-Cursor (있으면 offset 무시)"),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
-    rows = await list_jobs(db, user_id=user_id, limit=limit, offset=offset)
-    return [JobOut(**r) for r in rows]
+    _, cursor_id = parse_cursor(cursor)
+    rows = await list_jobs(db, user_id=user_id, limit=limit, offset=0 if cursor_id is not None else offset, cursor_id=cursor_id, fields=fields)
+    return _JOB_LIST.response(rows, headers=cursor_headers(rows, limit))
 
 
 @router.get("/{job_id}", response_model=JobOut)
@@ -1,16 +1,206 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.core.config import settings
+from app.core.metrics import metrics
 from app.core.security import require
-from app.schemas.metrics import BatchRunRequest
-from app.services.metrics_service import run_daily_batch
+from app.db.profiler import sql_profiler
+from app.schemas.metrics import (
+    AppSeriesPoint,
+    AppUniquesPoint,
+    BackfillRequest,
+    BatchRunRequest,
+    Granularity,
+    HubSeriesPoint,
+    UniquesGranularity,
+    UniquesPoint,
+)
+from app.services.job_service import create_job
+from app.services.batch_scheduler import BatchLockBusy, list_batch_runs, run_daily_metrics
+from app.services.metrics_service import (
+    backfill_parallelism,
+    get_app_series,
+    get_app_uniques,
+    get_hub_series,
+    get_hub_uniques,
+    run_daily_backfill,
+)
+from app.services.query_builder import explain_list_queries
+from app.services.realtime_metrics import realtime_metrics
+from app.services.partition_service import explain_daily_batch, partition_overview, run_partition_maintenance
 
 router = APIRouter(prefix="/metrics")
 
+# 실행 중인 backfill task (GC로 사라지지 않게 참조 유지)
+_backfill_tasks: set[asyncio.Task] = set()
+
+# 시계열/고유 사용자 응답: 집계 결과(SUM/AVG Decimal 등)를 TypeAdapter로 검증 + 직렬화 1회
+_HUB_SERIES = ListSerializer(HubSeriesPoint)
+_APP_SERIES = ListSerializer(AppSeriesPoint)
+_HUB_UNIQUES = ListSerializer(UniquesPoint)
+_APP_UNIQUES = ListSerializer(AppUniquesPoint)
+
 @router.post("/daily/run")
-async def run_daily(payload: BatchRunRequest, me=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def run_daily(payload: BatchRunRequest, me=Depends(get_current_user)):
     # Maintainer/Admin만 배치 실행 허용(정책은 조정 가능)
     require(me["role_name"] in ("Maintainer", "Admin"), "Only Maintainer/Admin can run batch")
-    await run_daily_batch(db, payload.metric_date)
-    return {"ok": True, "metric_date": payload.metric_date}
+    try:
+        metric_date = date.fromisoformat(payload.metric_date)
+    except ValueError:
+        raise HTTPException(400, "metric_date must be YYYY-MM-DD")
+    # 스케줄러와 같은 lock / 이력(batch_runs, trigger=manual)
+    try:
+        result = await run_daily_metrics(metric_date, "manual")
+    except BatchLockBusy:
+        raise HTTPException(409, "Daily batch is already running")
+    if result["status"] == "failed":
+        raise HTTPException(500, "Daily batch failed")
+    # partial: 아직 끝나지 않은 날짜 (UTC 기준) -> 스케줄러가 다음 실행에서 다시 계산
+    return {"ok": True, "metric_date": payload.metric_date, "status": result["status"], "duration_ms": result["duration_ms"]}
+
+
+@router.get("/daily/runs", response_model=list[dict], dependencies=[Depends(require_min_role_rank(40))])
+async def daily_runs_api(limit: int = Query(default=30, ge=1, le=200), db: AsyncSession = Depends(get_db)):
+    # 일 배치 실행 이력 (스케줄/수동, worker, 소요 시간)
+    return await list_batch_runs(db, limit)
+
+
+@router.post("/daily/backfill")
+async def run_daily_backfill_api(payload: BackfillRequest, me=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # 기간 재계산은 백그라운드로 돌리고 job_id만 반환 (진행률: GET /jobs/{job_id})
+    require(me["role_name"] in ("Maintainer", "Admin"), "Only Maintainer/Admin can run batch")
+    days = (payload.date_to - payload.date_from).days + 1
+    if days > settings.METRICS_BACKFILL_MAX_DAYS:
+        raise HTTPException(413, f"Too many days in one backfill (max {settings.METRICS_BACKFILL_MAX_DAYS})")
+
+    parallelism = backfill_parallelism(payload.parallelism)
+    job_id = await create_job(db, {
+        "user_id": me["id"],
+        "job_type": "metrics_backfill",
+        "status": "queued",
+        "progress": 0,
+        "message": f"0/{days} days ({payload.date_from}~{payload.date_to})",
+    })
+    await realtime_metrics.flush()
+    task = asyncio.create_task(
+        run_daily_backfill(job_id, payload.date_from, payload.date_to, parallelism),
+        name=f"metrics-backfill-{job_id}",
+    )
+    _backfill_tasks.add(task)
+    task.add_done_callback(_backfill_tasks.discard)
+    return {"ok": True, "job_id": job_id, "days": days, "parallelism": parallelism}
+
+
+def _check_range(date_from: date, date_to: date) -> None:
+    if date_to < date_from:
+        raise HTTPException(400, "date_to must be >= date_from")
+    if (date_to - date_from).days + 1 > settings.METRICS_SERIES_MAX_DAYS:
+        raise HTTPException(400, f"Range too long (max {settings.METRICS_SERIES_MAX_DAYS} days)")
+
+
+@router.get("/hub/series", response_model=list[HubSeriesPoint])
+async def hub_series_api(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    granularity: Granularity = Query(default="day"),
+    db: AsyncSession = Depends(get_db),
+    _me: dict = Depends(get_current_user),
+):
+    # hub_daily_metrics 시계열 (date_to 포함)
+    _check_range(date_from, date_to)
+    return _HUB_SERIES.response(await get_hub_series(db, date_from, date_to, granularity))
+
+
+@router.get("/apps/series", response_model=list[AppSeriesPoint])
+async def app_series_api(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    granularity: Granularity = Query(default="day"),
+    app_id: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    _me: dict = Depends(get_current_user),
+):
+    # app_daily_metrics 시계열 (app_id 없으면 전체 앱, bucket/app_id 순)
+    _check_range(date_from, date_to)
+    return _APP_SERIES.response(await get_app_series(db, date_from, date_to, granularity, app_id))
+
+
+@router.get("/hub/uniques", response_model=list[UniquesPoint])
+async def hub_uniques_api(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    granularity: UniquesGranularity = Query(default="range"),
+    db: AsyncSession = Depends(get_db),
+    _me: dict = Depends(get_current_user),
+):
+    # 고유 사용자 근사 (week=WAU, month=MAU, range=기간 전체), 일별 HLL sketch 합산
+    _check_range(date_from, date_to)
+    return _HUB_UNIQUES.response(await get_hub_uniques(db, date_from, date_to, granularity))
+
+
+@router.get("/apps/uniques", response_model=list[AppUniquesPoint])
+async def app_uniques_api(
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    granularity: UniquesGranularity = Query(default="range"),
+    app_id: int | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    _me: dict = Depends(get_current_user),
+):
+    _check_range(date_from, date_to)
+    return _APP_UNIQUES.response(await get_app_uniques(db, date_from, date_to, granularity, app_id))
+
+
+@router.get("/runtime", response_class=PlainTextResponse)
+async def runtime_metrics():
+    # Prometheus scrape용 (text format 0.0.4)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/sql/top", response_model=list[dict], dependencies=[Depends(require_min_role_rank(40))])
+async def sql_top_api(
+    n: int = Query(default=20, ge=1, le=200),
+    order_by: Literal["total_ms", "calls", "avg_ms", "max_ms", "rows", "slow_calls"] = Query(default="total_ms"),
+):
+    # SQL_* 상수 단위 누적 통계 (프로세스 기동 이후 / reset 이후)
+    return sql_profiler.top(n=n, order_by=order_by)
+
+
+@router.delete("/sql/top", response_model=dict, dependencies=[Depends(require_min_role_rank(40))])
+async def sql_reset_api():
+    sql_profiler.reset()
+    return {"ok": True}
+
+
+@router.get("/sql/explain-lists", response_model=dict, dependencies=[Depends(require_min_role_rank(50))])
+async def sql_explain_lists_api(db: AsyncSession = Depends(get_db)):
+    # 목록 API 필터 조합별 EXPLAIN (이 프로세스에서 실행된 조합, 마지막 param 기준)
+    return await explain_list_queries(db)
+
+
+@router.get("/partitions", response_model=dict, dependencies=[Depends(require_min_role_rank(50))])
+async def partitions_api(db: AsyncSession = Depends(get_db)):
+    # 이벤트 테이블별 파티션 목록 (TABLE_ROWS는 추정치)
+    return await partition_overview(db)
+
+
+@router.post("/partitions/maintain", response_model=dict, dependencies=[Depends(require_min_role_rank(50))])
+async def partitions_maintain_api(db: AsyncSession = Depends(get_db)):
+    # 미래 월 파티션 생성 + 보관 기간 지난 파티션 archive/drop
+    return await run_partition_maintenance(db)
+
+
+@router.get("/partitions/explain", response_model=dict, dependencies=[Depends(require_min_role_rank(50))])
+async def partitions_explain_api(
+    metric_date: str = Query(..., pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    db: AsyncSession = Depends(get_db),
+):
+    # 일 배치 SQL이 해당 월 파티션만 읽는지 확인 (EXPLAIN partitions)
+    return await explain_daily_batch(db, metric_date)
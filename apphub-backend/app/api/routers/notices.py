@@ -3,9 +3,11 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user, require_min_role_rank
-from app.schemas.notices import NoticeOut, NoticeCreate, NoticeUpdate
+from app.api.deps import get_db, get_current_user, list_fields, require_min_role_rank
+from app.api.serializers import ListSerializer
+from app.schemas.notices import NoticeListItem, NoticeOut, NoticeCreate, NoticeUpdate
 from app.services.notice_service import (
+    SQL_LIST_NOTICES,
     list_notices,
     get_notice,
     create_notice,
@@ -16,17 +18,22 @@ from app.services.notice_service import (
 
 router = APIRouter(prefix="/notices")
 
+# 목록 row는 ListQuery 컬럼 그대로 (NoticeOut 모양) -> orjson 직렬화 1회
+_NOTICE_LIST = ListSerializer(NoticeListItem, trusted=True)
 
-@router.get("/", response_model=list[NoticeOut])
+
+@router.get("/", response_model=list[NoticeListItem])
 async def list_notices_api(
     scope: str | None = Query(default=None, description="all/apphub/category/app"),
     category_id: int | None = Query(default=None),
     app_id: int | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    fields: tuple[str, ...] = Depends(list_fields(SQL_LIST_NOTICES)),
     db: AsyncSession = Depends(get_db),
     _me: dict = Depends(get_current_user),
 ):
+    # 기본 필드에 body 없음 (본문은 GET /notices/{id} 또는 ?fields=*)
     rows = await list_notices(
         db,
         scope=scope,
@@ -34,8 +41,9 @@ async def list_notices_api(
         app_id=app_id,
         limit=limit,
         offset=offset,
+        fields=fields,
     )
-    return [NoticeOut(**r) for r in rows]
+    return _NOTICE_LIST.response(rows)
 
 
 @router.get("/{notice_id}", response_model=NoticeOut)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+# 목록 응답 직렬화 1회
+# - response_model만 두고 dict/모델을 반환하면 FastAPI가 row마다 다시 검증 + jsonable_encoder 후
+#   ORJSONResponse가 한 번 더 인코딩 (라우터에서 XOut(**r)까지 만들면 검증 2번)
+# - Response를 직접 반환하면 FastAPI는 response_model 검증/직렬화를 건너뜀
+#   -> 데코레이터의 response_model은 그대로 두어 OpenAPI 스키마 유지
+# - 벤치마크: python -m app.api.bench_serialization
+
+
+def _default(value: Any) -> Any:
+    # orjson 기본 미지원 타입 (SUM/AVG 결과 Decimal 등)
+    if hasattr(value, "__float__"):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ListSerializer:
+    """
+    목록 응답 serializer (라우터 모듈에서 schema별로 1번 생성)
+    - trusted=True: 서비스가 schema 모양 그대로 만든 row dict -> orjson.dumps 바로
+      (ListQuery 컬럼 정의로 필드가 고정되고 id/JSON 컬럼 변환을 서비스에서 끝낸 목록)
+    - trusted=False: 미리 만든 TypeAdapter(list[model])로 pydantic-core에서 검증 + JSON 직렬화 1회
+      (Decimal -> float 등 형 변환이 필요한 집계 결과)
+    - 어느 쪽이든 row에 없는 필드는 응답에서 빠짐 (?fields= 목록의 response_model_exclude_unset과 같은 결과)
+    """
+
+    def __init__(self, model: type[BaseModel], trusted: bool = False):
+        self.trusted = trusted
+        self.adapter = TypeAdapter(list[model])
+
+    def dumps(self, rows: list[dict]) -> bytes:
+        if self.trusted:
+            return orjson.dumps(rows, default=_default)
+        return self.adapter.dump_json(self.adapter.validate_python(rows), exclude_unset=True)
+
+    def response(self, rows: list[dict], headers: dict[str, str] | None = None) -> Response:
+        # 주입받은 response: Response의 헤더는 Response를 직접 반환하면 합쳐지지 않으므로 headers로 전달
+        return Response(self.dumps(rows), media_type="application/json", headers=headers)
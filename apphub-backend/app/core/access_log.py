@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import glob
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+import orjson
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class AccessLogWriter:
+    """
+    access.log 전용 writer
+    - 요청 스레드(이벤트 루프)는 dict를 ring buffer에 넣기만 함 (인코딩/IO 없음)
+    - 백그라운드 스레드가 batch 단위로 orjson 인코딩 + 파일 write
+    - buffer가 가득 차면 새 레코드는 버리고 dropped 카운터 증가
+    - route(템플릿)별 sampling, 에러(status >= 400 / 예외)는 항상 기록
+    - 파일 크기 기준 rotation + 보관일 지난 파일 삭제 (기존 loguru sink 설정과 동일)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int,
+        batch_size: int,
+        flush_interval_ms: int,
+        sample_rates: dict[str, float],
+        default_sample_rate: float,
+        rotate_bytes: int,
+        retention_days: int,
+    ):
+        self.path = path
+        self.capacity = int(capacity)
+        self.batch_size = int(batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.sample_rates = dict(sample_rates)
+        self.default_sample_rate = float(default_sample_rate)
+        self.rotate_bytes = int(rotate_bytes)
+        self.retention_days = int(retention_days)
+
+        self._buf: deque[dict[str, Any]] = deque()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._fp = None
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.batches = 0
+        self.write_errors = 0
+
+    # -------------------------
+    # 요청 경로 (hot path)
+    # -------------------------
+    def sample_rate_for(self, route: str, status_code: int, error: str | None) -> float:
+        """
+        기록 여부 판단. 0이면 기록 안 함(sampled out), 그 외 적용된 sampling rate 반환
+        - payload를 만들기 전에 호출해서 버릴 요청은 dict도 만들지 않게 한다
+        """
+        if status_code >= 400 or error is not None:
+            return 1.0
+        rate = self.sample_rates.get(route, self.default_sample_rate)
+        if rate >= 1.0:
+            return 1.0
+        if rate <= 0.0 or random.random() >= rate:
+            self.sampled_out += 1
+            return 0.0
+        return rate
+
+    def submit(self, record: dict[str, Any]) -> None:
+        if len(self._buf) >= self.capacity:
+            self.dropped += 1
+            return
+        self._buf.append(record)
+        self.submitted += 1
+        if len(self._buf) >= self.batch_size:
+            self._wakeup.set()
+
+    # -------------------------
+    # lifecycle
+    # -------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """남은 레코드를 모두 flush하고 스레드 종료"""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._close()
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._buf),
+            "capacity": self.capacity,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+        }
+
+    # -------------------------
+    # 백그라운드 스레드
+    # -------------------------
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            stopping = self._stopping
+            while self._buf:
+                self._flush_batch()
+            if stopping:
+                return
+
+    def _flush_batch(self) -> None:
+        buf = self._buf
+        lines = []
+        for _ in range(min(self.batch_size, len(buf))):
+            lines.append(orjson.dumps(buf.popleft()))
+        if not lines:
+            return
+        lines.append(b"")
+
+        try:
+            fp = self._open()
+            fp.write(b"\n".join(lines))
+            fp.flush()
+            self.written += len(lines) - 1
+            self.batches += 1
+            if fp.tell() >= self.rotate_bytes:
+                self._rotate()
+        except Exception as e:
+            self.write_errors += 1
+            self.dropped += len(lines) - 1
+            logger.error(f"[ACCESS_LOG] write failed: {e}")
+            self._close()
+
+    def _open(self):
+        if self._fp is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._fp = open(self.path, "ab")
+        return self._fp
+
+    def _close(self) -> None:
+        if self._fp is not None:
+            try:
+                self._fp.close()
+            finally:
+                self._fp = None
+
+    def _rotate(self) -> None:
+        self._close()
+        base, ext = os.path.splitext(self.path)
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        os.replace(self.path, f"{base}.{stamp}{ext}")
+
+        cutoff = time.time() - self.retention_days * 86400
+        for old in glob.glob(f"{base}.*{ext}"):
+            try:
+                if os.path.getmtime(old) < cutoff:
+                    os.remove(old)
+            except OSError:
+                pass
+
+
+access_log = AccessLogWriter(
+    path=os.path.join(settings.LOG_DIR, "access.log"),
+    capacity=settings.ACCESS_LOG_BUFFER_SIZE,
+    batch_size=settings.ACCESS_LOG_BATCH_SIZE,
+    flush_interval_ms=settings.ACCESS_LOG_FLUSH_MS,
+    sample_rates=settings.ACCESS_LOG_SAMPLE_RATES,
+    default_sample_rate=settings.ACCESS_LOG_DEFAULT_SAMPLE_RATE,
+    rotate_bytes=settings.ACCESS_LOG_ROTATE_MB * 1024 * 1024,
+    retention_days=settings.ACCESS_LOG_RETENTION_DAYS,
+)
+
+
+def _collect_access_log_metrics():
+    st = access_log.stats()
+    yield ("apphub_access_log_buffered", "gauge", "Access log records waiting to be written", [({}, st["buffered"])])
+    for key in ("submitted", "written", "dropped", "sampled_out"):
+        yield (f"apphub_access_log_{key}_total", "counter", f"Access log records {key}", [({}, st[key])])
+
+
+metrics.add_collector(_collect_access_log_metrics)
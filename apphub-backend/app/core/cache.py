@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.core.metrics import metrics
+
+
+class TTLCache:
+    """
+    프로세스 내 TTL + LRU 캐시 (asyncio 단일 이벤트 루프에서 사용 전제, lock 없음)
+    - ttl_sec 지나면 만료 (조회 시점에 제거)
+    - max_size 넘으면 가장 오래 안 쓴 항목부터 제거
+    - hits/misses/evictions 카운터 제공
+    """
+
+    def __init__(self, max_size: int, ttl_sec: float):
+        self.max_size = int(max_size)
+        self.ttl_sec = float(ttl_sec)
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_sec: float | None = None) -> None:
+        ttl = self.ttl_sec if ttl_sec is None else float(ttl_sec)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        # key 조건으로 일괄 무효화 (예: 특정 날짜를 포함하는 범위 조회 결과)
+        keys = [k for k in self._data if predicate(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_sec": self.ttl_sec,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# /api/metrics/runtime 노출용 (이름 -> 캐시)
+_caches: dict[str, TTLCache] = {}
+
+
+def register_cache(name: str, cache: TTLCache) -> TTLCache:
+    _caches[name] = cache
+    return cache
+
+
+def _collect_cache_metrics():
+    stats = [({"cache": name}, c.stats()) for name, c in _caches.items()]
+    yield ("apphub_cache_size", "gauge", "Entries currently cached", [(lbl, st["size"]) for lbl, st in stats])
+    yield ("apphub_cache_hits_total", "counter", "Cache hits", [(lbl, st["hits"]) for lbl, st in stats])
+    yield ("apphub_cache_misses_total", "counter", "Cache misses", [(lbl, st["misses"]) for lbl, st in stats])
+    yield ("apphub_cache_evictions_total", "counter", "LRU evictions", [(lbl, st["evictions"]) for lbl, st in stats])
+
+
+metrics.add_collector(_collect_cache_metrics)
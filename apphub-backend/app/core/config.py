@@ -12,6 +12,16 @@ class Settings(BaseSettings):
     LOG_DIR: str = "./logs"
     LOG_LEVEL: str = "INFO"
 
+    # access.log writer (batch + sampling)
+    ACCESS_LOG_BUFFER_SIZE: int = 10000
+    ACCESS_LOG_BATCH_SIZE: int = 500
+    ACCESS_LOG_FLUSH_MS: int = 200
+    ACCESS_LOG_DEFAULT_SAMPLE_RATE: float = 1.0
+    # route 템플릿별 sampling rate, 예: {"/api/app-events/sessions/{session_id}/actions": 0.1}
+    ACCESS_LOG_SAMPLE_RATES: dict[str, float] = {}
+    ACCESS_LOG_ROTATE_MB: int = 50
+    ACCESS_LOG_RETENTION_DAYS: int = 14
+
     DB_HOST: str
     DB_PORT: int = 3306
     DB_USER: str
@@ -21,6 +31,13 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 20
     DB_ECHO: bool = False
 
+    # SQL 프로파일러 (SQL_* 상수 단위 집계 + slow query log)
+    SQL_PROFILE_ENABLED: bool = True
+    SQL_SLOW_MS: int = 500
+    SQL_SLOW_EXPLAIN: bool = True
+    # 같은 statement에 대해 EXPLAIN은 이 간격(초)에 한 번만
+    SQL_SLOW_EXPLAIN_INTERVAL_SEC: int = 60
+
     # 개발 편의: true면 startup 시 create_all() 실행 (운영에서는 false)
     APP_INIT_DB: bool = False
 
@@ -29,7 +46,103 @@ class Settings(BaseSettings):
     APP_INIT_SQL_PATH: str = "app/db/sql/init.sql"
 
     AUTH_KNOX_HEADER: str = "x-knox-id"
+    # get_current_user 용 사용자 캐시 (knox_id -> users+roles row)
+    USER_CACHE_TTL_SEC: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # start_session용 knox_id -> user_id 캐시 (없는 id는 NEGATIVE TTL만큼)
+    KNOX_ID_CACHE_TTL_SEC: int = 3600
+    KNOX_ID_CACHE_NEGATIVE_TTL_SEC: int = 60
+    KNOX_ID_CACHE_MAX_SIZE: int = 200000
+    # startup 시 users 테이블로 미리 채우기
+    KNOX_ID_CACHE_WARM: bool = True
+    # 이 간격(초)마다 다시 채우기 (KNOX_ID_CACHE_TTL_SEC보다 짧게, 0이면 startup 때 1회만)
+    KNOX_ID_CACHE_REWARM_SEC: int = 1800
     BATCH_TIMEZONE: str = "Asia/Seoul"
+    # app 내장 일 배치 스케줄러: 매일 BATCH_RUN_AT(BATCH_TIMEZONE, HH:MM)에 끝난 UTC 날짜 중 최근 날짜 계산
+    # (지표 날짜는 UTC 기준 -> Asia/Seoul이면 09:00 이후 실행해야 전날 UTC 날짜가 바로 집계됨)
+    # (worker가 여러 개여도 MySQL GET_LOCK으로 1개만 실행, 이력은 batch_runs)
+    BATCH_SCHEDULER_ENABLED: bool = False
+    BATCH_RUN_AT: str = "00:10"
+
+    # app_run_sessions id 생성/저장 방식
+    # - VERSION: 4(random) | 7(시간 순, PK 뒤쪽에만 INSERT)
+    # - BINARY: true면 BINARY(16) 컬럼 사용 (app/db/sql/migrations/001_session_id_binary16.sql 적용 후)
+    SESSION_ID_VERSION: int = 4
+    SESSION_ID_BINARY: bool = False
+
+    # app-events 세션 존재 확인 캐시 (session_id -> 존재 여부)
+    SESSION_CACHE_TTL_SEC: int = 600
+    SESSION_CACHE_NEGATIVE_TTL_SEC: int = 10
+    SESSION_CACHE_MAX_SIZE: int = 50000
+
+    # idempotency_key 중복 확인 창 (최근 키만 메모리에, 나머지는 DB PK / unique index)
+    IDEMPOTENCY_WINDOW_SIZE: int = 100000
+    IDEMPOTENCY_WINDOW_SEC: int = 3600
+
+    # action event batch 수집 1회 최대 건수
+    APP_EVENTS_BATCH_MAX: int = 500
+
+    # hub-events beacon 1회 최대 건수 / body 크기 (sendBeacon payload는 브라우저에서 64KB 제한)
+    HUB_EVENTS_BATCH_MAX: int = 200
+    HUB_EVENTS_BEACON_MAX_BYTES: int = 65536
+
+    # 텔레메트리 write-behind (세션/액션을 queue에 넣고 바로 응답, 백그라운드 multi-row INSERT)
+    TELEMETRY_WRITE_BEHIND: bool = False
+    TELEMETRY_QUEUE_MAX: int = 20000
+    TELEMETRY_FLUSH_MS: int = 200
+    TELEMETRY_FLUSH_ROWS: int = 500
+    # queue가 가득 찼을 때 기다리는 최대 시간 (초과 시 503)
+    TELEMETRY_ENQUEUE_TIMEOUT_MS: int = 100
+
+    # DB 장애/지연 시 텔레메트리를 로컬 spool(파일)에 기록 후 복구되면 replay
+    TELEMETRY_SPOOL_ENABLED: bool = False
+    # 프로세스마다 <host>-<pid>-<기동 시각> 하위 디렉터리에 기록 (여러 worker/컨테이너가 같은 경로를 써도 됨)
+    TELEMETRY_SPOOL_DIR: str = "./spool"
+    TELEMETRY_SPOOL_SEGMENT_MB: int = 16
+    # 텔레메트리 DB 쓰기 허용 시간 (초과 시 spool로)
+    TELEMETRY_DB_BUDGET_MS: int = 300
+    TELEMETRY_SPOOL_REPLAY_SEC: int = 5
+    TELEMETRY_SPOOL_REPLAY_CHUNK: int = 1000
+
+    # 일 지표 시계열 조회(/metrics/hub/series, /metrics/apps/series) 캐시
+    # - 같은 worker의 배치/실시간 flush는 즉시 무효화, 다른 worker의 쓰기는 TTL 후 반영
+    METRICS_SERIES_CACHE_TTL_SEC: int = 300
+    METRICS_SERIES_CACHE_MAX_SIZE: int = 1000
+    METRICS_SERIES_MAX_DAYS: int = 1100
+
+    # 일 지표 기간 backfill (POST /metrics/daily/backfill)
+    # - PARALLELISM: 동시에 재계산하는 날짜 수 (DB_POOL_SIZE의 절반을 넘지 않게 잘림)
+    # - MAX_DAYS: 1회 요청 최대 일수
+    METRICS_BACKFILL_PARALLELISM: int = 4
+    METRICS_BACKFILL_MAX_DAYS: int = 400
+
+    # 당일 지표 실시간 반영 (DB 저장 성공 후 메모리 증분 -> FLUSH_SEC마다 daily_metrics에 더하기 upsert)
+    # - SESSION_TTL_SEC: action/종료를 앱에 귀속시키기 위해 세션 시작 정보를 기억하는 시간
+    # - 고유 사용자 수는 하한값, 정확한 값은 /metrics/daily/run(야간 배치)이 재계산
+    # - 날짜가 끝나고 FLUSH_SEC*3 지나야 배치가 success (그 전에는 partial)
+    # - worker가 죽으면 마지막 FLUSH_SEC 동안의 증분은 사라짐 -> backfill(항상 전체 재계산)로 복구
+    METRICS_REALTIME_ENABLED: bool = False
+    METRICS_REALTIME_FLUSH_SEC: float = 10
+    METRICS_REALTIME_SESSION_TTL_SEC: int = 86400
+    # 실시간 반영 중일 때 야간 배치가 action_count를 실시간 증분 그대로 두고 app_action_events를 읽지 않음
+    # (모든 worker가 METRICS_REALTIME_ENABLED=true일 때만 켤 것)
+    METRICS_BATCH_RECONCILE: bool = True
+
+    # 이벤트 테이블 월 파티션 롤오버 (migrations/003 적용 후 사용)
+    # - MAINTENANCE_ENABLED: 기동 시 1회 실행 (수동: POST /metrics/partitions/maintain)
+    # - MONTHS_AHEAD: 이번 달 이후 미리 만들어 둘 월 파티션 수
+    # - RETAIN_MONTHS: 이번 달 이전 보관 개월 수 (초과분은 archive 또는 drop)
+    # - ARCHIVE: true면 {table}_archive_pYYYYMM 테이블로 EXCHANGE 후 제거
+    PARTITION_MAINTENANCE_ENABLED: bool = False
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETAIN_MONTHS: int = 13
+    PARTITION_ARCHIVE: bool = True
+
+    # 세션/액션 export 스트리밍 (GET /app-events/sessions/export, /app-events/actions/export)
+    # - CHUNK_ROWS: server-side cursor에서 한 번에 가져와 인코딩하는 row 수 (메모리 상한)
+    # - MAX_CONCURRENT: 동시 export 수 (export마다 전송이 끝날 때까지 DB connection 1개 점유)
+    EXPORT_CHUNK_ROWS: int = 1000
+    EXPORT_MAX_CONCURRENT: int = 2
 
     @property
     def DATABASE_URL_ASYNC(self) -> str:
@@ -1,22 +1,24 @@
 import os
 import time
-import json
-from typing import Callable, Optional
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qsl
 
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from fastapi.responses import ORJSONResponse
 
+from app.core.access_log import access_log
 from app.core.config import settings
+from app.core.metrics import metrics
 
 
 def setup_logging() -> None:
     """
     - logs/apphub.log      : 일반 앱 로그
-    - logs/access.log      : 요청/응답(액세스) 로그
+    - logs/access.log      : 요청/응답(액세스) 로그 (loguru가 아닌 access_log writer가 기록)
     - logs/error.log       : 에러 로그(스택 포함)
+    - logs/slow_sql.log    : SQL_SLOW_MS 넘은 쿼리 (파라미터 + EXPLAIN)
     """
     os.makedirs(settings.LOG_DIR, exist_ok=True)
 
@@ -45,95 +47,152 @@ def setup_logging() -> None:
         diagnose=True,
     )
 
-    # access 로그 (extra.access=True 인 것만)
+    # slow query 로그 (extra.slow_sql=True 인 것만)
     logger.add(
-        os.path.join(settings.LOG_DIR, "access.log"),
-        level="INFO",
-        rotation="50 MB",
+        os.path.join(settings.LOG_DIR, "slow_sql.log"),
+        level="WARNING",
+        rotation="10 MB",
         retention="14 days",
         enqueue=True,
         backtrace=False,
         diagnose=False,
-        filter=lambda record: record["extra"].get("access") is True,
+        filter=lambda record: record["extra"].get("slow_sql") is True,
     )
 
+    # access 로그는 전용 writer(app.core.access_log)가 batch로 기록
+    access_log.start()
+
 
-class RequestResponseLoggingMiddleware(BaseHTTPMiddleware):
+class RequestResponseLoggingMiddleware:
     """
-    요청/응답 요약을 access.log에 남긴다.
-    - body는 너무 크면 MAX_BODY까지만 기록
+    요청/응답 요약을 access.log에 남긴다. (pure ASGI 미들웨어)
+    - request body는 그대로 흘려보내면서 앞쪽 MAX_BODY 바이트만 보관 (전체 버퍼링 안 함)
+    - BaseHTTPMiddleware의 추가 task / stream 래핑 비용 없음
     - 예외가 터져도 access.log에 500 에러 로그가 남도록 처리
+    - route 템플릿/status별 latency 히스토그램, in-flight 요청 수도 같이 기록 (app.core.metrics)
     """
     MAX_BODY = 2048
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start = time.time()
-
-        # request body는 한 번 읽으면 stream 소모되므로 복구해줘야 함
-        body_bytes = await request.body()
-        if body_bytes:
-            request._receive = _receive_with_body(body_bytes)
-
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        body_head = bytearray()
+        status_code = 500
+        response_started = False
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request" and len(body_head) < self.MAX_BODY:
+                chunk = message.get("body", b"")
+                if chunk:
+                    body_head.extend(chunk[: self.MAX_BODY - len(body_head)])
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+            await send(message)
+
+        metrics.in_flight += 1
         try:
-            response = await call_next(request)
+            await self.app(scope, receive_wrapper, send_wrapper)
         except Exception as e:
-            took_ms = int((time.time() - start) * 1000)
+            elapsed = time.perf_counter() - start
+            _record_metrics(scope, 500, elapsed)
             _log_access(
-                request=request,
+                scope=scope,
                 status_code=500,
-                took_ms=took_ms,
-                request_body_bytes=body_bytes,
+                took_ms=int(elapsed * 1000),
+                request_body_bytes=bytes(body_head),
                 error=str(e),
             )
             # 에러는 error.log에도 스택으로 남김
             logger.exception(f"Unhandled exception: {e}")
 
-            # 응답은 JSON으로 통일 (프론트/Swagger 확인 편함)
-            return ORJSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+            # 이미 응답 헤더를 보냈으면 새 응답을 만들 수 없음
+            if response_started:
+                raise
 
-        took_ms = int((time.time() - start) * 1000)
+            # 응답은 JSON으로 통일 (프론트/Swagger 확인 편함)
+            response = ORJSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+            await response(scope, receive, send)
+            return
+        finally:
+            metrics.in_flight -= 1
+
+        elapsed = time.perf_counter() - start
+        _record_metrics(scope, status_code, elapsed)
         _log_access(
-            request=request,
-            status_code=response.status_code,
-            took_ms=took_ms,
-            request_body_bytes=body_bytes,
+            scope=scope,
+            status_code=status_code,
+            took_ms=int(elapsed * 1000),
+            request_body_bytes=bytes(body_head),
             error=None,
         )
-        return response
+
+
+def _record_metrics(scope: Scope, status_code: int, elapsed: float) -> None:
+    # 매칭 안 된 경로(404 스캔 등)는 label 폭증 방지를 위해 하나로 묶음
+    route = scope.get("route")
+    route_path = route.path if route is not None else "<unmatched>"
+    metrics.observe_request(scope["method"], route_path, status_code, elapsed)
+
+
+_KNOX_HEADER_KEY = settings.AUTH_KNOX_HEADER.lower().encode("latin-1")
 
 
 def _log_access(
-    request: Request,
+    scope: Scope,
     status_code: int,
     took_ms: int,
     request_body_bytes: bytes,
     error: Optional[str],
 ) -> None:
-    # body 잘라서 기록
+    route = scope.get("route")
+    route_path = route.path if route is not None else scope["path"]
+
+    # sampling 대상이면 payload도 만들지 않음 (에러는 항상 기록)
+    sample_rate = access_log.sample_rate_for(route_path, status_code, error)
+    if not sample_rate:
+        return
+
+    # body는 미들웨어에서 이미 MAX_BODY까지만 잘라서 넘어옴
     req_body = None
     if request_body_bytes:
-        req_body = request_body_bytes[: RequestResponseLoggingMiddleware.MAX_BODY].decode(
-            "utf-8", errors="ignore"
-        )
+        req_body = request_body_bytes.decode("utf-8", errors="ignore")
+
+    knox_id = None
+    for key, value in scope.get("headers", ()):
+        if key == _KNOX_HEADER_KEY:
+            knox_id = value.decode("latin-1")
+            break
+
+    client = scope.get("client")
+    query_string = scope.get("query_string", b"").decode("latin-1")
 
     payload = {
-        "method": request.method,
-        "path": request.url.path,
-        "query": dict(request.query_params),
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route_path,
+        "query": dict(parse_qsl(query_string, keep_blank_values=True)),
         "status_code": status_code,
         "took_ms": took_ms,
-        "client": request.client.host if request.client else None,
-        "knox_id": request.headers.get(settings.AUTH_KNOX_HEADER),
+        "client": client[0] if client else None,
+        "knox_id": knox_id,
         "request_body": req_body if req_body else None,
         "error": error,
     }
+    if sample_rate < 1.0:
+        payload["sample_rate"] = sample_rate
 
-    # 한 줄 JSON 로그로 남김
-    logger.bind(access=True).info(json.dumps(payload, ensure_ascii=False))
-
-
-def _receive_with_body(body: bytes):
-    async def receive():
-        return {"type": "http.request", "body": body, "more_body": False}
-
-    return receive
+    # 한 줄 JSON (인코딩/파일 write는 writer 스레드에서 batch 처리)
+    access_log.submit(payload)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# (name, type, help, [(labels, value), ...])
+MetricSample = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+LATENCY_BUCKETS_SEC = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    단일 series 히스토그램
+    - observe는 list 원소 증가 + float 덧셈뿐 (객체 생성/lock 없음)
+    - 이벤트 루프 스레드에서만 갱신한다는 전제 (asyncio 단일 스레드)
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸 = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class HistogramFamily:
+    """label 조합별 Histogram 묶음 (label 조합은 처음 한 번만 생성)"""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.series: dict[tuple, Histogram] = {}
+
+    def labels(self, *values) -> Histogram:
+        h = self.series.get(values)
+        if h is None:
+            h = self.series[values] = Histogram(self.buckets)
+        return h
+
+
+class MetricsRegistry:
+    """
+    프로세스 내 메트릭 저장소 + Prometheus text format(0.0.4) 출력
+    - 히스토그램/in-flight는 요청 경로에서 직접 갱신
+    - 게이지/카운터 성격의 값(pool 상태, 캐시 통계 등)은 collector로 scrape 시점에만 계산
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self._families: dict[str, HistogramFamily] = {}
+        self._collectors: list[Callable[[], Iterable[MetricSample]]] = []
+        self.http_requests = self.histogram(
+            "apphub_http_request_duration_seconds",
+            "HTTP request latency by route template and status",
+            ("method", "route", "status"),
+        )
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS_SEC,
+    ) -> HistogramFamily:
+        fam = self._families.get(name)
+        if fam is None:
+            fam = self._families[name] = HistogramFamily(name, help, labelnames, buckets)
+        return fam
+
+    def add_collector(self, fn: Callable[[], Iterable[MetricSample]]) -> None:
+        self._collectors.append(fn)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        self.http_requests.labels(method, route, status).observe(seconds)
+
+    def render(self) -> str:
+        out: list[str] = []
+
+        out.append("# HELP apphub_http_requests_in_flight HTTP requests currently being served")
+        out.append("# TYPE apphub_http_requests_in_flight gauge")
+        out.append(f"apphub_http_requests_in_flight {self.in_flight}")
+
+        # 요청 수 (히스토그램 _count와 같은 값이지만 대시보드 편의상 counter로도 노출)
+        out.append("# HELP apphub_http_requests_total HTTP requests by route template and status")
+        out.append("# TYPE apphub_http_requests_total counter")
+        for values, h in list(self.http_requests.series.items()):
+            out.append(f"apphub_http_requests_total{_labels(self.http_requests.labelnames, values)} {h.count}")
+
+        for fam in list(self._families.values()):
+            out.append(f"# HELP {fam.name} {fam.help}")
+            out.append(f"# TYPE {fam.name} histogram")
+            for values, h in list(fam.series.items()):
+                cumulative = 0
+                for bound, n in zip(fam.buckets, h.counts):
+                    cumulative += n
+                    lbl = _labels(fam.labelnames + ("le",), values + (_fmt(bound),))
+                    out.append(f"{fam.name}_bucket{lbl} {cumulative}")
+                lbl = _labels(fam.labelnames + ("le",), values + ("+Inf",))
+                out.append(f"{fam.name}_bucket{lbl} {h.count}")
+                lbl = _labels(fam.labelnames, values)
+                out.append(f"{fam.name}_sum{lbl} {_fmt(h.sum)}")
+                out.append(f"{fam.name}_count{lbl} {h.count}")
+
+        for collect in self._collectors:
+            for name, mtype, help, samples in collect():
+                out.append(f"# HELP {name} {help}")
+                out.append(f"# TYPE {name} {mtype}")
+                for labels, value in samples:
+                    lbl = _labels(tuple(labels), tuple(labels.values()))
+                    out.append(f"{name}{lbl} {_fmt(value)}")
+
+        out.append("")
+        return "\n".join(out)
+
+
+def _fmt(v: float) -> str:
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v)) if abs(v) < 1e15 else repr(v)
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    parts = []
+    for k, v in zip(names, values):
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+metrics = MetricsRegistry()
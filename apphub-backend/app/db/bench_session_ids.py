@@ -0,0 +1,94 @@
+"""
+세션 id 저장 방식별 INSERT 처리량 / 인덱스 크기 비교 (운영 DB가 아닌 곳에서 실행)
+
+    python -m app.db.bench_session_ids --rows 200000 --batch 500
+
+- char(36) + uuid4 (현재) / char(36) + uuid7 / BINARY(16) + uuid7 세 가지 scratch 테이블 생성
+- app_run_sessions와 같은 모양(PK + 보조 인덱스 2개)으로 만들고 executemany로 채운 뒤
+  information_schema.TABLES의 data_length / index_length 비교
+- 끝나면 scratch 테이블 삭제
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.db.session import engine
+from app.utils.uuid7 import uuid7
+
+LAYOUTS = {
+    "char36_uuid4": ("char(36)", lambda: str(uuid.uuid4())),
+    "char36_uuid7": ("char(36)", lambda: str(uuid7())),
+    "binary16_uuid7": ("BINARY(16)", lambda: uuid7().bytes),
+}
+
+SQL_CREATE = """
+CREATE TABLE `{table}` (
+  `id` {id_type} NOT NULL,
+  `user_id` bigint DEFAULT NULL,
+  `app_id` bigint NOT NULL,
+  `started_at` datetime NOT NULL,
+  PRIMARY KEY (`id`),
+  KEY `ix_user` (`user_id`),
+  KEY `ix_app` (`app_id`)
+) ENGINE=InnoDB
+"""
+
+SQL_SIZE = text("""
+SELECT data_length, index_length
+FROM information_schema.TABLES
+WHERE table_schema = DATABASE() AND table_name = :table
+""")
+
+
+async def bench(name: str, id_type: str, make_id, rows: int, batch: int) -> dict:
+    table = f"bench_sessions_{name}"
+    insert = text(f"INSERT INTO `{table}` (id, user_id, app_id, started_at) VALUES (:id, :user_id, :app_id, :started_at)")
+    base = datetime(2026, 1, 1)
+
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql(f"DROP TABLE IF EXISTS `{table}`")
+        await conn.exec_driver_sql(SQL_CREATE.format(table=table, id_type=id_type))
+        await conn.commit()
+
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            chunk = [
+                {"id": make_id(), "user_id": i % 5000, "app_id": i % 50, "started_at": base + timedelta(seconds=i)}
+                for i in range(offset, min(offset + batch, rows))
+            ]
+            await conn.execute(insert, chunk)
+            await conn.commit()
+        elapsed = time.perf_counter() - start
+
+        await conn.exec_driver_sql(f"ANALYZE TABLE `{table}`")
+        size = (await conn.execute(SQL_SIZE, {"table": table})).mappings().one()
+        await conn.exec_driver_sql(f"DROP TABLE `{table}`")
+        await conn.commit()
+
+    return {
+        "layout": name,
+        "rows_per_sec": round(rows / elapsed),
+        "data_mb": round(size["data_length"] / 1048576, 2),
+        "index_mb": round(size["index_length"] / 1048576, 2),
+    }
+
+
+async def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--batch", type=int, default=500)
+    args = ap.parse_args()
+
+    for name, (id_type, make_id) in LAYOUTS.items():
+        print(await bench(name, id_type, make_id, args.rows, args.batch))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
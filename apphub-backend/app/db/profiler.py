@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from types import ModuleType
+
+import orjson
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+_WS_RE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class StatementStats:
+    __slots__ = ("name", "calls", "total_ms", "max_ms", "rows", "slow_calls")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.slow_calls = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "slow_calls": self.slow_calls,
+        }
+
+
+class SqlProfiler:
+    """
+    services의 SQL_* 상수 이름 단위로 실행 시간 / 반환 row 수 / 호출 수를 집계
+    - before/after_cursor_execute 이벤트 사용 (실제 DB 왕복 시간)
+    - 이름 매핑은 SQL 문자열 -> "모듈.상수명" (text() 래핑 여부와 무관)
+    - SQL_SLOW_MS 이상이면 slow_sql.log에 파라미터 + EXPLAIN 결과와 함께 기록
+    """
+
+    def __init__(self, slow_ms: float, explain: bool, explain_interval_sec: float):
+        self.slow_ms = float(slow_ms)
+        self.explain = explain
+        self.explain_interval_sec = float(explain_interval_sec)
+        self._names: dict[str, str] = {}
+        self._stats: dict[str, StatementStats] = {}
+        self._last_explain: dict[str, float] = {}
+        self._engine: AsyncEngine | None = None
+
+    # -------------------------
+    # 등록 / 설치
+    # -------------------------
+    def register_module(self, module: ModuleType) -> None:
+        prefix = module.__name__.rsplit(".", 1)[-1]
+        for attr, value in vars(module).items():
+            if not attr.startswith("SQL_"):
+                continue
+            if isinstance(value, TextClause):
+                sql = value.text
+            elif isinstance(value, str):
+                sql = value
+            else:
+                continue
+            # 다른 모듈에서 import 해 온 상수는 처음 등록된(정의한) 모듈 이름 유지
+            self.register_statement(f"{prefix}.{attr}", sql)
+
+    def register_statement(self, name: str, sql: str) -> None:
+        # 실행 시점에 조립되는 SQL(query_builder 필터 조합 등)을 이름으로 묶기
+        self._names.setdefault(sql, name)
+
+    def install(self, engine: AsyncEngine) -> None:
+        if self._engine is not None:
+            return
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after)
+        event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    # -------------------------
+    # 조회
+    # -------------------------
+    def top(self, n: int = 20, order_by: str = "total_ms") -> list[dict]:
+        rows = [s.to_dict() for s in self._stats.values()]
+        rows.sort(key=lambda r: r[order_by], reverse=True)
+        return rows[:n]
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._last_explain.clear()
+
+    # -------------------------
+    # event hooks (sync, greenlet 안에서 호출됨)
+    # -------------------------
+    def _statement_name(self, context, statement: str) -> str:
+        compiled = getattr(context, "compiled", None)
+        sql = getattr(getattr(compiled, "statement", None), "text", None)
+        if sql is not None:
+            name = self._names.get(sql)
+            if name is not None:
+                return name
+        # 이름 없는 SQL은 앞부분으로 묶음
+        return "<unnamed> " + _WS_RE.sub(" ", statement).strip()[:80]
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None and context.execution_options.get("sql_profile") is False:
+            return
+        # (context, 시작 시각): pool에 돌아가도 남는 conn.info에 쌓이므로 끝/실패 시 같은 context만 pop
+        conn.info.setdefault("sql_profile_start", []).append((context, time.perf_counter()))
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("sql_profile_start")
+        if not starts or starts[-1][0] is not context:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()[1]) * 1000.0
+
+        name = self._statement_name(context, statement)
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = StatementStats(name)
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        st.calls += 1
+        st.total_ms += elapsed_ms
+        st.rows += rows
+        if elapsed_ms > st.max_ms:
+            st.max_ms = elapsed_ms
+
+        if elapsed_ms >= self.slow_ms:
+            st.slow_calls += 1
+            self._on_slow(name, statement, parameters, elapsed_ms, rows, executemany)
+
+    def _on_error(self, exception_context):
+        # 실패한 statement는 after_cursor_execute가 안 불림 -> 시작 시각만 버림 (집계하지 않음)
+        conn = exception_context.connection
+        if conn is None:
+            return
+        starts = conn.info.get("sql_profile_start")
+        if starts and starts[-1][0] is exception_context.execution_context:
+            starts.pop()
+
+    # -------------------------
+    # slow query
+    # -------------------------
+    def _on_slow(self, name, statement, parameters, elapsed_ms, rows, executemany) -> None:
+        entry = {
+            "name": name,
+            "took_ms": round(elapsed_ms, 3),
+            "rows": rows,
+            "statement": statement,
+            "params": _short_params(parameters),
+        }
+
+        now = time.monotonic()
+        want_explain = (
+            self.explain
+            and not executemany
+            and self._engine is not None
+            and statement.lstrip().upper().startswith(_EXPLAINABLE)
+            and now - self._last_explain.get(name, -self.explain_interval_sec) >= self.explain_interval_sec
+        )
+        if not want_explain:
+            _log_slow(entry)
+            return
+
+        self._last_explain[name] = now
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            _log_slow(entry)
+            return
+        # 같은 connection에서 EXPLAIN 하면 진행 중인 트랜잭션/결과셋에 끼어들게 되므로 별도 connection 사용
+        loop.create_task(self._explain_and_log(entry, statement, parameters))
+
+    async def _explain_and_log(self, entry: dict, statement: str, parameters) -> None:
+        try:
+            async with self._engine.connect() as conn:
+                conn = await conn.execution_options(sql_profile=False)
+                res = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+                entry["explain"] = [dict(r) for r in res.mappings().all()]
+        except Exception as e:
+            entry["explain_error"] = str(e)
+        _log_slow(entry)
+
+
+def _short_params(parameters, limit: int = 200):
+    def short(v):
+        if isinstance(v, (bytes, bytearray)):
+            return f"<{len(v)} bytes>"
+        if isinstance(v, str) and len(v) > limit:
+            return v[:limit] + "..."
+        return v
+
+    if isinstance(parameters, dict):
+        return {k: short(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            # executemany: 앞 몇 개만
+            return [_short_params(p, limit) for p in parameters[:3]]
+        return [short(v) for v in parameters]
+    return parameters
+
+
+def _log_slow(entry: dict) -> None:
+    logger.bind(slow_sql=True).warning(orjson.dumps(entry, default=str).decode())
+
+
+sql_profiler = SqlProfiler(
+    slow_ms=settings.SQL_SLOW_MS,
+    explain=settings.SQL_SLOW_EXPLAIN,
+    explain_interval_sec=settings.SQL_SLOW_EXPLAIN_INTERVAL_SEC,
+)
+
+
+def _collect_sql_metrics():
+    stats = list(sql_profiler._stats.values())
+    yield (
+        "apphub_sql_statement_calls_total", "counter", "SQL executions by named statement",
+        [({"statement": s.name}, s.calls) for s in stats],
+    )
+    yield (
+        "apphub_sql_statement_seconds_total", "counter", "SQL execution time by named statement",
+        [({"statement": s.name}, s.total_ms / 1000.0) for s in stats],
+    )
+
+
+metrics.add_collector(_collect_sql_metrics)
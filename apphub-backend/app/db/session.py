@@ -1,6 +1,28 @@
+import time
+
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import metrics
+
+_pool_acquire = metrics.histogram(
+    "apphub_db_pool_acquire_seconds",
+    "Time spent waiting for a pooled DB connection (includes new connection setup)",
+    ("pool",),
+).labels("main")
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """connection checkout 대기 시간을 메트릭으로 남기는 pool"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _pool_acquire.observe(time.perf_counter() - start)
+
 
 engine = create_async_engine(
     settings.DATABASE_URL_ASYNC,
@@ -8,6 +30,7 @@ engine = create_async_engine(
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
+    poolclass=TimedAsyncQueuePool,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -15,3 +38,15 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
     class_=AsyncSession,
 )
+
+
+def _collect_pool_metrics():
+    pool = engine.sync_engine.pool
+    labels = {"pool": "main"}
+    yield ("apphub_db_pool_size", "gauge", "Configured pool size", [(labels, pool.size())])
+    yield ("apphub_db_pool_checked_out", "gauge", "Connections currently checked out", [(labels, pool.checkedout())])
+    yield ("apphub_db_pool_checked_in", "gauge", "Idle connections in the pool", [(labels, pool.checkedin())])
+    yield ("apphub_db_pool_overflow", "gauge", "Connections opened beyond pool_size", [(labels, max(0, pool.overflow()))])
+
+
+metrics.add_collector(_collect_pool_metrics)
@@ -215,6 +215,7 @@ CREATE TABLE IF NOT EXISTS `hub_daily_metrics` (
   `dau` int NOT NULL,
   `page_open_count` int NOT NULL,
   `search_count` int NOT NULL,
+  `dau_hll` varbinary(8192) DEFAULT NULL,
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`metric_date`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -223,7 +224,7 @@ CREATE TABLE IF NOT EXISTS `hub_daily_metrics` (
 CREATE TABLE IF NOT EXISTS `jobs` (
   `id` bigint NOT NULL AUTO_INCREMENT,
   `user_id` bigint NOT NULL,
-  `job_type` enum('download','update','upload') NOT NULL,
+  `job_type` enum('download','update','upload','metrics_backfill') NOT NULL,
   `status` enum('queued','running','success','failed','canceled') NOT NULL,
   `progress` int NOT NULL DEFAULT '0',
   `message` varchar(1000) DEFAULT NULL,
@@ -290,10 +291,13 @@ CREATE TABLE IF NOT EXISTS `app_run_sessions` (
   `exit_code` int DEFAULT NULL,
   `end_reason` enum('user_exit','crash','killed','unknown') NOT NULL DEFAULT 'unknown',
   `client_ip` varchar(64) DEFAULT NULL,
+  `idempotency_key` varchar(64) DEFAULT NULL,
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
   KEY `fk_run_sessions_user` (`user_id`),
   KEY `fk_run_sessions_app` (`app_id`),
+  KEY `ix_run_sessions_started_id` (`started_at`, `id`),
+  KEY `ix_run_sessions_app_started_id` (`app_id`, `started_at`, `id`),
   CONSTRAINT `fk_run_sessions_app` FOREIGN KEY (`app_id`) REFERENCES `apps` (`id`),
   CONSTRAINT `fk_run_sessions_user` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -309,12 +313,24 @@ CREATE TABLE IF NOT EXISTS `app_action_events` (
   `duration_ms` bigint DEFAULT NULL,
   `severity` enum('info','warn','error') NOT NULL DEFAULT 'info',
   `meta_json` json DEFAULT NULL,
+  `idempotency_key` varchar(64) DEFAULT NULL,
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`),
+  UNIQUE KEY `uq_action_idempotency` (`session_id`, `idempotency_key`),
   KEY `fk_action_session` (`session_id`),
+  KEY `ix_action_events_occurred_id` (`occurred_at`, `id`),
+  KEY `ix_action_events_session_occurred_id` (`session_id`, `occurred_at`, `id`),
   CONSTRAINT `fk_action_session` FOREIGN KEY (`session_id`) REFERENCES `app_run_sessions` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+-- 18-1) app_run_session_keys: idempotency_key가 있는 세션 id (재시도 중복 판정, 파티셔닝 안 함)
+CREATE TABLE IF NOT EXISTS `app_run_session_keys` (
+  `session_id` varbinary(36) NOT NULL,
+  `created_at` datetime NOT NULL,
+  PRIMARY KEY (`session_id`),
+  KEY `ix_run_session_keys_created` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 -- 19) app_daily_metrics (FK -> apps)
 CREATE TABLE IF NOT EXISTS `app_daily_metrics` (
   `metric_date` date NOT NULL,
@@ -323,12 +339,30 @@ CREATE TABLE IF NOT EXISTS `app_daily_metrics` (
   `launch_count` int NOT NULL,
   `total_runtime_sec` bigint NOT NULL,
   `action_count` int NOT NULL,
+  `users_hll` varbinary(8192) DEFAULT NULL,
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`metric_date`,`app_id`),
   KEY `fk_app_daily_app` (`app_id`),
   CONSTRAINT `fk_app_daily_app` FOREIGN KEY (`app_id`) REFERENCES `apps` (`id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+-- 20) batch_runs (일 배치 실행 이력)
+CREATE TABLE IF NOT EXISTS `batch_runs` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `job_name` varchar(50) NOT NULL,
+  `metric_date` date NOT NULL,
+  `trigger` enum('schedule','manual') NOT NULL,
+  `status` enum('running','success','partial','failed') NOT NULL,
+  `worker` varchar(100) DEFAULT NULL,
+  `started_at` datetime(3) NOT NULL,
+  `finished_at` datetime(3) DEFAULT NULL,
+  `duration_ms` int DEFAULT NULL,
+  `message` varchar(1000) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `ix_batch_runs_job_date` (`job_name`, `metric_date`, `status`),
+  KEY `ix_batch_runs_started` (`started_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 -- --------------------
 -- Seed data (safe-ish)
 -- --------------------
@@ -0,0 +1,39 @@
+-- 001) app_run_sessions.id / app_action_events.session_id : char(36) -> BINARY(16)
+-- 적용 후 .env 에 SESSION_ID_BINARY=true (권장: SESSION_ID_VERSION=7 도 함께)
+-- - 기존 uuid4 문자열은 UUID_TO_BIN(id) 으로 그대로 변환 (swap flag 없음: 앱이 uuid.UUID.bytes 와 같은 바이트 순서 사용)
+-- - API 응답/요청의 session_id 형식(36자 문자열)은 변하지 않음
+-- - 002_idempotency_key.sql 이 이미 적용돼 있다면 uq_action_idempotency 를 먼저 DROP 하고 마지막에 다시 만들 것
+--   (session_id 컬럼을 지우면 복합 unique index가 idempotency_key 단독으로 바뀜)
+-- - 대용량 테이블은 pt-online-schema-change / gh-ost 등으로 나눠 적용 권장 (아래는 단순 버전, 점검 시간에 실행)
+
+USE `AppHub`;
+
+SET FOREIGN_KEY_CHECKS=0;
+
+ALTER TABLE `app_action_events` DROP FOREIGN KEY `fk_action_session`;
+
+-- 1) app_run_sessions.id
+ALTER TABLE `app_run_sessions` ADD COLUMN `id_bin` BINARY(16) NULL FIRST;
+UPDATE `app_run_sessions` SET `id_bin` = UUID_TO_BIN(`id`);
+ALTER TABLE `app_run_sessions`
+  DROP PRIMARY KEY,
+  DROP COLUMN `id`;
+ALTER TABLE `app_run_sessions`
+  CHANGE COLUMN `id_bin` `id` BINARY(16) NOT NULL FIRST,
+  ADD PRIMARY KEY (`id`);
+
+-- 2) app_action_events.session_id
+ALTER TABLE `app_action_events` ADD COLUMN `session_id_bin` BINARY(16) NULL AFTER `session_id`;
+UPDATE `app_action_events` SET `session_id_bin` = UUID_TO_BIN(`session_id`);
+ALTER TABLE `app_action_events`
+  DROP INDEX `fk_action_session`,
+  DROP COLUMN `session_id`;
+ALTER TABLE `app_action_events`
+  CHANGE COLUMN `session_id_bin` `session_id` BINARY(16) NOT NULL AFTER `id`,
+  ADD KEY `fk_action_session` (`session_id`),
+  ADD CONSTRAINT `fk_action_session` FOREIGN KEY (`session_id`) REFERENCES `app_run_sessions` (`id`);
+
+SET FOREIGN_KEY_CHECKS=1;
+
+-- 되돌리기 (SESSION_ID_BINARY=false 로 바꾼 뒤)
+-- BIN_TO_UUID(`id`) / BIN_TO_UUID(`session_id`) 로 char(36) 컬럼을 같은 방식으로 다시 만든다
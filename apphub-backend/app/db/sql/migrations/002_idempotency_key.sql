@@ -0,0 +1,25 @@
+-- 002) 재시도 중복 방지용 idempotency_key (RunSessionStart / ActionEventCreate.idempotency_key)
+-- - 세션: 키가 있으면 session id 자체를 (app_id, knox_id, idempotency_key)로 만듦
+--   (app_event_service.idempotent_session_id) -> 재시도 중복은 app_run_session_keys PK가 판정, 컬럼은 기록/조회용
+--   (키 단독 unique는 다른 client가 같은 키를 보내면 서로의 세션으로 묶이므로 두지 않음)
+--   app_run_session_keys는 파티셔닝하지 않는 작은 테이블: 003 적용 후 app_run_sessions PK가 (id, started_at)이
+--   되어도 서버가 started_at을 정한 재시도까지 막음 (보관 기간은 PARTITION_RETAIN_MONTHS와 같이 정리)
+--   session_id는 저장 방식(char(36) / 001의 BINARY(16))과 무관하게 담기도록 varbinary
+-- - action 키는 세션 안에서만 유일하면 됨 (session_id, idempotency_key)
+-- - NULL은 unique 비교 대상이 아니므로 키 없이 보내는 기존 agent는 영향 없음
+
+USE `AppHub`;
+
+ALTER TABLE `app_run_sessions`
+  ADD COLUMN `idempotency_key` varchar(64) DEFAULT NULL AFTER `client_ip`;
+
+CREATE TABLE IF NOT EXISTS `app_run_session_keys` (
+  `session_id` varbinary(36) NOT NULL,
+  `created_at` datetime NOT NULL,
+  PRIMARY KEY (`session_id`),
+  KEY `ix_run_session_keys_created` (`created_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+ALTER TABLE `app_action_events`
+  ADD COLUMN `idempotency_key` varchar(64) DEFAULT NULL AFTER `meta_json`,
+  ADD UNIQUE KEY `uq_action_idempotency` (`session_id`, `idempotency_key`);
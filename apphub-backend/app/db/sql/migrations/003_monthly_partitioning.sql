@@ -0,0 +1,70 @@
+-- 003) hub_events / app_run_sessions / app_action_events 월 단위 RANGE 파티셔닝
+-- 적용 후 .env 에 PARTITION_MAINTENANCE_ENABLED=true
+-- (partition_service가 월 파티션을 미리 만들고, 보관 기간 지난 파티션은 archive 테이블로 EXCHANGE 후 DROP)
+--
+-- MySQL 파티셔닝 제약 때문에 바뀌는 점
+-- - 파티션 테이블은 FK를 가질 수도, 참조될 수도 없음 -> 아래 FK 제거
+--   (세션 존재 확인은 앱(app_event_service 세션 캐시/SELECT)에서만 보장,
+--    세션 삭제 시 action은 delete_run_session이 같은 transaction에서 함께 삭제,
+--    다른 worker의 세션 캐시가 남은 동안(SESSION_CACHE_TTL_SEC) 삭제된 세션으로 들어온 action은 막지 못함)
+-- - 세션 idempotency 중복 판정은 파티셔닝하지 않는 app_run_session_keys(002)가 담당
+-- - 모든 PK/UNIQUE에 파티션 컬럼이 포함돼야 함
+--   -> PK: (id, occurred_at|started_at)
+--   -> action idempotency_key unique에도 occurred_at 포함: DB 차원 중복 판정은 재시도가 같은
+--      occurred_at을 보낼 때만 유효 (메모리 창은 그대로 동작)
+-- - id 단독 조회(WHERE id = ?)는 파티션마다 PK 탐색 1번씩 (보관 개월 수만큼)
+--
+-- 시작 파티션: p_history(이번 달 1일 미만 전체) + pmax
+-- 적용 직후 POST /api/metrics/partitions/maintain 으로 월 파티션 생성
+
+USE `AppHub`;
+
+-- 1) FK 제거
+ALTER TABLE `app_action_events` DROP FOREIGN KEY `fk_action_session`;
+ALTER TABLE `app_run_sessions` DROP FOREIGN KEY `fk_run_sessions_app`;
+ALTER TABLE `app_run_sessions` DROP FOREIGN KEY `fk_run_sessions_user`;
+ALTER TABLE `hub_events` DROP FOREIGN KEY `fk_hub_events_user`;
+
+-- 2) PK / UNIQUE에 파티션 컬럼 추가
+ALTER TABLE `hub_events`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `occurred_at`);
+
+ALTER TABLE `app_run_sessions`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `started_at`);
+
+ALTER TABLE `app_action_events`
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (`id`, `occurred_at`),
+  DROP INDEX `uq_action_idempotency`,
+  ADD UNIQUE KEY `uq_action_idempotency` (`session_id`, `idempotency_key`, `occurred_at`);
+
+-- 3) 파티셔닝 (경계는 실행 시점의 이번 달 1일)
+SET @month_start = DATE_FORMAT(CURDATE(), '%Y-%m-01');
+
+SET @ddl = CONCAT(
+  'ALTER TABLE `hub_events` PARTITION BY RANGE COLUMNS(`occurred_at`) (',
+  'PARTITION p_history VALUES LESS THAN (''', @month_start, '''), ',
+  'PARTITION pmax VALUES LESS THAN (MAXVALUE))'
+);
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+SET @ddl = CONCAT(
+  'ALTER TABLE `app_run_sessions` PARTITION BY RANGE COLUMNS(`started_at`) (',
+  'PARTITION p_history VALUES LESS THAN (''', @month_start, '''), ',
+  'PARTITION pmax VALUES LESS THAN (MAXVALUE))'
+);
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+SET @ddl = CONCAT(
+  'ALTER TABLE `app_action_events` PARTITION BY RANGE COLUMNS(`occurred_at`) (',
+  'PARTITION p_history VALUES LESS THAN (''', @month_start, '''), ',
+  'PARTITION pmax VALUES LESS THAN (MAXVALUE))'
+);
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+-- 확인
+-- SELECT TABLE_NAME, PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+-- FROM information_schema.PARTITIONS
+-- WHERE TABLE_SCHEMA = 'AppHub' AND TABLE_NAME IN ('hub_events', 'app_run_sessions', 'app_action_events');
@@ -0,0 +1,7 @@
+-- 004) 지표 backfill 작업을 jobs 테이블로 진행률 보고 (POST /api/metrics/daily/backfill)
+-- - job_type에 metrics_backfill 추가 (기존 값 순서 유지 -> 기존 행 영향 없음)
+
+USE `AppHub`;
+
+ALTER TABLE `jobs`
+  MODIFY COLUMN `job_type` enum('download','update','upload','metrics_backfill') NOT NULL;
@@ -0,0 +1,21 @@
+-- 005) 일 배치 실행 이력 (app 내장 스케줄러 / POST /api/metrics/daily/run)
+-- - GET_LOCK을 잡은 worker만 실행, 실행마다 1행 (worker 식별자, 소요 시간)
+-- - partial: UTC 기준 그날이 끝나기 전에 계산한 결과 (스케줄러가 다음에 다시 계산)
+
+USE `AppHub`;
+
+CREATE TABLE IF NOT EXISTS `batch_runs` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `job_name` varchar(50) NOT NULL,
+  `metric_date` date NOT NULL,
+  `trigger` enum('schedule','manual') NOT NULL,
+  `status` enum('running','success','partial','failed') NOT NULL,
+  `worker` varchar(100) DEFAULT NULL,
+  `started_at` datetime(3) NOT NULL,
+  `finished_at` datetime(3) DEFAULT NULL,
+  `duration_ms` int DEFAULT NULL,
+  `message` varchar(1000) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `ix_batch_runs_job_date` (`job_name`, `metric_date`, `status`),
+  KEY `ix_batch_runs_started` (`started_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
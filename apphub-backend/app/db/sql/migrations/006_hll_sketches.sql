@@ -0,0 +1,12 @@
+-- 006) 일 지표에 고유 사용자 HyperLogLog sketch (app/utils/hll.py, p=12)
+-- - run_daily_batch가 채움 (이전 날짜는 POST /api/metrics/daily/backfill로 다시 계산)
+-- - 헤더 2byte + zlib(register 4096byte): 대부분 수십 byte ~ 2KB
+-- - sketch를 합쳐 WAU/MAU/임의 기간 고유 사용자 근사 (GET /api/metrics/hub/uniques, /apps/uniques)
+
+USE `AppHub`;
+
+ALTER TABLE `hub_daily_metrics`
+  ADD COLUMN `dau_hll` varbinary(8192) DEFAULT NULL AFTER `search_count`;
+
+ALTER TABLE `app_daily_metrics`
+  ADD COLUMN `users_hll` varbinary(8192) DEFAULT NULL AFTER `action_count`;
@@ -0,0 +1,15 @@
+-- 007) 목록 API keyset(cursor) 페이지네이션용 (정렬 키, id) 인덱스
+-- - /app-events/admin/sessions: ORDER BY started_at DESC, id DESC
+-- - /app-events/admin/actions:  ORDER BY occurred_at DESC, id DESC
+-- - hub_events / jobs / category_access / app_access는 id DESC라 PK(필터가 있으면 user_id 인덱스 + PK)로 충분
+-- - app_id / session_id 필터와 같이 쓰는 경우를 위해 필터 컬럼 선두 인덱스도 추가
+
+USE `AppHub`;
+
+ALTER TABLE `app_run_sessions`
+  ADD KEY `ix_run_sessions_started_id` (`started_at`, `id`),
+  ADD KEY `ix_run_sessions_app_started_id` (`app_id`, `started_at`, `id`);
+
+ALTER TABLE `app_action_events`
+  ADD KEY `ix_action_events_occurred_id` (`occurred_at`, `id`),
+  ADD KEY `ix_action_events_session_occurred_id` (`session_id`, `occurred_at`, `id`);
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from app.core.config import settings
 from app.core.logging import setup_logging, RequestResponseLoggingMiddleware
+from app.core.access_log import access_log
 from app.api.routers import api_router
 from app.db.init_db import init_db_if_needed
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,8 +10,18 @@ from fastapi import Request
 from fastapi.responses import ORJSONResponse
 from sqlalchemy.exc import SQLAlchemyError
 from loguru import logger
-from app.db.session import engine
+from app.db.session import AsyncSessionLocal, engine
+from app.db.profiler import sql_profiler
+from app.services.batch_scheduler import batch_scheduler
+from app.services.partition_service import run_partition_maintenance
+from app.services.realtime_metrics import realtime_metrics
+from app.services.telemetry_buffer import telemetry_buffer
+from app.services.telemetry_spool import telemetry_spool
+from app.services.user_service import knox_id_warmer
+from app import services as services_pkg
 import asyncio
+import importlib
+import pkgutil
 from fastapi.staticfiles import StaticFiles
 
 def create_app() -> FastAPI:
@@ -35,8 +46,16 @@ def create_app() -> FastAPI:
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 목록 API keyset 페이지네이션 토큰 (브라우저 JS에서 읽을 수 있게)
+    expose_headers=["X-Next-Cursor"],
     )
 
+    # services의 SQL_* 상수 이름으로 쿼리 시간/호출 수 집계
+    if settings.SQL_PROFILE_ENABLED:
+        for mod in pkgutil.iter_modules(services_pkg.__path__, "app.services."):
+            sql_profiler.register_module(importlib.import_module(mod.name))
+        sql_profiler.install(engine)
+
     app.include_router(api_router, prefix="/api")
     # 정적 파일 서빙 설정
     # ex) http://127.0.0.1:8500/api/static/images/AgentTray.png
@@ -45,11 +64,32 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     async def _startup():
         await init_db_if_needed()
+        # 아침 실행 몰림 대비: knox_id -> user_id 캐시 미리 적재 + 주기적 재적재 (실패해도 기동은 계속)
+        await knox_id_warmer.start()
+        # 이벤트 테이블 월 파티션 롤오버 (실패해도 기동은 계속)
+        if settings.PARTITION_MAINTENANCE_ENABLED:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await run_partition_maintenance(db)
+            except Exception as e:
+                logger.warning(f"[PARTITION] maintenance skipped: {e}")
+        await telemetry_spool.start()
+        await telemetry_buffer.start()
+        await realtime_metrics.start()
+        await batch_scheduler.start()
 
     @app.on_event("shutdown")
     async def _shutdown():
         await asyncio.sleep(0)
+        await batch_scheduler.stop()
+        await knox_id_warmer.stop()
+        # write-behind queue에 남은 텔레메트리 flush 후 engine 정리
+        await telemetry_buffer.stop()
+        await telemetry_spool.stop()
+        await realtime_metrics.stop()
         await engine.dispose()
+        # 남은 access 로그 flush
+        access_log.stop()
 
     # create_app() 안에 추가
     @app.exception_handler(SQLAlchemyError)
@@ -8,6 +8,7 @@ class JobType(str, enum.Enum):
     download = "download"
     update = "update"
     upload = "upload"
+    metrics_backfill = "metrics_backfill"
 
 class JobStatus(str, enum.Enum):
     queued = "queued"
@@ -1,4 +1,6 @@
-from sqlalchemy import BigInteger, Integer, Date, DateTime, ForeignKey
+import enum
+from sqlalchemy import BigInteger, Integer, Date, DateTime, ForeignKey, String, VARBINARY, Enum as SAEnum
+from sqlalchemy.dialects.mysql import DATETIME
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -10,6 +12,7 @@ class HubDailyMetric(Base):
     dau: Mapped[int] = mapped_column(Integer, nullable=False)
     page_open_count: Mapped[int] = mapped_column(Integer, nullable=False)
     search_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    dau_hll: Mapped[bytes | None] = mapped_column(VARBINARY(8192), nullable=True)
     created_at: Mapped[str] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
 class AppDailyMetric(Base):
@@ -22,5 +25,30 @@ class AppDailyMetric(Base):
     launch_count: Mapped[int] = mapped_column(Integer, nullable=False)
     total_runtime_sec: Mapped[int] = mapped_column(BigInteger, nullable=False)
     action_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    users_hll: Mapped[bytes | None] = mapped_column(VARBINARY(8192), nullable=True)
 
     created_at: Mapped[str] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
+class BatchTrigger(str, enum.Enum):
+    schedule = "schedule"
+    manual = "manual"
+
+class BatchStatus(str, enum.Enum):
+    running = "running"
+    success = "success"
+    partial = "partial"
+    failed = "failed"
+
+class BatchRun(Base):
+    __tablename__ = "batch_runs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    job_name: Mapped[str] = mapped_column(String(50), nullable=False)
+    metric_date: Mapped[str] = mapped_column(Date, nullable=False)
+    trigger: Mapped[BatchTrigger] = mapped_column(SAEnum(BatchTrigger), nullable=False)
+    status: Mapped[BatchStatus] = mapped_column(SAEnum(BatchStatus), nullable=False)
+    worker: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    started_at: Mapped[str] = mapped_column(DATETIME(fsp=3), nullable=False)
+    finished_at: Mapped[str | None] = mapped_column(DATETIME(fsp=3), nullable=True)
+    duration_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    message: Mapped[str | None] = mapped_column(String(1000), nullable=True)
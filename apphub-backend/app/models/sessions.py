@@ -1,5 +1,6 @@
 import enum
-from sqlalchemy import String, BigInteger, DateTime, ForeignKey, Enum as SAEnum, Integer
+from sqlalchemy import String, BigInteger, DateTime, ForeignKey, Enum as SAEnum, Integer, Index, UniqueConstraint
+from sqlalchemy.dialects.mysql import VARBINARY
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -17,6 +18,10 @@ class Severity(str, enum.Enum):
 
 class AppRunSession(Base):
     __tablename__ = "app_run_sessions"
+    __table_args__ = (
+        Index("ix_run_sessions_started_id", "started_at", "id"),
+        Index("ix_run_sessions_app_started_id", "app_id", "started_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)  # UUID
     user_id: Mapped[int | None] = mapped_column(BigInteger, ForeignKey("users.id"), nullable=True)
@@ -32,10 +37,26 @@ class AppRunSession(Base):
     end_reason: Mapped[EndReason] = mapped_column(SAEnum(EndReason), nullable=False, default=EndReason.unknown)
 
     client_ip: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[str] = mapped_column(DateTime, server_default=func.now(), nullable=False)
 
+class AppRunSessionKey(Base):
+    # idempotency_key가 있는 세션 id (재시도 중복 판정용, 파티셔닝 안 함)
+    __tablename__ = "app_run_session_keys"
+    __table_args__ = (
+        Index("ix_run_session_keys_created", "created_at"),
+    )
+
+    session_id: Mapped[bytes] = mapped_column(VARBINARY(36), primary_key=True)
+    created_at: Mapped[str] = mapped_column(DateTime, nullable=False)
+
 class AppActionEvent(Base):
     __tablename__ = "app_action_events"
+    __table_args__ = (
+        UniqueConstraint("session_id", "idempotency_key", name="uq_action_idempotency"),
+        Index("ix_action_events_occurred_id", "occurred_at", "id"),
+        Index("ix_action_events_session_occurred_id", "session_id", "occurred_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     session_id: Mapped[str] = mapped_column(String(36), ForeignKey("app_run_sessions.id"), nullable=False)
@@ -49,5 +70,6 @@ class AppActionEvent(Base):
 
     severity: Mapped[Severity] = mapped_column(SAEnum(Severity), nullable=False, default=Severity.info)
     meta_json: Mapped[str | None] = mapped_column(String, nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     created_at: Mapped[str] = mapped_column(DateTime, server_default=func.now(), nullable=False)
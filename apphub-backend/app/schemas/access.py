@@ -2,6 +2,8 @@ from __future__ import annotations
 from pydantic import BaseModel
 from typing import Optional
 
+from app.schemas.common import partial_model
+
 class AccessRowOut(BaseModel):
     id: int
     user_id: int
@@ -11,6 +13,8 @@ class AccessRowOut(BaseModel):
     approved_at: Optional[str] = None
     note: Optional[str] = None
 
+AccessRowListItem = partial_model(AccessRowOut)  # 목록 응답 (?fields=로 고른 필드만)
+
 class AccessDecision(BaseModel):
     status: str  # approved/rejected/revoked
     note: Optional[str] = None
@@ -11,11 +11,14 @@ class RunSessionStart(BaseModel):
     started_at: Optional[datetime] = None  # None이면 서버 NOW 처리 가능(여기선 기본값 사용)
     knox_id: Optional[str] = Field(default=None, description="헤더 없을 때 body로 보내도 됨")
     client_ip: Optional[str] = None        # 없으면 서버에서 request.client.host로 채움
+    # 재시도 중복 방지용 (같은 app_id + knox_id + 키로 다시 보내면 처음 만든 session_id 반환)
+    idempotency_key: Optional[str] = Field(default=None, min_length=8, max_length=64)
 
 
 class RunSessionStartResponse(BaseModel):
     ok: bool = True
     session_id: str
+    duplicate: bool = False                # true면 같은 idempotency_key로 이미 만든 세션
 
 
 class RunSessionEnd(BaseModel):
@@ -33,8 +36,32 @@ class ActionEventCreate(BaseModel):
     duration_ms: Optional[int] = None
     severity: Literal["info", "warn", "error"] = "info"
     meta_json: Optional[Dict[str, Any]] = None
+    # 재시도 중복 방지용 (세션 안에서 유일)
+    idempotency_key: Optional[str] = Field(default=None, min_length=8, max_length=64)
 
 
 class ActionEventResponse(BaseModel):
     ok: bool = True
-    action_event_id: int
+    action_event_id: Optional[int] = None  # write-behind 모드에서는 아직 id 없음
+    queued: bool = False                   # true면 write-behind queue에 적재됨
+    duplicate: bool = False                # true면 같은 idempotency_key로 이미 저장됨
+
+
+class ActionEventBatchItem(ActionEventCreate):
+    # 여러 세션이 섞인 batch용 (/app-events/actions/batch)
+    session_id: str = Field(..., max_length=36)
+
+
+class ActionEventBatchResult(BaseModel):
+    index: int                      # 요청 배열에서의 위치
+    ok: bool
+    error: Optional[str] = None
+    duplicate: bool = False         # 이미 저장된 idempotency_key (새로 저장하지 않음)
+
+
+class ActionEventBatchResponse(BaseModel):
+    ok: bool = True
+    accepted: int
+    rejected: int
+    queued: bool = False
+    results: list[ActionEventBatchResult]
@@ -2,6 +2,8 @@ from __future__ import annotations
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from app.schemas.common import partial_model
+
 class AppOut(BaseModel):
     id: int
     category_id: int
@@ -19,6 +21,8 @@ class AppOut(BaseModel):
     latest_version_id: Optional[int] = None
     created_by: int
 
+AppListItem = partial_model(AppOut)  # 목록 응답 (?fields=로 고른 필드만)
+
 class AppCreate(BaseModel):
     category_id: int
     app_key: str = Field(..., max_length=80)
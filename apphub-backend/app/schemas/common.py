@@ -1,4 +1,15 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, create_model
 
 class OkResponse(BaseModel):
     ok: bool = True
+
+
+def partial_model(model: type[BaseModel]) -> type[BaseModel]:
+    """
+    ?fields= 목록 응답용: 모든 필드 Optional (OpenAPI 스키마 / ListSerializer 검증용)
+    - 요청하지 않은 필드는 null이 아니라 응답에서 아예 빠짐
+    """
+    fields = {name: (Optional[f.annotation], None) for name, f in model.model_fields.items()}
+    return create_model(f"{model.__name__}Fields", **fields)
@@ -6,6 +6,8 @@ from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
+from app.schemas.common import partial_model
+
 
 # -------------------------
 # Hub Events (hub_events)
@@ -28,10 +30,25 @@ class HubEventCreate(BaseModel):
     occurred_at: datetime
     event_type: HubEventType
     page: HubPage
-    description: str | None = None
+    description: str | None = Field(default=None, max_length=500)
     meta_json: dict[str, Any] | None = None
 
 
+class HubEventBeacon(BaseModel):
+    """
+    프론트 navigator.sendBeacon용 batch (POST /hub-events/beacon)
+    - sendBeacon은 헤더를 못 붙이므로 knox_id를 body로 받음 (x-knox-id 헤더도 허용)
+    - events는 항목별로 HubEventCreate 검증 (잘못된 항목만 버림)
+    """
+    knox_id: str | None = Field(default=None, max_length=64)
+    events: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class HubEventBeaconResponse(BaseModel):
+    accepted: int
+    rejected: int
+
+
 class HubEventOut(BaseModel):
     id: int
     occurred_at: datetime
@@ -43,6 +60,9 @@ class HubEventOut(BaseModel):
     created_at: datetime
 
 
+HubEventListItem = partial_model(HubEventOut)  # 목록 응답 (?fields=로 고른 필드만)
+
+
 class HubEventUpdate(BaseModel):
     occurred_at: datetime | None = None
     description: str | None = None
@@ -92,6 +112,9 @@ class AppRunSessionOut(BaseModel):
     created_at: datetime
 
 
+AppRunSessionListItem = partial_model(AppRunSessionOut)  # 목록 응답 (?fields=로 고른 필드만)
+
+
 class AppEventUpdate(BaseModel):
     """
     (Admin/Maintainer) 세션/액션 이벤트를 정정할 때 공통 사용 (MVP)
@@ -134,3 +157,6 @@ class AppActionEventOut(BaseModel):
     severity: str
     meta_json: dict[str, Any] | None = None
     created_at: datetime
+
+
+AppActionEventListItem = partial_model(AppActionEventOut)  # 목록 응답 (?fields=로 고른 필드만)
@@ -2,6 +2,8 @@ from __future__ import annotations
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from app.schemas.common import partial_model
+
 class JobOut(BaseModel):
     id: int
     user_id: int
@@ -10,9 +12,11 @@ class JobOut(BaseModel):
     progress: int
     message: Optional[str] = None
 
+JobListItem = partial_model(JobOut)  # 목록 응답 (?fields=로 고른 필드만)
+
 class JobCreate(BaseModel):
     user_id: int
-    job_type: str = Field(..., description="download/update/upload")
+    job_type: str = Field(..., description="download/update/upload/metrics_backfill")
     status: str = Field(default="queued", description="queued/running/success/failed/canceled")
     progress: int = 0
     message: Optional[str] = None
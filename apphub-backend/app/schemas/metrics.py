@@ -1,4 +1,54 @@
-from pydantic import BaseModel
+from datetime import date
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
 
 class BatchRunRequest(BaseModel):
     metric_date: str  # 'YYYY-MM-DD'
+
+class BackfillRequest(BaseModel):
+    date_from: date                 # 시작일 (포함)
+    date_to: date                   # 종료일 (포함)
+    parallelism: Optional[int] = Field(default=None, ge=1)  # 없으면 METRICS_BACKFILL_PARALLELISM
+
+    @model_validator(mode="after")
+    def _check_range(self):
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must be >= date_from")
+        return self
+
+
+Granularity = Literal["day", "week", "month"]
+# range: 요청 기간 전체를 1개 구간으로 (임의 기간 고유 사용자)
+UniquesGranularity = Literal["day", "week", "month", "range"]
+
+
+class HubSeriesPoint(BaseModel):
+    bucket: date                    # 구간 시작일 (week: 월요일, month: 1일)
+    days: int                       # 구간 안에서 지표가 있는 일수
+    dau_avg: float
+    dau_max: int
+    page_open_count: int
+    search_count: int
+
+
+class AppSeriesPoint(BaseModel):
+    bucket: date
+    app_id: int
+    days: int
+    unique_users_avg: float
+    unique_users_max: int
+    launch_count: int
+    total_runtime_sec: int
+    action_count: int
+
+
+class UniquesPoint(BaseModel):
+    bucket: date
+    days: int                       # 구간 안에서 지표 행이 있는 일수
+    sketch_days: int                # 그중 HLL sketch가 있는 일수 (days보다 작으면 빠진 날짜 있음)
+    users: Optional[int] = None     # 고유 사용자 근사값 (sketch 없으면 None)
+
+
+class AppUniquesPoint(UniquesPoint):
+    app_id: int
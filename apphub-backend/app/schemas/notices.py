@@ -4,6 +4,8 @@ from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
+from app.schemas.common import partial_model
+
 
 class NoticeOut(BaseModel):
     id: int
@@ -20,6 +22,9 @@ class NoticeOut(BaseModel):
     created_at: datetime
 
 
+NoticeListItem = partial_model(NoticeOut)  # 목록 응답 (?fields=로 고른 필드만)
+
+
 class NoticeCreate(BaseModel):
     scope: str = Field(..., description="all/apphub/category/app")
     title: str
@@ -2,12 +2,27 @@ from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.services.query_builder import ListQuery
+
+# 목록 필드 (AccessRowOut)
+ACCESS_COLUMNS = {
+    "id": "id",
+    "user_id": "user_id",
+    "status": "status",
+    "requested_at": "requested_at",
+    "approved_by": "approved_by",
+    "approved_at": "approved_at",
+    "note": "note",
+}
+
 # category_access
-SQL_LIST_CAT = text("""
-SELECT * FROM category_access
-ORDER BY id DESC
-LIMIT :limit OFFSET :offset
-""")
+SQL_LIST_CAT = ListQuery(
+    "access_service.SQL_LIST_CAT",
+    columns=ACCESS_COLUMNS,
+    from_="FROM category_access",
+    filters={"cursor_id": "id < :cursor_id"},
+    order_by="id DESC",
+)
 SQL_GET_CAT = text("SELECT * FROM category_access WHERE id=:id LIMIT 1")
 SQL_DECIDE_CAT = text("""
 UPDATE category_access
@@ -17,11 +32,13 @@ WHERE id=:id
 SQL_DELETE_CAT = text("DELETE FROM category_access WHERE id=:id")
 
 # app_access
-SQL_LIST_APP = text("""
-SELECT * FROM app_access
-ORDER BY id DESC
-LIMIT :limit OFFSET :offset
-""")
+SQL_LIST_APP = ListQuery(
+    "access_service.SQL_LIST_APP",
+    columns=ACCESS_COLUMNS,
+    from_="FROM app_access",
+    filters={"cursor_id": "id < :cursor_id"},
+    order_by="id DESC",
+)
 SQL_GET_APP = text("SELECT * FROM app_access WHERE id=:id LIMIT 1")
 SQL_DECIDE_APP = text("""
 UPDATE app_access
@@ -30,8 +47,10 @@ WHERE id=:id
 """)
 SQL_DELETE_APP = text("DELETE FROM app_access WHERE id=:id")
 
-async def list_category_access(db: AsyncSession, limit: int, offset: int) -> list[dict]:
-    res = await db.execute(SQL_LIST_CAT, {"limit": int(limit), "offset": int(offset)})
+async def list_category_access(
+    db: AsyncSession, limit: int, offset: int, cursor_id: int | None = None, fields: tuple[str, ...] | None = None
+) -> list[dict]:
+    res = await SQL_LIST_CAT.execute(db, {"limit": int(limit), "offset": int(offset), "cursor_id": cursor_id}, fields=fields)
     return [dict(r) for r in res.mappings().all()]
 
 async def get_category_access(db: AsyncSession, row_id: int) -> dict | None:
@@ -47,8 +66,10 @@ async def delete_category_access(db: AsyncSession, row_id: int):
     await db.execute(SQL_DELETE_CAT, {"id": int(row_id)})
     await db.commit()
 
-async def list_app_access(db: AsyncSession, limit: int, offset: int) -> list[dict]:
-    res = await db.execute(SQL_LIST_APP, {"limit": int(limit), "offset": int(offset)})
+async def list_app_access(
+    db: AsyncSession, limit: int, offset: int, cursor_id: int | None = None, fields: tuple[str, ...] | None = None
+) -> list[dict]:
+    res = await SQL_LIST_APP.execute(db, {"limit": int(limit), "offset": int(offset), "cursor_id": cursor_id}, fields=fields)
     return [dict(r) for r in res.mappings().all()]
 
 async def get_app_access(db: AsyncSession, row_id: int) -> dict | None:
@@ -1,36 +1,66 @@
 # app/services/app_event_admin_service.py
 from __future__ import annotations
 
+from datetime import date
+from typing import AsyncIterator, Callable
+
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.services.app_event_service import forget_session, json_value, session_id_param, session_id_str
+from app.services.query_builder import ListQuery, Predicate, day_start
+
+
+def _action_row(row: dict) -> dict:
+    # 응답 schema 모양으로: session_id 문자열, meta_json은 문자열이 아닌 객체 (목록/export 공통)
+    if "meta_json" in row:
+        row["meta_json"] = json_value(row["meta_json"])
+    return _with_str_id(row, "session_id")
+
+
+def _with_str_id(row: dict, key: str) -> dict:
+    # SESSION_ID_BINARY=true면 BINARY(16) -> UUID 문자열 (?fields=로 빠진 경우는 그대로)
+    if key in row:
+        row[key] = session_id_str(row[key])
+    return row
+
 
 # -------------------------
 # Run sessions (app_run_sessions)
 # -------------------------
-SQL_LIST_RUN_SESSIONS = """
-SELECT
-  s.id,
-  s.user_id,
-  s.knox_id_raw,
-  s.app_id,
-  s.app_version,
-  s.started_at,
-  s.ended_at,
-  s.exit_code,
-  s.end_reason,
-  s.client_ip,
-  s.created_at
-FROM app_run_sessions s
-WHERE 1=1
-  AND (:app_id IS NULL OR s.app_id = :app_id)
-  AND (:user_id IS NULL OR s.user_id = :user_id)
-  AND (:knox_id_raw IS NULL OR s.knox_id_raw = :knox_id_raw)
-  AND (:date_from IS NULL OR s.started_at >= CONCAT(:date_from, ' 00:00:00'))
-  AND (:date_to   IS NULL OR s.started_at <  CONCAT(:date_to,   ' 00:00:00'))
-ORDER BY s.started_at DESC
-LIMIT :limit OFFSET :offset
-"""
+# 필터는 값이 있는 것만 WHERE에 붙음 (query_builder)
+# - 날짜: started_at 범위 (ix_run_sessions_started_id / app_id 있으면 ix_run_sessions_app_started_id)
+# - keyset: (started_at, id) < cursor
+SQL_LIST_RUN_SESSIONS = ListQuery(
+    "app_event_admin_service.SQL_LIST_RUN_SESSIONS",
+    columns={
+        "id": "s.id",
+        "user_id": "s.user_id",
+        "knox_id_raw": "s.knox_id_raw",
+        "app_id": "s.app_id",
+        "app_version": "s.app_version",
+        "started_at": "s.started_at",
+        "ended_at": "s.ended_at",
+        "exit_code": "s.exit_code",
+        "end_reason": "s.end_reason",
+        "client_ip": "s.client_ip",
+        "created_at": "s.created_at",
+    },
+    from_="FROM app_run_sessions s",
+    filters={
+        "app_id": "s.app_id = :app_id",
+        "user_id": "s.user_id = :user_id",
+        "knox_id_raw": "s.knox_id_raw = :knox_id_raw",
+        "date_from": "s.started_at >= :date_from",
+        "date_to": "s.started_at < :date_to",
+        "cursor_ts": "s.started_at < :cursor_ts OR (s.started_at = :cursor_ts AND s.id < :cursor_id)",
+    },
+    order_by="s.started_at DESC, s.id DESC",
+    required_fields=("id", "started_at"),
+)
 
 SQL_GET_RUN_SESSION = """
 SELECT
@@ -63,36 +93,53 @@ DELETE FROM app_run_sessions
 WHERE id = :session_id
 """
 
+# 003 파티셔닝 후에는 FK가 없어 세션만 지우면 action이 남음 -> 같은 transaction에서 먼저 삭제
+SQL_DELETE_RUN_SESSION_ACTIONS = """
+DELETE FROM app_action_events
+WHERE session_id = :session_id
+"""
+
+SQL_DELETE_RUN_SESSION_KEY = """
+DELETE FROM app_run_session_keys
+WHERE session_id = :session_id
+"""
+
 
 async def list_run_sessions(
     db: AsyncSession,
     app_id: int | None,
     user_id: int | None,
     knox_id_raw: str | None,
-    date_from: str | None,
-    date_to: str | None,
+    date_from: date | None,
+    date_to: date | None,
     limit: int,
     offset: int,
+    cursor_ts=None,
+    cursor_id: str | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> list[dict]:
-    res = await db.execute(
-        text(SQL_LIST_RUN_SESSIONS),
+    res = await SQL_LIST_RUN_SESSIONS.execute(
+        db,
         {
             "app_id": app_id,
             "user_id": user_id,
             "knox_id_raw": knox_id_raw,
-            "date_from": date_from,
-            "date_to": date_to,
+            "date_from": day_start(date_from),
+            "date_to": day_start(date_to),
             "limit": limit,
             "offset": offset,
+            "cursor_ts": cursor_ts,
+            "cursor_id": session_id_param(cursor_id),
         },
+        fields=fields,
     )
-    return [dict(r._mapping) for r in res.fetchall()]
+    return [_with_str_id(dict(r._mapping), "id") for r in res.fetchall()]
 
 
 async def get_run_session(db: AsyncSession, session_id: str) -> dict | None:
-    res = await db.execute(text(SQL_GET_RUN_SESSION), {"session_id": session_id})
+    res = await db.execute(text(SQL_GET_RUN_SESSION), {"session_id": session_id_param(session_id)})
     row = res.mappings().first()
-    return dict(row) if row else None
+    return _with_str_id(dict(row), "id") if row else None
 
 
 async def update_run_session(
@@ -105,7 +152,7 @@ async def update_run_session(
     await db.execute(
         text(SQL_UPDATE_RUN_SESSION),
         {
-            "session_id": session_id,
+            "session_id": session_id_param(session_id),
             "ended_at": ended_at,
             "exit_code": exit_code,
             "end_reason": end_reason,
@@ -115,37 +162,51 @@ async def update_run_session(
 
 
 async def delete_run_session(db: AsyncSession, session_id: str) -> None:
-    await db.execute(text(SQL_DELETE_RUN_SESSION), {"session_id": session_id})
+    # action -> idempotency 키 -> 세션 순으로 한 transaction (키도 지워서 같은 키로 다시 시작하면 새로 생성)
+    params = {"session_id": session_id_param(session_id)}
+    await db.execute(text(SQL_DELETE_RUN_SESSION_ACTIONS), params)
+    await db.execute(text(SQL_DELETE_RUN_SESSION_KEY), params)
+    await db.execute(text(SQL_DELETE_RUN_SESSION), params)
     await db.commit()
+    forget_session(session_id)
 
 
 # -------------------------
 # Action events (app_action_events)
 # -------------------------
-SQL_LIST_ACTION_EVENTS = """
-SELECT
-  e.id,
-  e.session_id,
-  e.occurred_at,
-  e.action_type,
-  e.action_name,
-  e.description,
-  e.duration_ms,
-  e.severity,
-  e.meta_json,
-  e.created_at
-FROM app_action_events e
-LEFT JOIN app_run_sessions s ON s.id = e.session_id
-WHERE 1=1
-  AND (:session_id IS NULL OR e.session_id = :session_id)
-  AND (:app_id IS NULL OR s.app_id = :app_id)
-  AND (:action_type IS NULL OR e.action_type = :action_type)
-  AND (:severity IS NULL OR e.severity = :severity)
-  AND (:date_from IS NULL OR e.occurred_at >= CONCAT(:date_from, ' 00:00:00'))
-  AND (:date_to   IS NULL OR e.occurred_at <  CONCAT(:date_to,   ' 00:00:00'))
-ORDER BY e.occurred_at DESC
-LIMIT :limit OFFSET :offset
-"""
+# app_id 필터가 있을 때만 세션 JOIN (목록 컬럼은 e.*만 사용)
+# 기본 필드에서 meta_json(JSON) 제외 -> ?fields=...,meta_json 또는 ?fields=* 로 요청
+SQL_LIST_ACTION_EVENTS = ListQuery(
+    "app_event_admin_service.SQL_LIST_ACTION_EVENTS",
+    columns={
+        "id": "e.id",
+        "session_id": "e.session_id",
+        "occurred_at": "e.occurred_at",
+        "action_type": "e.action_type",
+        "action_name": "e.action_name",
+        "description": "e.description",
+        "duration_ms": "e.duration_ms",
+        "severity": "e.severity",
+        "meta_json": "e.meta_json",
+        "created_at": "e.created_at",
+    },
+    from_="FROM app_action_events e",
+    filters={
+        "session_id": "e.session_id = :session_id",
+        "app_id": Predicate("s.app_id = :app_id", join="JOIN app_run_sessions s ON s.id = e.session_id"),
+        "action_type": "e.action_type = :action_type",
+        "severity": "e.severity = :severity",
+        "date_from": "e.occurred_at >= :date_from",
+        "date_to": "e.occurred_at < :date_to",
+        "cursor_ts": "e.occurred_at < :cursor_ts OR (e.occurred_at = :cursor_ts AND e.id < :cursor_id)",
+    },
+    order_by="e.occurred_at DESC, e.id DESC",
+    default_fields=(
+        "id", "session_id", "occurred_at", "action_type", "action_name",
+        "description", "duration_ms", "severity", "created_at",
+    ),
+    required_fields=("id", "occurred_at"),
+)
 
 SQL_GET_ACTION_EVENT = """
 SELECT
@@ -185,31 +246,40 @@ async def list_action_events(
     app_id: int | None,
     action_type: str | None,
     severity: str | None,
-    date_from: str | None,
-    date_to: str | None,
+    date_from: date | None,
+    date_to: date | None,
     limit: int,
     offset: int,
+    cursor_ts=None,
+    cursor_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> list[dict]:
-    res = await db.execute(
-        text(SQL_LIST_ACTION_EVENTS),
+    session_param = session_id_param(session_id)
+    if session_id is not None and session_param is None:
+        return []  # BINARY 모드에서 UUID 형식이 아닌 id -> 필터 무시되지 않도록 빈 결과
+    res = await SQL_LIST_ACTION_EVENTS.execute(
+        db,
         {
-            "session_id": session_id,
+            "session_id": session_param,
             "app_id": app_id,
             "action_type": action_type,
             "severity": severity,
-            "date_from": date_from,
-            "date_to": date_to,
+            "date_from": day_start(date_from),
+            "date_to": day_start(date_to),
             "limit": limit,
             "offset": offset,
+            "cursor_ts": cursor_ts,
+            "cursor_id": cursor_id,
         },
+        fields=fields,
     )
-    return [dict(r._mapping) for r in res.fetchall()]
+    return [_action_row(dict(r._mapping)) for r in res.fetchall()]
 
 
 async def get_action_event(db: AsyncSession, event_id: int) -> dict | None:
     res = await db.execute(text(SQL_GET_ACTION_EVENT), {"event_id": event_id})
     row = res.mappings().first()
-    return dict(row) if row else None
+    return _action_row(dict(row)) if row else None
 
 
 async def update_action_event(
@@ -236,3 +306,110 @@ async def update_action_event(
 async def delete_action_event(db: AsyncSession, event_id: int) -> None:
     await db.execute(text(SQL_DELETE_ACTION_EVENT), {"event_id": event_id})
     await db.commit()
+
+
+# -------------------------
+# Export (server-side cursor 스트리밍)
+# -------------------------
+# 목록과 같은 ListQuery를 LIMIT 없이 실행, yield_per 단위로 받아서 chunk로 넘김
+# - 요청 scope의 db session(get_db)은 응답 body 전송 전에 닫히므로 export 전용 session을 끝까지 유지
+# - export 1개가 전송이 끝날 때까지 connection 1개를 점유 -> EXPORT_MAX_CONCURRENT로 제한
+SESSION_EXPORT_COLUMNS = list(SQL_LIST_RUN_SESSIONS.all_fields)
+ACTION_EXPORT_COLUMNS = list(SQL_LIST_ACTION_EVENTS.all_fields)
+
+_exports_active = 0
+
+
+class ExportSlot:
+    """export 1개의 동시 실행 자리 (release는 여러 번 불러도 1번만 반영)"""
+
+    def __init__(self) -> None:
+        self._held = True
+
+    def release(self) -> None:
+        global _exports_active
+        if self._held:
+            self._held = False
+            _exports_active -= 1
+
+
+def acquire_export_slot() -> ExportSlot | None:
+    """
+    응답을 만들기 전에(endpoint에서) 자리 확보, 꽉 찼으면 None (-> 429)
+    - 기다리지 않음: 200 헤더를 보낸 뒤 body 생성기 안에서 대기하지 않도록
+    - 반환된 slot은 _stream_rows의 finally가 해제 (body를 시작하지 못한 응답은 endpoint 쪽 background가 해제)
+    """
+    global _exports_active
+    if _exports_active >= settings.EXPORT_MAX_CONCURRENT:
+        return None
+    _exports_active += 1
+    return ExportSlot()
+
+
+async def _stream_rows(
+    query: ListQuery, params: dict, chunk_rows: int, convert: Callable[[dict], dict], slot: ExportSlot
+) -> AsyncIterator[list[dict]]:
+    try:
+        async with AsyncSessionLocal() as db:
+            stmt, bound = query.bind(params, paged=False, fields=query.all_fields)
+            result = await db.stream(stmt, bound, execution_options={"yield_per": chunk_rows})
+            async for part in result.mappings().partitions():
+                yield [convert(dict(r)) for r in part]
+    finally:
+        slot.release()
+
+
+async def _no_rows(slot: ExportSlot) -> AsyncIterator[list[dict]]:
+    slot.release()
+    return
+    yield
+
+
+def stream_run_sessions(
+    app_id: int | None,
+    user_id: int | None,
+    knox_id_raw: str | None,
+    date_from: date | None,
+    date_to: date | None,
+    chunk_rows: int,
+    slot: ExportSlot,
+) -> AsyncIterator[list[dict]]:
+    params = {
+        "app_id": app_id,
+        "user_id": user_id,
+        "knox_id_raw": knox_id_raw,
+        "date_from": day_start(date_from),
+        "date_to": day_start(date_to),
+    }
+    return _stream_rows(SQL_LIST_RUN_SESSIONS, params, chunk_rows, lambda r: _with_str_id(r, "id"), slot)
+
+
+def stream_action_events(
+    session_id: str | None,
+    app_id: int | None,
+    action_type: str | None,
+    severity: str | None,
+    date_from: date | None,
+    date_to: date | None,
+    chunk_rows: int,
+    slot: ExportSlot,
+) -> AsyncIterator[list[dict]]:
+    session_param = session_id_param(session_id)
+    if session_id is not None and session_param is None:
+        return _no_rows(slot)
+    params = {
+        "session_id": session_param,
+        "app_id": app_id,
+        "action_type": action_type,
+        "severity": severity,
+        "date_from": day_start(date_from),
+        "date_to": day_start(date_to),
+    }
+    return _stream_rows(SQL_LIST_ACTION_EVENTS, params, chunk_rows, _action_row, slot)
+
+
+def _collect_export_metrics():
+    yield ("apphub_exports_active", "gauge", "Export streams currently holding a DB connection", [({}, _exports_active)])
+
+
+metrics.add_collector(_collect_export_metrics)
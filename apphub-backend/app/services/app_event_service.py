@@ -2,18 +2,48 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from typing import Iterable
 
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
+
+from app.core.cache import TTLCache, register_cache
+from app.core.config import settings
+from app.services.db_helpers import insert_returning_id
+from app.utils.uuid7 import uuid7
 
 
 SQL_CREATE_SESSION = text("""
 INSERT INTO app_run_sessions
-(id, user_id, knox_id_raw, app_id, app_version, started_at, client_ip)
+(id, user_id, knox_id_raw, app_id, app_version, started_at, client_ip, idempotency_key)
+VALUES
+(:id, :user_id, :knox_id_raw, :app_id, :app_version, :started_at, :client_ip, :idempotency_key)
+""")
+
+# write-behind flush / spool replay용: 중복 키(같은 idempotency_key로 만든 같은 id)만 batch 전체 실패 대신 skip
+# - INSERT IGNORE는 길이 초과/enum/NOT NULL 오류까지 경고로 바꿔 행을 고치거나 버리므로 쓰지 않음
+SQL_CREATE_SESSION_DEDUP = text("""
+INSERT INTO app_run_sessions
+(id, user_id, knox_id_raw, app_id, app_version, started_at, client_ip, idempotency_key)
 VALUES
-(:id, :user_id, :knox_id_raw, :app_id, :app_version, :started_at, :client_ip)
+(:id, :user_id, :knox_id_raw, :app_id, :app_version, :started_at, :client_ip, :idempotency_key)
+ON DUPLICATE KEY UPDATE id = id
 """)
 
+# 키 있는 세션의 중복 판정 (파티셔닝 안 된 app_run_session_keys PK)
+# - 003 이후 app_run_sessions PK는 (id, started_at) -> 서버가 started_at을 정한 재시도는 세션 PK로 못 막음
+SQL_INSERT_SESSION_KEY = text("""
+INSERT INTO app_run_session_keys (session_id, created_at)
+VALUES (:id, NOW())
+""")
+
+SQL_EXISTING_SESSION_KEYS = text("""
+SELECT session_id
+FROM app_run_session_keys
+WHERE session_id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
 SQL_END_SESSION = text("""
 UPDATE app_run_sessions
 SET ended_at = :ended_at,
@@ -29,14 +59,124 @@ WHERE id = :id
 LIMIT 1
 """)
 
+SQL_EXISTING_SESSION_IDS = text("""
+SELECT id
+FROM app_run_sessions
+WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
 SQL_INSERT_ACTION = text("""
 INSERT INTO app_action_events
-(session_id, occurred_at, action_type, action_name, description, duration_ms, severity, meta_json)
+(session_id, occurred_at, action_type, action_name, description, duration_ms, severity, meta_json, idempotency_key)
 VALUES
-(:session_id, :occurred_at, :action_type, :action_name, :description, :duration_ms, :severity, :meta_json)
+(:session_id, :occurred_at, :action_type, :action_name, :description, :duration_ms, :severity, :meta_json, :idempotency_key)
 """)
 
-SQL_LAST_INSERT_ID = text("SELECT LAST_INSERT_ID()")
+SQL_INSERT_ACTION_DEDUP = text("""
+INSERT INTO app_action_events
+(session_id, occurred_at, action_type, action_name, description, duration_ms, severity, meta_json, idempotency_key)
+VALUES
+(:session_id, :occurred_at, :action_type, :action_name, :description, :duration_ms, :severity, :meta_json, :idempotency_key)
+ON DUPLICATE KEY UPDATE id = id
+""")
+
+SQL_ACTION_BY_IDEMPOTENCY_KEY = text("""
+SELECT id
+FROM app_action_events
+WHERE session_id = :session_id AND idempotency_key = :idempotency_key
+LIMIT 1
+""")
+
+SQL_ACTION_IDEMPOTENCY_KEYS = text("""
+SELECT session_id, idempotency_key
+FROM app_action_events
+WHERE session_id IN :ids AND idempotency_key IN :keys
+""").bindparams(bindparam("ids", expanding=True), bindparam("keys", expanding=True))
+
+# 이 프로세스에서 생성/확인한 세션 id 캐시: session_id -> 존재 여부(bool)
+# - action/end 요청의 존재 확인 SELECT 생략용 (최종 안전망은 FK 제약, 003 파티셔닝 후에는 FK 없음)
+# - 없는 id도 짧게(SESSION_CACHE_NEGATIVE_TTL_SEC) 캐시해서 잘못된 id 반복 조회 방지
+_session_cache = register_cache(
+    "run_session",
+    TTLCache(max_size=settings.SESSION_CACHE_MAX_SIZE, ttl_sec=settings.SESSION_CACHE_TTL_SEC),
+)
+
+# 재시도 중복 제거용 최근 idempotency key 창: (종류, ..., key) -> 처음 요청의 결과(session_id / action_event_id)
+# - 창에서 빠진(오래됐거나 다른 프로세스) 재시도는 DB unique index가 최종 판정
+_idempotency_window = register_cache(
+    "idempotency",
+    TTLCache(max_size=settings.IDEMPOTENCY_WINDOW_SIZE, ttl_sec=settings.IDEMPOTENCY_WINDOW_SEC),
+)
+
+
+def json_param(value: dict | None) -> str | None:
+    # JSON 컬럼은 문자열로 바인딩 (드라이버가 dict를 그대로 escape하지 못함)
+    return orjson.dumps(value).decode() if value is not None else None
+
+
+def json_value(value):
+    # JSON 컬럼 조회 값: text() 쿼리는 드라이버가 문자열로 돌려줌 -> dict
+    return orjson.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+# idempotent_session_id용 고정 namespace (바꾸면 배포 전후 재시도가 다른 id가 됨)
+_SESSION_KEY_NAMESPACE = uuid.UUID("8b64b7fb-9b55-5451-b92c-b33a0cf0b578")
+
+
+def new_session_id() -> str:
+    # SESSION_ID_VERSION=7이면 시간 순 id (PK 뒤쪽에만 INSERT -> page split 감소)
+    if settings.SESSION_ID_VERSION == 7:
+        return str(uuid7())
+    return str(uuid.uuid4())
+
+
+def idempotent_session_id(app_id: int, client: str | None, idempotency_key: str) -> str:
+    """
+    idempotency_key가 있는 세션의 id: (app_id, client(knox_id), key)에서 결정적으로 생성 (UUIDv5)
+    - 어느 프로세스에서 언제 재시도해도 같은 id -> DB 중복은 PK가 판정하고, 응답한 id는 항상 실제 행
+    - 다른 app/사용자가 같은 키를 보내도 id가 달라 섞이지 않음 (knox_id 없는 요청끼리는 app 단위)
+    - SESSION_ID_VERSION=7이어도 시간 순이 아님 (키 있는 세션만)
+    """
+    return str(uuid.uuid5(_SESSION_KEY_NAMESPACE, f"{app_id}\n{client or ''}\n{idempotency_key}"))
+
+
+def session_id_param(session_id: str | None) -> str | bytes | None:
+    """
+    외부 문자열 id -> DB 바인딩 값
+    - SESSION_ID_BINARY=false: char(36) 그대로
+    - SESSION_ID_BINARY=true: BINARY(16) bytes (UUID 형식이 아니면 None -> 어떤 행과도 매칭 안 됨)
+    """
+    if session_id is None or not settings.SESSION_ID_BINARY:
+        return session_id
+    try:
+        return uuid.UUID(session_id).bytes
+    except ValueError:
+        return None
+
+
+def session_id_str(value: str | bytes | None) -> str | None:
+    """DB 값 -> 외부 문자열 id (응답 형식은 저장 방식과 무관하게 항상 36자 문자열)"""
+    if isinstance(value, (bytes, bytearray)):
+        return str(uuid.UUID(bytes=bytes(value)))
+    return value
+
+
+def idempotent_result(key: tuple):
+    # 이미 처리한 요청이면 처음 결과, 아니면 None
+    return _idempotency_window.get(key)
+
+
+def remember_idempotent(key: tuple, result) -> None:
+    _idempotency_window.set(key, result)
+
+
+def remember_session(session_id: str, exists: bool = True) -> None:
+    ttl = None if exists else settings.SESSION_CACHE_NEGATIVE_TTL_SEC
+    _session_cache.set(session_id, exists, ttl_sec=ttl)
+
+
+def forget_session(session_id: str) -> None:
+    _session_cache.pop(session_id)
 
 
 async def create_run_session(
@@ -48,21 +188,28 @@ async def create_run_session(
     app_version: str,
     started_at: datetime,
     client_ip: str | None,
+    session_id: str | None = None,
+    idempotency_key: str | None = None,
 ) -> str:
-    session_id = str(uuid.uuid4())
+    session_id = session_id or new_session_id()
+    if idempotency_key:
+        # 같은 키로 이미 만든 세션이면 IntegrityError(duplicate) -> 라우터가 duplicate 응답
+        await db.execute(SQL_INSERT_SESSION_KEY, {"id": session_id_param(session_id)})
     await db.execute(
         SQL_CREATE_SESSION,
         {
-            "id": session_id,
+            "id": session_id_param(session_id),
             "user_id": user_id,
             "knox_id_raw": knox_id_raw,
             "app_id": app_id,
             "app_version": app_version,
             "started_at": started_at,
             "client_ip": client_ip,
+            "idempotency_key": idempotency_key,
         },
     )
     await db.commit()
+    remember_session(session_id)
     return session_id
 
 
@@ -77,7 +224,7 @@ async def end_run_session(
     await db.execute(
         SQL_END_SESSION,
         {
-            "id": session_id,
+            "id": session_id_param(session_id),
             "ended_at": ended_at,
             "exit_code": exit_code,
             "end_reason": end_reason,
@@ -87,9 +234,28 @@ async def end_run_session(
 
 
 async def get_run_session(db: AsyncSession, session_id: str) -> dict | None:
-    res = await db.execute(SQL_GET_SESSION, {"id": session_id})
+    res = await db.execute(SQL_GET_SESSION, {"id": session_id_param(session_id)})
     row = res.mappings().first()
-    return dict(row) if row else None
+    if not row:
+        return None
+    out = dict(row)
+    out["id"] = session_id_str(out["id"])
+    return out
+
+
+def cached_session_exists(session_id: str) -> bool | None:
+    # DB 조회 없이 캐시만 확인 (모르면 None)
+    return _session_cache.get(session_id)
+
+
+async def session_exists(db: AsyncSession, session_id: str) -> bool:
+    """캐시 hit이면 DB 조회 없이 반환, miss면 SQL_GET_SESSION 조회 후 (없음도) 캐시"""
+    exists = _session_cache.get(session_id)
+    if exists is not None:
+        return exists
+    exists = await get_run_session(db, session_id) is not None
+    remember_session(session_id, exists)
+    return exists
 
 
 async def add_action_event(
@@ -103,21 +269,168 @@ async def add_action_event(
     duration_ms: int | None,
     severity: str,
     meta_json: dict | None,
+    idempotency_key: str | None = None,
 ) -> int:
-    await db.execute(
+    new_id = await insert_returning_id(
+        db,
         SQL_INSERT_ACTION,
         {
-            "session_id": session_id,
+            "session_id": session_id_param(session_id),
             "occurred_at": occurred_at,
             "action_type": action_type,
             "action_name": action_name,
             "description": description,
             "duration_ms": duration_ms,
             "severity": severity,
-            "meta_json": meta_json,
+            "meta_json": json_param(meta_json),
+            "idempotency_key": idempotency_key,
         },
     )
-    res = await db.execute(SQL_LAST_INSERT_ID)
-    new_id = int(res.scalar_one())
     await db.commit()
     return new_id
+
+
+async def get_existing_session_ids(
+    db: AsyncSession,
+    session_ids: Iterable[str],
+    use_cache: bool = True,
+) -> set[str]:
+    """
+    주어진 id 중 존재하는 세션 id 집합
+    - use_cache=True면 캐시에 없는 id만 IN 조회 (조회 결과는 없음 포함 캐시)
+    """
+    existing: set[str] = set()
+    unknown: list[str] = []
+    for sid in set(session_ids):
+        cached = _session_cache.get(sid) if use_cache else None
+        if cached is None:
+            unknown.append(sid)
+        elif cached:
+            existing.add(sid)
+    if not unknown:
+        return existing
+
+    res = await db.execute(SQL_EXISTING_SESSION_IDS, {"ids": [session_id_param(sid) for sid in unknown]})
+    found = {session_id_str(r[0]) for r in res.all()}
+    for sid in unknown:
+        remember_session(sid, sid in found)
+    return existing | found
+
+
+def session_row_params(row: dict) -> dict:
+    # SQL_CREATE_SESSION(_DEDUP) 바인딩용 (write-behind / spool 레코드 -> DB 값)
+    return {
+        **row,
+        "id": session_id_param(row["id"]),
+        "idempotency_key": row.get("idempotency_key"),
+    }
+
+
+def _key_bytes(value: str | bytes) -> bytes:
+    # app_run_session_keys.session_id(varbinary)와 비교용
+    return value if isinstance(value, bytes) else value.encode()
+
+
+async def create_sessions_dedup(db: AsyncSession, rows: list[dict]) -> list[dict]:
+    """
+    write-behind flush / spool replay용 세션 multi-row INSERT (commit은 호출한 쪽)
+    - 키 있는 세션: app_run_session_keys에 이미 있으면(다른 프로세스/이전 replay에서 저장) 건너뜀
+    - 같은 transaction에서 키 -> 세션 순으로 INSERT (동시에 같은 키가 들어오면 duplicate 오류 -> 호출한 쪽이 나눠 재시도)
+    - 반환: 새로 INSERT한 세션 row (건너뛴 것 제외)
+    """
+    params: dict[bytes, tuple[dict, dict]] = {}
+    for row in rows:
+        p = session_row_params(row)
+        params.setdefault(_key_bytes(p["id"]), (row, p))  # 같은 batch 안 중복은 처음 것만
+    keyed = [k for k, (_, p) in params.items() if p["idempotency_key"]]
+    if keyed:
+        res = await db.execute(SQL_EXISTING_SESSION_KEYS, {"ids": keyed})
+        for (stored,) in res.all():
+            params.pop(_key_bytes(stored), None)
+        new_keys = [{"id": p["id"]} for _, p in params.values() if p["idempotency_key"]]
+        if new_keys:
+            await db.execute(SQL_INSERT_SESSION_KEY, new_keys)
+    if params:
+        await db.execute(SQL_CREATE_SESSION_DEDUP, [p for _, p in params.values()])
+    return [row for row, _ in params.values()]
+
+
+async def add_action_events_dedup(db: AsyncSession, rows: list[dict], count_new: bool = False) -> list[dict]:
+    """
+    write-behind flush / spool replay용 action multi-row INSERT (commit은 호출한 쪽)
+    - 이미 저장된 (session_id, idempotency_key)는 SQL_INSERT_ACTION_DEDUP이 건너뜀
+    - count_new: 새로 저장되는 row를 알아야 할 때만(실시간 지표) INSERT 전에 키 조회 1회
+    - 반환: count_new면 새로 INSERT한 row, 아니면 rows 그대로
+    """
+    if not rows:
+        return []
+    new = rows
+    if count_new:
+        stored = await get_existing_action_keys(
+            db, {(row["session_id"], row["idempotency_key"]) for row in rows if row.get("idempotency_key")}
+        )
+        seen: set[tuple[str, str]] = set()
+        new = []
+        for row in rows:
+            if row.get("idempotency_key"):
+                pair = (row["session_id"], row["idempotency_key"])
+                if pair in stored or pair in seen:
+                    continue
+                seen.add(pair)
+            new.append(row)
+    await db.execute(SQL_INSERT_ACTION_DEDUP, [action_row_params(row) for row in rows])
+    return new
+
+
+def action_row_params(event: dict) -> dict:
+    # SQL_INSERT_ACTION 바인딩용 (session_id 저장 형식 변환 + meta_json 직렬화)
+    return {
+        **event,
+        "session_id": session_id_param(event["session_id"]),
+        "meta_json": json_param(event.get("meta_json")),
+        "idempotency_key": event.get("idempotency_key"),
+    }
+
+
+async def find_action_by_idempotency_key(db: AsyncSession, session_id: str, idempotency_key: str) -> int | None:
+    res = await db.execute(
+        SQL_ACTION_BY_IDEMPOTENCY_KEY,
+        {"session_id": session_id_param(session_id), "idempotency_key": idempotency_key},
+    )
+    value = res.scalar_one_or_none()
+    return int(value) if value is not None else None
+
+
+async def get_existing_action_keys(db: AsyncSession, pairs: Iterable[tuple[str, str]]) -> set[tuple[str, str]]:
+    """(session_id, idempotency_key) 중 이미 저장된 쌍"""
+    pairs = set(pairs)
+    if not pairs:
+        return set()
+    res = await db.execute(
+        SQL_ACTION_IDEMPOTENCY_KEYS,
+        {
+            "ids": list({session_id_param(sid) for sid, _ in pairs}),
+            "keys": list({key for _, key in pairs}),
+        },
+    )
+    found = {(session_id_str(r[0]), r[1]) for r in res.all()}
+    return found & pairs
+
+
+def session_cache_stats() -> dict:
+    return _session_cache.stats()
+
+
+async def add_action_events_bulk(db: AsyncSession, events: list[dict]) -> int:
+    """
+    action event 여러 건을 한 트랜잭션에서 INSERT
+    - executemany -> 드라이버가 multi-row INSERT 한 문장으로 묶어서 전송
+    - events 원소 키: session_id, occurred_at, action_type, action_name,
+      description, duration_ms, severity, meta_json(dict|None)
+    """
+    if not events:
+        return 0
+    rows = [action_row_params(e) for e in events]
+    await db.execute(SQL_INSERT_ACTION, rows)
+    await db.commit()
+    return len(rows)
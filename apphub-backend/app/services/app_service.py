@@ -2,11 +2,38 @@ from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-SQL_LIST = text("""
-SELECT * FROM apps
-WHERE (:active_only = 0 OR is_active = 1)
-ORDER BY name ASC
-""")
+from app.services.db_helpers import insert_returning_id
+from app.services.query_builder import ListQuery
+
+# 목록 기본 필드에서 description(TEXT) 제외 -> 상세는 GET /apps/{id} 또는 ?fields=*
+# 페이지 없음 (bind(paged=False))
+SQL_LIST = ListQuery(
+    "app_service.SQL_LIST",
+    columns={
+        "id": "id",
+        "category_id": "category_id",
+        "app_key": "app_key",
+        "name": "name",
+        "summary": "summary",
+        "description": "description",
+        "icon": "icon",
+        "manual": "manual",
+        "voc": "voc",
+        "app_kind": "app_kind",
+        "web_launch_url": "web_launch_url",
+        "is_active": "is_active",
+        "requires_app_approval": "requires_app_approval",
+        "latest_version_id": "latest_version_id",
+        "created_by": "created_by",
+    },
+    from_="FROM apps",
+    filters={"active_only": "is_active = 1"},
+    order_by="name ASC",
+    default_fields=(
+        "id", "category_id", "app_key", "name", "summary", "icon", "manual", "voc",
+        "app_kind", "web_launch_url", "is_active", "requires_app_approval", "latest_version_id", "created_by",
+    ),
+)
 
 SQL_GET = text("SELECT * FROM apps WHERE id=:id LIMIT 1")
 
@@ -39,8 +66,8 @@ WHERE id=:id
 # delete = soft delete
 SQL_SOFT_DELETE = text("UPDATE apps SET is_active=0 WHERE id=:id")
 
-async def list_apps(db: AsyncSession, active_only: bool = True) -> list[dict]:
-    res = await db.execute(SQL_LIST, {"active_only": 1 if active_only else 0})
+async def list_apps(db: AsyncSession, active_only: bool = True, fields: tuple[str, ...] | None = None) -> list[dict]:
+    res = await SQL_LIST.execute(db, {"active_only": 1 if active_only else None}, paged=False, fields=fields)
     return [dict(r) for r in res.mappings().all()]
 
 async def get_app(db: AsyncSession, app_id: int) -> dict | None:
@@ -49,9 +76,7 @@ async def get_app(db: AsyncSession, app_id: int) -> dict | None:
     return dict(row) if row else None
 
 async def create_app(db: AsyncSession, payload: dict) -> int:
-    await db.execute(SQL_INSERT, payload)
-    res = await db.execute(text("SELECT LAST_INSERT_ID()"))
-    new_id = int(res.scalar_one())
+    new_id = await insert_returning_id(db, SQL_INSERT, payload)
     await db.commit()
     return new_id
 
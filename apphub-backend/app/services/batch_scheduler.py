@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.services.db_helpers import insert_returning_id
+from app.services.metrics_service import batch_grace_sec, reconcile_mode, run_daily_batch, utc_day_closed
+from app.services.partition_service import run_partition_maintenance
+from app.services.realtime_metrics import realtime_metrics
+
+JOB_DAILY_METRICS = "daily_metrics"
+LOCK_NAME = "apphub_daily_metrics_batch"
+
+# 이 프로세스 식별자 (batch_runs.worker)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+SQL_GET_LOCK = text("SELECT GET_LOCK(:name, 0)")
+SQL_RELEASE_LOCK = text("SELECT RELEASE_LOCK(:name)")
+
+SQL_INSERT_RUN = text("""
+INSERT INTO batch_runs (job_name, metric_date, `trigger`, status, worker, started_at)
+VALUES (:job_name, :metric_date, :trigger, 'running', :worker, NOW(3))
+""")
+
+SQL_FINISH_RUN = text("""
+UPDATE batch_runs
+SET status=:status, finished_at=NOW(3), duration_ms=:duration_ms, message=:message
+WHERE id=:id
+""")
+
+SQL_SUCCEEDED = text("""
+SELECT 1 FROM batch_runs
+WHERE job_name=:job_name AND metric_date=:metric_date AND status='success'
+LIMIT 1
+""")
+
+SQL_LIST_RUNS = text("""
+SELECT id, job_name, metric_date, `trigger`, status, worker, started_at, finished_at, duration_ms, message
+FROM batch_runs
+ORDER BY id DESC
+LIMIT :limit
+""")
+
+
+def last_closed_utc_day(now: datetime | None = None) -> date:
+    # 끝난 UTC 날짜 중 가장 최근 (예: 00:10 KST = 전날 15:10 UTC -> 그 전날)
+    # 실시간 반영 중이면 끝나고 batch_grace_sec()가 지나야 끝난 날짜로 봄
+    now = now or datetime.now(timezone.utc)
+    return (now.astimezone(timezone.utc) - timedelta(seconds=batch_grace_sec())).date() - timedelta(days=1)
+
+
+class BatchLockBusy(Exception):
+    """다른 worker/컨테이너가 이미 배치를 실행 중 (GET_LOCK 실패)"""
+
+
+async def run_daily_metrics(metric_date: date, trigger: str, skip_if_done: bool = False) -> dict:
+    """
+    일 배치 1회 실행 (모든 worker 중 GET_LOCK을 잡은 1개만)
+    - lock은 전용 connection에 잡음 (session은 commit마다 connection을 pool에 돌려주므로)
+    - skip_if_done: 이미 success 이력이 있는 날짜면 건너뜀 (스케줄러 / 기동 시 catch-up)
+    - UTC 기준 아직 끝나지 않은 날짜(실시간 반영 중이면 + batch_grace_sec())는 계산은 하되 status=partial
+      (success로 남기지 않아 다음 실행에서 다시 계산)
+    - 실시간 반영 + METRICS_BATCH_RECONCILE이면 action_count는 재계산하지 않음 (run_daily_batch reconcile)
+    - 실행마다 batch_runs에 상태, 소요 시간, worker 기록
+    """
+    async with engine.connect() as lock_conn:
+        got = (await lock_conn.execute(SQL_GET_LOCK, {"name": LOCK_NAME})).scalar()
+        if not got:
+            raise BatchLockBusy("daily metrics batch is already running")
+        try:
+            async with AsyncSessionLocal() as db:
+                params = {"job_name": JOB_DAILY_METRICS, "metric_date": metric_date}
+                if skip_if_done and (await db.execute(SQL_SUCCEEDED, params)).first():
+                    return {"status": "skipped", "metric_date": str(metric_date)}
+                run_id = await insert_returning_id(db, SQL_INSERT_RUN, {**params, "trigger": trigger, "worker": WORKER_ID})
+                await db.commit()
+
+            # 끝난 날짜 판정은 계산 전에 (다른 worker의 증분은 끝난 뒤 grace 안에 반영되거나 버려짐)
+            closed = utc_day_closed(metric_date, grace_sec=batch_grace_sec())
+            # 이 프로세스의 증분은 grace를 기다리지 않고 바로 반영
+            await realtime_metrics.flush()
+            start = time.perf_counter()
+            status, message = "success", None
+            try:
+                async with AsyncSessionLocal() as db:
+                    await run_daily_batch(db, metric_date.isoformat(), reconcile=reconcile_mode())
+                if not closed:
+                    status, message = "partial", "UTC day not closed yet"
+            except Exception as e:
+                status, message = "failed", str(e)[:1000]
+                logger.exception(f"[BATCH] daily metrics {metric_date} failed: {e}")
+            duration_ms = int((time.perf_counter() - start) * 1000)
+
+            async with AsyncSessionLocal() as db:
+                await db.execute(SQL_FINISH_RUN, {
+                    "id": run_id, "status": status, "duration_ms": duration_ms, "message": message,
+                })
+                await db.commit()
+            logger.info(f"[BATCH] daily metrics {metric_date} {status} ({duration_ms}ms, {trigger})")
+            return {"run_id": run_id, "status": status, "metric_date": str(metric_date), "duration_ms": duration_ms}
+        finally:
+            await lock_conn.execute(SQL_RELEASE_LOCK, {"name": LOCK_NAME})
+
+
+async def list_batch_runs(db, limit: int) -> list[dict]:
+    res = await db.execute(SQL_LIST_RUNS, {"limit": int(limit)})
+    return [dict(r) for r in res.mappings().all()]
+
+
+class DailyBatchScheduler:
+    """
+    app 내장 일 배치 스케줄러 (BATCH_SCHEDULER_ENABLED=true일 때만)
+    - 매일 BATCH_RUN_AT(BATCH_TIMEZONE 기준)에 끝난 UTC 날짜 중 가장 최근 날짜의 지표 계산
+      (지표 날짜는 저장 시각과 같은 UTC 기준, BATCH_TIMEZONE은 실행 시각에만 적용)
+    - 모든 worker가 같은 시각에 깨어나지만 GET_LOCK + success 이력 확인으로 1번만 실행
+    - 기동 시 오늘 실행 시각이 지났으면 전날 배치 catch-up (이미 성공했으면 skip)
+    - 파티션 롤오버(PARTITION_MAINTENANCE_ENABLED)도 같은 시점에 실행
+    """
+
+    # 긴 sleep 중 시스템 시계가 바뀌어도 어긋나지 않게 최대 대기 후 다시 계산
+    MAX_SLEEP_SEC = 300
+
+    def __init__(self, enabled: bool, run_at: str, tz: str):
+        self.enabled = enabled
+        hh, mm = run_at.split(":")
+        self.run_at = dtime(int(hh), int(mm))
+        self.tz = ZoneInfo(tz)
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+        self.last_result: dict | None = None
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="daily-batch-scheduler")
+        logger.info(f"[BATCH] scheduler started (daily {self.run_at:%H:%M} {self.tz.key}, worker={WORKER_ID})")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        # 실행 중인 배치는 끝날 때까지 기다림 (중간에 끊으면 running 이력이 남음)
+        await self._task
+        self._task = None
+
+    def next_run(self, now: datetime) -> datetime:
+        candidate = datetime.combine(now.date(), self.run_at, tzinfo=self.tz)
+        return candidate if candidate > now else candidate + timedelta(days=1)
+
+    async def _run(self) -> None:
+        now = datetime.now(self.tz)
+        if now >= datetime.combine(now.date(), self.run_at, tzinfo=self.tz):
+            await self._run_once(now)
+
+        while not self._stopping.is_set():
+            due = self.next_run(datetime.now(self.tz))
+            while not self._stopping.is_set():
+                remaining = (due - datetime.now(self.tz)).total_seconds()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), min(remaining, self.MAX_SLEEP_SEC))
+                except asyncio.TimeoutError:
+                    pass
+            if self._stopping.is_set():
+                return
+            await self._run_once(datetime.now(self.tz))
+
+    async def _run_once(self, now: datetime) -> None:
+        # 현지 날짜의 "어제"는 UTC로는 아직 진행 중일 수 있음 (KST 00:10이면 UTC 날짜가 9시간 남음)
+        metric_date = last_closed_utc_day(now)
+        try:
+            self.last_result = await run_daily_metrics(metric_date, "schedule", skip_if_done=True)
+        except BatchLockBusy:
+            logger.info(f"[BATCH] daily metrics {metric_date} is running on another worker")
+        except Exception as e:
+            logger.exception(f"[BATCH] scheduled daily metrics {metric_date} failed: {e}")
+
+        if settings.PARTITION_MAINTENANCE_ENABLED:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await run_partition_maintenance(db)
+            except Exception as e:
+                logger.warning(f"[PARTITION] scheduled maintenance failed: {e}")
+
+
+batch_scheduler = DailyBatchScheduler(
+    enabled=settings.BATCH_SCHEDULER_ENABLED,
+    run_at=settings.BATCH_RUN_AT,
+    tz=settings.BATCH_TIMEZONE,
+)
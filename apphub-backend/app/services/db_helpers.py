@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+
+async def insert_returning_id(db: AsyncSession, stmt: TextClause, params: dict[str, Any]) -> int:
+    """
+    INSERT 실행 후 AUTO_INCREMENT id 반환 (commit은 호출하는 쪽에서)
+    - MySQL은 INSERT ... RETURNING 미지원 -> 드라이버 cursor.lastrowid 사용
+      (OK 패킷에 실려 오므로 SELECT LAST_INSERT_ID() 왕복이 필요 없음)
+    """
+    res = await db.execute(stmt, params)
+    new_id = res.lastrowid
+    if not new_id:
+        raise RuntimeError("INSERT did not produce an auto-increment id")
+    return int(new_id)
+
+
+def is_duplicate_key(e: IntegrityError) -> bool:
+    # MySQL ER_DUP_ENTRY(1062): unique/PK 중복 (FK 위반 1452 등과 구분)
+    args = getattr(e.orig, "args", ())
+    return bool(args) and args[0] == 1062
@@ -2,24 +2,61 @@ from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-SQL_LIST = text("""
-SELECT * FROM hub_events
-WHERE (:user_id IS NULL OR user_id=:user_id)
-ORDER BY id DESC
-LIMIT :limit OFFSET :offset
-""")
+from app.services.app_event_service import json_param, json_value
+from app.services.query_builder import ListQuery
+
+# 기본 필드에서 meta_json(JSON) 제외
+SQL_LIST = ListQuery(
+    "hub_event_service.SQL_LIST",
+    columns={
+        "id": "id",
+        "occurred_at": "occurred_at",
+        "user_id": "user_id",
+        "event_type": "event_type",
+        "page": "page",
+        "description": "description",
+        "meta_json": "meta_json",
+        "created_at": "created_at",
+    },
+    from_="FROM hub_events",
+    filters={
+        "user_id": "user_id = :user_id",
+        "cursor_id": "id < :cursor_id",
+    },
+    order_by="id DESC",
+    default_fields=("id", "occurred_at", "user_id", "event_type", "page", "description", "created_at"),
+)
 SQL_GET = text("SELECT * FROM hub_events WHERE id=:id LIMIT 1")
 SQL_UPDATE = text("UPDATE hub_events SET description=:description, meta_json=:meta_json WHERE id=:id")
 SQL_DELETE = text("DELETE FROM hub_events WHERE id=:id")
+SQL_INSERT = text("""
+INSERT INTO hub_events (occurred_at, user_id, event_type, page, description, meta_json)
+VALUES (:occurred_at, :user_id, :event_type, :page, :description, :meta_json)
+""")
 
-async def list_hub_events(db: AsyncSession, user_id: int | None, limit: int, offset: int) -> list[dict]:
-    res = await db.execute(SQL_LIST, {"user_id": user_id, "limit": int(limit), "offset": int(offset)})
-    return [dict(r) for r in res.mappings().all()]
+def _hub_row(row: dict) -> dict:
+    # meta_json: 드라이버가 준 문자열 -> 객체 (응답 schema 모양)
+    if "meta_json" in row:
+        row["meta_json"] = json_value(row["meta_json"])
+    return row
+
+async def list_hub_events(
+    db: AsyncSession,
+    user_id: int | None,
+    limit: int,
+    offset: int,
+    cursor_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+) -> list[dict]:
+    res = await SQL_LIST.execute(
+        db, {"user_id": user_id, "limit": int(limit), "offset": int(offset), "cursor_id": cursor_id}, fields=fields
+    )
+    return [_hub_row(dict(r)) for r in res.mappings().all()]
 
 async def get_hub_event(db: AsyncSession, event_id: int) -> dict | None:
     res = await db.execute(SQL_GET, {"id": int(event_id)})
     row = res.mappings().first()
-    return dict(row) if row else None
+    return _hub_row(dict(row)) if row else None
 
 async def update_hub_event(db: AsyncSession, event_id: int, description, meta_json):
     await db.execute(SQL_UPDATE, {"id": int(event_id), "description": description, "meta_json": meta_json})
@@ -28,3 +65,22 @@ async def update_hub_event(db: AsyncSession, event_id: int, description, meta_js
 async def delete_hub_event(db: AsyncSession, event_id: int):
     await db.execute(SQL_DELETE, {"id": int(event_id)})
     await db.commit()
+
+async def add_hub_events_bulk(db: AsyncSession, user_id: int, events: list[dict]) -> int:
+    # executemany -> multi-row INSERT 1회 + commit 1회
+    if not events:
+        return 0
+    rows = [
+        {
+            "occurred_at": ev["occurred_at"],
+            "user_id": int(user_id),
+            "event_type": ev["event_type"],
+            "page": ev["page"],
+            "description": ev.get("description"),
+            "meta_json": json_param(ev.get("meta_json")),
+        }
+        for ev in events
+    ]
+    await db.execute(SQL_INSERT, rows)
+    await db.commit()
+    return len(rows)
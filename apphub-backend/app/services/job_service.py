@@ -2,12 +2,26 @@ from __future__ import annotations
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-SQL_LIST = text("""
-SELECT * FROM jobs
-WHERE (:user_id IS NULL OR user_id = :user_id)
-ORDER BY id DESC
-LIMIT :limit OFFSET :offset
-""")
+from app.services.db_helpers import insert_returning_id
+from app.services.query_builder import ListQuery
+
+SQL_LIST = ListQuery(
+    "job_service.SQL_LIST",
+    columns={
+        "id": "id",
+        "user_id": "user_id",
+        "job_type": "job_type",
+        "status": "status",
+        "progress": "progress",
+        "message": "message",
+    },
+    from_="FROM jobs",
+    filters={
+        "user_id": "user_id = :user_id",
+        "cursor_id": "id < :cursor_id",
+    },
+    order_by="id DESC",
+)
 
 SQL_GET = text("SELECT * FROM jobs WHERE id=:id LIMIT 1")
 
@@ -24,8 +38,26 @@ WHERE id=:id
 
 SQL_DELETE = text("DELETE FROM jobs WHERE id=:id")
 
-async def list_jobs(db: AsyncSession, user_id: int | None, limit: int, offset: int) -> list[dict]:
-    res = await db.execute(SQL_LIST, {"user_id": user_id, "limit": int(limit), "offset": int(offset)})
+# 서버 내부 작업(backfill 등)의 진행률 보고: 처음 running일 때 started_at, 끝나면 finished_at
+SQL_SET_PROGRESS = text("""
+UPDATE jobs
+SET status=:status, progress=:progress, message=:message,
+    started_at=COALESCE(started_at, NOW()),
+    finished_at=IF(:status IN ('success', 'failed', 'canceled'), NOW(), NULL)
+WHERE id=:id
+""")
+
+async def list_jobs(
+    db: AsyncSession,
+    user_id: int | None,
+    limit: int,
+    offset: int,
+    cursor_id: int | None = None,
+    fields: tuple[str, ...] | None = None,
+) -> list[dict]:
+    res = await SQL_LIST.execute(
+        db, {"user_id": user_id, "limit": int(limit), "offset": int(offset), "cursor_id": cursor_id}, fields=fields
+    )
     return [dict(r) for r in res.mappings().all()]
 
 async def get_job(db: AsyncSession, job_id: int) -> dict | None:
@@ -34,9 +66,7 @@ async def get_job(db: AsyncSession, job_id: int) -> dict | None:
     return dict(row) if row else None
 
 async def create_job(db: AsyncSession, payload: dict) -> int:
-    await db.execute(SQL_INSERT, payload)
-    res = await db.execute(text("SELECT LAST_INSERT_ID()"))
-    new_id = int(res.scalar_one())
+    new_id = await insert_returning_id(db, SQL_INSERT, payload)
     await db.commit()
     return new_id
 
@@ -49,3 +79,12 @@ async def update_job(db: AsyncSession, job_id: int, payload: dict) -> None:
 async def delete_job(db: AsyncSession, job_id: int) -> None:
     await db.execute(SQL_DELETE, {"id": int(job_id)})
     await db.commit()
+
+async def set_job_progress(db: AsyncSession, job_id: int, status: str, progress: int, message: str | None) -> None:
+    await db.execute(SQL_SET_PROGRESS, {
+        "id": int(job_id),
+        "status": status,
+        "progress": int(progress),
+        "message": message[:1000] if message else message,
+    })
+    await db.commit()
@@ -1,47 +1,68 @@
+import asyncio
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+from loguru import logger
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-SQL_UPSERT_HUB_DAILY = text("""
-INSERT INTO hub_daily_metrics (metric_date, dau, page_open_count, search_count, created_at)
+from app.core.cache import TTLCache, register_cache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.job_service import set_job_progress
+from app.utils.hll import HyperLogLog, merge_sketches
+
+# 일 배치: 테이블마다 1번만 읽음 (사용자별 GROUP BY -> 고유 사용자 수, 건수, HLL sketch를 Python에서 함께 계산)
+SQL_HUB_DAILY_BY_USER = text("""
 SELECT
-  :d AS metric_date,
-  COUNT(DISTINCT user_id) AS dau,
+  user_id,
   SUM(event_type = 'page_open') AS page_open_count,
-  SUM(event_type = 'search') AS search_count,
-  NOW() AS created_at
+  SUM(event_type = 'search') AS search_count
 FROM hub_events
 WHERE occurred_at >= :d
   AND occurred_at <  DATE_ADD(:d, INTERVAL 1 DAY)
-ON DUPLICATE KEY UPDATE
-  dau = VALUES(dau),
-  page_open_count = VALUES(page_open_count),
-  search_count = VALUES(search_count),
-  created_at = VALUES(created_at);
+GROUP BY user_id
 """)
 
-SQL_UPSERT_APP_DAILY_BASE = text("""
-INSERT INTO app_daily_metrics (metric_date, app_id, unique_users, launch_count, total_runtime_sec, action_count, created_at)
+SQL_APP_DAILY_BY_USER = text("""
 SELECT
-  :d AS metric_date,
-  rs.app_id,
-  COUNT(DISTINCT rs.user_id) AS unique_users,
+  app_id,
+  user_id,
   COUNT(*) AS launch_count,
   SUM(
     CASE
-      WHEN rs.ended_at IS NULL THEN 0
-      ELSE TIMESTAMPDIFF(SECOND, rs.started_at, rs.ended_at)
+      WHEN ended_at IS NULL THEN 0
+      ELSE TIMESTAMPDIFF(SECOND, started_at, ended_at)
     END
-  ) AS total_runtime_sec,
-  0 AS action_count,
-  NOW() AS created_at
-FROM app_run_sessions rs
-WHERE rs.started_at >= :d
-  AND rs.started_at <  DATE_ADD(:d, INTERVAL 1 DAY)
-GROUP BY rs.app_id
+  ) AS total_runtime_sec
+FROM app_run_sessions
+WHERE started_at >= :d
+  AND started_at <  DATE_ADD(:d, INTERVAL 1 DAY)
+GROUP BY app_id, user_id
+""")
+
+SQL_SET_HUB_DAILY = text("""
+INSERT INTO hub_daily_metrics (metric_date, dau, page_open_count, search_count, dau_hll, created_at)
+VALUES (:d, :dau, :page_open_count, :search_count, :sketch, NOW())
+ON DUPLICATE KEY UPDATE
+  dau = VALUES(dau),
+  page_open_count = VALUES(page_open_count),
+  search_count = VALUES(search_count),
+  dau_hll = VALUES(dau_hll),
+  created_at = VALUES(created_at);
+""")
+
+# action_count는 건드리지 않음 (전체 재계산은 SQL_UPDATE_APP_DAILY_ACTIONS, reconcile 모드는 실시간 증분 그대로)
+# apps에 없는 app_id는 건너뜀 (app_daily_metrics FK)
+SQL_SET_APP_DAILY = text("""
+INSERT INTO app_daily_metrics (metric_date, app_id, unique_users, launch_count, total_runtime_sec, action_count, users_hll, created_at)
+SELECT :d, a.id, :unique_users, :launch_count, :total_runtime_sec, 0, :sketch, NOW()
+FROM apps a
+WHERE a.id = :app_id
 ON DUPLICATE KEY UPDATE
   unique_users = VALUES(unique_users),
   launch_count = VALUES(launch_count),
   total_runtime_sec = VALUES(total_runtime_sec),
+  users_hll = VALUES(users_hll),
   created_at = VALUES(created_at);
 """)
 
@@ -62,9 +83,297 @@ SET adm.action_count = x.action_count,
 WHERE adm.metric_date = :d;
 """)
 
-async def run_daily_batch(db: AsyncSession, metric_date: str) -> None:
-    # metric_date: 'YYYY-MM-DD'
-    await db.execute(SQL_UPSERT_HUB_DAILY, {"d": metric_date})
-    await db.execute(SQL_UPSERT_APP_DAILY_BASE, {"d": metric_date})
-    await db.execute(SQL_UPDATE_APP_DAILY_ACTIONS, {"d": metric_date})
+SQL_HUB_SKETCHES = text("""
+SELECT metric_date, dau_hll
+FROM hub_daily_metrics
+WHERE metric_date >= :date_from
+  AND metric_date <= :date_to
+""")
+
+# app_id 필터는 (:app_id IS NULL OR ...) 대신 statement를 나눔 (query_builder 참고: 값과 무관한 실행 계획 방지)
+_APP_ID_FILTER = "\n  AND app_id = :app_id"
+
+_APP_SKETCHES_SQL = """
+SELECT metric_date, app_id, users_hll
+FROM app_daily_metrics
+WHERE metric_date >= :date_from
+  AND metric_date <= :date_to{app_filter}
+"""
+SQL_APP_SKETCHES = text(_APP_SKETCHES_SQL.format(app_filter=""))
+SQL_APP_SKETCHES_BY_APP = text(_APP_SKETCHES_SQL.format(app_filter=_APP_ID_FILTER))
+
+
+# -------------------------
+# 시계열 조회 (day/week/month): 묶음 집계는 SQL GROUP BY 1회
+# - week: 월요일 시작, month: 1일 시작 (bucket = 구간 시작일)
+# - 고유 사용자(dau/unique_users)는 일별 값의 평균/최대 (주/월 고유 사용자 수가 아님)
+# -------------------------
+_BUCKET_EXPR = """
+CASE :granularity
+  WHEN 'week'  THEN DATE_SUB(metric_date, INTERVAL WEEKDAY(metric_date) DAY)
+  WHEN 'month' THEN DATE_SUB(metric_date, INTERVAL DAYOFMONTH(metric_date) - 1 DAY)
+  ELSE metric_date
+END"""
+
+SQL_HUB_SERIES = text(f"""
+SELECT
+  {_BUCKET_EXPR} AS bucket,
+  COUNT(*) AS days,
+  ROUND(AVG(dau), 1) AS dau_avg,
+  MAX(dau) AS dau_max,
+  SUM(page_open_count) AS page_open_count,
+  SUM(search_count) AS search_count
+FROM hub_daily_metrics
+WHERE metric_date >= :date_from
+  AND metric_date <= :date_to
+GROUP BY bucket
+ORDER BY bucket
+""")
+
+_APP_SERIES_SQL = f"""
+SELECT
+  {_BUCKET_EXPR} AS bucket,
+  app_id,
+  COUNT(*) AS days,
+  ROUND(AVG(unique_users), 1) AS unique_users_avg,
+  MAX(unique_users) AS unique_users_max,
+  SUM(launch_count) AS launch_count,
+  SUM(total_runtime_sec) AS total_runtime_sec,
+  SUM(action_count) AS action_count
+FROM app_daily_metrics
+WHERE metric_date >= :date_from
+  AND metric_date <= :date_to{{app_filter}}
+GROUP BY bucket, app_id
+ORDER BY bucket, app_id
+"""
+SQL_APP_SERIES = text(_APP_SERIES_SQL.format(app_filter=""))
+SQL_APP_SERIES_BY_APP = text(_APP_SERIES_SQL.format(app_filter=_APP_ID_FILTER))
+
+# (kind, date_from, date_to, granularity, app_id) -> rows
+# - 일 지표를 쓰는 곳(run_daily_batch, 실시간 flush)이 해당 날짜를 포함하는 항목을 무효화
+# - 다른 worker의 쓰기는 TTL로만 반영
+_series_cache = register_cache(
+    "metrics_series",
+    TTLCache(max_size=settings.METRICS_SERIES_CACHE_MAX_SIZE, ttl_sec=settings.METRICS_SERIES_CACHE_TTL_SEC),
+)
+
+
+def invalidate_series(dates) -> int:
+    dates = set(dates)
+    if not dates:
+        return 0
+    return _series_cache.pop_where(lambda k: any(k[1] <= d <= k[2] for d in dates))
+
+
+async def get_hub_series(db: AsyncSession, date_from: date, date_to: date, granularity: str) -> list[dict]:
+    key = ("hub", date_from, date_to, granularity, None)
+    rows = _series_cache.get(key)
+    if rows is None:
+        res = await db.execute(SQL_HUB_SERIES, {"date_from": date_from, "date_to": date_to, "granularity": granularity})
+        rows = [dict(r) for r in res.mappings().all()]
+        _series_cache.set(key, rows)
+    return rows
+
+
+async def get_app_series(
+    db: AsyncSession, date_from: date, date_to: date, granularity: str, app_id: int | None
+) -> list[dict]:
+    key = ("app", date_from, date_to, granularity, app_id)
+    rows = _series_cache.get(key)
+    if rows is None:
+        res = await db.execute(
+            SQL_APP_SERIES if app_id is None else SQL_APP_SERIES_BY_APP,
+            {"date_from": date_from, "date_to": date_to, "granularity": granularity, "app_id": app_id},
+        )
+        rows = [dict(r) for r in res.mappings().all()]
+        _series_cache.set(key, rows)
+    return rows
+
+
+def _bucket(d: date, granularity: str, date_from: date) -> date:
+    # SQL_HUB_SERIES의 bucket과 같은 기준 (range: 전체 기간 1개)
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    if granularity == "range":
+        return date_from
+    return d
+
+
+def _estimate_uniques(rows: list[tuple[date, bytes | None]], granularity: str, date_from: date) -> list[dict]:
+    buckets: dict[date, list] = {}
+    for d, sketch in rows:
+        buckets.setdefault(_bucket(d, granularity, date_from), []).append(sketch)
+    out = []
+    for bucket in sorted(buckets):
+        sketches = buckets[bucket]
+        merged = merge_sketches(sketches)
+        out.append({
+            "bucket": bucket,
+            "days": len(sketches),
+            "sketch_days": sum(1 for sk in sketches if sk),
+            "users": merged.estimate() if merged is not None else None,
+        })
+    return out
+
+
+async def get_hub_uniques(db: AsyncSession, date_from: date, date_to: date, granularity: str) -> list[dict]:
+    """
+    기간별 고유 사용자 근사 (HLL sketch 합산, 오차 약 1.6%)
+    - sketch_days < days: sketch 없는 날짜(006 이전 / 배치 전 당일)는 빠진 값
+    """
+    key = ("hub_uniques", date_from, date_to, granularity, None)
+    rows = _series_cache.get(key)
+    if rows is None:
+        res = await db.execute(SQL_HUB_SKETCHES, {"date_from": date_from, "date_to": date_to})
+        rows = _estimate_uniques([(r[0], r[1]) for r in res.all()], granularity, date_from)
+        _series_cache.set(key, rows)
+    return rows
+
+
+async def get_app_uniques(
+    db: AsyncSession, date_from: date, date_to: date, granularity: str, app_id: int | None
+) -> list[dict]:
+    key = ("app_uniques", date_from, date_to, granularity, app_id)
+    rows = _series_cache.get(key)
+    if rows is None:
+        res = await db.execute(
+            SQL_APP_SKETCHES if app_id is None else SQL_APP_SKETCHES_BY_APP,
+            {"date_from": date_from, "date_to": date_to, "app_id": app_id},
+        )
+        per_app: dict[int, list] = {}
+        for d, aid, sketch in res.all():
+            per_app.setdefault(int(aid), []).append((d, sketch))
+        rows = [
+            {"app_id": aid, **point}
+            for aid in sorted(per_app)
+            for point in _estimate_uniques(per_app[aid], granularity, date_from)
+        ]
+        _series_cache.set(key, rows)
+    return rows
+
+
+def series_cache_stats() -> dict:
+    return _series_cache.stats()
+
+
+def utc_day_closed(metric_date: date, now: datetime | None = None, grace_sec: float = 0) -> bool:
+    # 수집 시각(started_at/occurred_at)은 naive UTC -> metric_date도 UTC 날짜 [d 00:00, d+1 00:00)
+    now = now or datetime.now(timezone.utc)
+    day_end = datetime.combine(metric_date + timedelta(days=1), dtime.min, tzinfo=timezone.utc)
+    return now >= day_end + timedelta(seconds=grace_sec)
+
+
+def batch_grace_sec() -> float:
+    """
+    날짜가 끝난 뒤 배치가 확정(success)하기 전 기다리는 시간
+    - 실시간 증분은 worker마다 FLUSH_SEC 주기로 반영되고, 끝난 지 FLUSH_SEC*2 지난 날짜의 증분은 flush에서 버림
+      (realtime_metrics) -> 그 뒤에 계산해야 다른 worker의 늦은 증분이 재계산 결과 위에 더해지지 않음
+    """
+    return settings.METRICS_REALTIME_FLUSH_SEC * 3 if settings.METRICS_REALTIME_ENABLED else 0
+
+
+def reconcile_mode() -> bool:
+    # action_count를 실시간 증분에 맡기고 야간 배치에서 action 테이블 JOIN을 건너뛰는지
+    return settings.METRICS_REALTIME_ENABLED and settings.METRICS_BATCH_RECONCILE
+
+
+async def run_daily_batch(db: AsyncSession, metric_date: str, reconcile: bool = False) -> None:
+    """
+    일 지표 재계산 (metric_date: 'YYYY-MM-DD')
+    - hub_events / app_run_sessions는 사용자별 GROUP BY 1번씩 -> 고유 사용자 수, 건수, HLL sketch
+    - reconcile=False: action_count도 app_action_events JOIN으로 다시 계산 (backfill, 실시간 반영 off)
+    - reconcile=True: action_count는 저장 후 더해진 실시간 증분 그대로 (가장 큰 action 테이블을 읽지 않음)
+    """
+    params = {"d": metric_date}
+    res = await db.execute(SQL_HUB_DAILY_BY_USER, params)
+    hub = {"dau": 0, "page_open_count": 0, "search_count": 0}
+    hub_users = HyperLogLog()
+    for user_id, page_open_count, search_count in res.all():
+        hub["dau"] += 1
+        hub["page_open_count"] += int(page_open_count or 0)
+        hub["search_count"] += int(search_count or 0)
+        hub_users.add(user_id)
+    await db.execute(SQL_SET_HUB_DAILY, {**params, **hub, "sketch": hub_users.to_bytes()})
+
+    res = await db.execute(SQL_APP_DAILY_BY_USER, params)
+    per_app: dict[int, dict] = {}
+    app_users: dict[int, HyperLogLog] = {}
+    for app_id, user_id, launch_count, total_runtime_sec in res.all():
+        app_id = int(app_id)
+        row = per_app.setdefault(app_id, {"app_id": app_id, "unique_users": 0, "launch_count": 0, "total_runtime_sec": 0})
+        row["launch_count"] += int(launch_count)
+        row["total_runtime_sec"] += int(total_runtime_sec or 0)
+        sketch = app_users.setdefault(app_id, HyperLogLog())
+        if user_id is not None:
+            # 매핑 안 된 knox_id(user_id NULL) 세션은 실행 수에만 포함 (COUNT(DISTINCT user_id)와 같은 기준)
+            row["unique_users"] += 1
+            sketch.add(user_id)
+    if per_app:
+        await db.execute(
+            SQL_SET_APP_DAILY,
+            [{**params, **row, "sketch": app_users[app_id].to_bytes()} for app_id, row in per_app.items()],
+        )
+    if not reconcile:
+        await db.execute(SQL_UPDATE_APP_DAILY_ACTIONS, params)
     await db.commit()
+    invalidate_series([date.fromisoformat(metric_date)])
+
+
+def backfill_parallelism(requested: int | None) -> int:
+    # 요청 트래픽용 connection을 남기도록 pool의 절반까지만
+    n = requested or settings.METRICS_BACKFILL_PARALLELISM
+    return max(1, min(n, settings.DB_POOL_SIZE // 2))
+
+
+async def run_daily_backfill(job_id: int, date_from: date, date_to: date, parallelism: int) -> None:
+    """
+    기간 재계산: 날짜마다 별도 session으로 run_daily_batch (날짜 단위 commit -> 재실행해도 안전)
+    - worker parallelism개가 날짜 queue를 나눠 처리 (느린 날짜가 있어도 나머지는 계속 진행)
+    - 진행률(%)이 바뀔 때마다 jobs에 기록, 실패한 날짜는 message에 남기고 끝나면 failed
+    """
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    queue: asyncio.Queue[date] = asyncio.Queue()
+    for d in days:
+        queue.put_nowait(d)
+
+    done = 0
+    failed: list[str] = []
+    reported = -1
+    progress_lock = asyncio.Lock()
+
+    async def report(status: str) -> None:
+        nonlocal reported
+        pct = done * 100 // len(days)
+        if status == "running" and pct == reported:
+            return
+        reported = pct
+        msg = f"{done}/{len(days)} days ({date_from}~{date_to})"
+        if failed:
+            msg += f", failed: {', '.join(sorted(failed))}"
+        async with AsyncSessionLocal() as db:
+            await set_job_progress(db, job_id, status, pct, msg)
+
+    async def worker() -> None:
+        nonlocal done
+        while not queue.empty():
+            d = queue.get_nowait()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await run_daily_batch(db, d.isoformat())
+            except Exception as e:
+                failed.append(d.isoformat())
+                logger.warning(f"[METRICS] backfill {d} failed: {e}")
+            done += 1
+            async with progress_lock:
+                await report("running")
+
+    try:
+        await report("running")
+        await asyncio.gather(*(worker() for _ in range(min(parallelism, len(days)))))
+        await report("failed" if failed else "success")
+    except Exception as e:
+        logger.exception(f"[METRICS] backfill job {job_id} aborted: {e}")
+        async with AsyncSessionLocal() as db:
+            await set_job_progress(db, job_id, "failed", done * 100 // len(days), f"aborted: {e}")
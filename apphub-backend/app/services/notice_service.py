@@ -6,35 +6,45 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.services.db_helpers import insert_returning_id
+from app.services.query_builder import ListQuery
+
 
 # 목록(필터 + 노출기간 + 우선순위) 조회
-SQL_LIST_NOTICES = text("""
-SELECT
-  n.id,
-  n.scope,
-  n.category_id,
-  n.app_id,
-  n.title,
-  n.body,
-  n.kind,
-  n.start_at,
-  n.end_at,
-  n.priority,
-  n.created_by,
-  n.created_at
-FROM notices n
-WHERE 1=1
-  AND (:scope IS NULL OR n.scope = :scope)
-  AND (:category_id IS NULL OR n.category_id = :category_id)
-  AND (:app_id IS NULL OR n.app_id = :app_id)
-  -- 슬라이드/노출용 기간 필터 (now 기준)
-  AND (n.start_at IS NULL OR n.start_at <= :now)
-  AND (n.end_at IS NULL OR n.end_at >= :now)
-ORDER BY
-  n.priority DESC,
-  n.created_at DESC
-LIMIT :limit OFFSET :offset
-""")
+# 기본 필드에서 body(MEDIUMTEXT) 제외 -> 목록은 제목/기간만, 본문은 단건 조회 또는 ?fields=*
+SQL_LIST_NOTICES = ListQuery(
+    "notice_service.SQL_LIST_NOTICES",
+    columns={
+        "id": "n.id",
+        "scope": "n.scope",
+        "category_id": "n.category_id",
+        "app_id": "n.app_id",
+        "title": "n.title",
+        "body": "n.body",
+        "kind": "n.kind",
+        "start_at": "n.start_at",
+        "end_at": "n.end_at",
+        "priority": "n.priority",
+        "created_by": "n.created_by",
+        "created_at": "n.created_at",
+    },
+    from_="FROM notices n",
+    filters={
+        "scope": "n.scope = :scope",
+        "category_id": "n.category_id = :category_id",
+        "app_id": "n.app_id = :app_id",
+    },
+    # 슬라이드/노출용 기간 필터 (now 기준)
+    where=(
+        "n.start_at IS NULL OR n.start_at <= :now",
+        "n.end_at IS NULL OR n.end_at >= :now",
+    ),
+    order_by="n.priority DESC, n.created_at DESC",
+    default_fields=(
+        "id", "scope", "category_id", "app_id", "title", "kind",
+        "start_at", "end_at", "priority", "created_by", "created_at",
+    ),
+)
 
 
 SQL_GET_NOTICE = text("""
@@ -95,12 +105,13 @@ async def list_notices(
     limit: int = 50,
     offset: int = 0,
     now: Optional[datetime] = None,
+    fields: Optional[tuple[str, ...]] = None,
 ) -> list[dict]:
     if now is None:
         now = datetime.utcnow()
 
-    res = await db.execute(
-        SQL_LIST_NOTICES,
+    res = await SQL_LIST_NOTICES.execute(
+        db,
         {
             "scope": scope,
             "category_id": category_id,
@@ -109,6 +120,7 @@ async def list_notices(
             "limit": int(limit),
             "offset": int(offset),
         },
+        fields=fields,
     )
     rows = res.mappings().all()
     return [dict(r) for r in rows]
@@ -134,7 +146,8 @@ async def create_notice(
     end_at: Optional[datetime] = None,
     priority: int = 0,
 ) -> int:
-    await db.execute(
+    notice_id = await insert_returning_id(
+        db,
         SQL_CREATE_NOTICE,
         {
             "scope": scope,
@@ -149,8 +162,6 @@ async def create_notice(
             "created_by": int(created_by),
         },
     )
-    res = await db.execute(text("SELECT LAST_INSERT_ID()"))
-    notice_id = int(res.scalar_one())
     await db.commit()
     return notice_id
 
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from datetime import date
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.metrics_service import (
+    SQL_APP_DAILY_BY_USER,
+    SQL_HUB_DAILY_BY_USER,
+    SQL_UPDATE_APP_DAILY_ACTIONS,
+)
+
+# 월 RANGE 파티션 대상 (migrations/003_monthly_partitioning.sql 적용 후)
+# 파티션 이름: pYYYYMM (해당 월 1일 이상 ~ 다음 달 1일 미만), p_history(마이그레이션 이전 전체), pmax
+PARTITIONED_TABLES: dict[str, str] = {
+    "hub_events": "occurred_at",
+    "app_run_sessions": "started_at",
+    "app_action_events": "occurred_at",
+}
+
+LOCK_NAME = "apphub_partition_maintenance"
+
+SQL_LIST_PARTITIONS = text("""
+SELECT
+  PARTITION_NAME AS name,
+  PARTITION_DESCRIPTION AS less_than,
+  TABLE_ROWS AS table_rows
+FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = :table
+  AND PARTITION_NAME IS NOT NULL
+ORDER BY PARTITION_ORDINAL_POSITION
+""")
+
+SQL_TABLE_EXISTS = text("""
+SELECT 1
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME = :table
+""")
+
+# 세션 idempotency 키 정리 (파티션 보관 기간과 같은 기준, 한 번에 LIMIT 건씩)
+SQL_PURGE_SESSION_KEYS = text("""
+DELETE FROM app_run_session_keys
+WHERE created_at < :cutoff
+LIMIT 10000
+""")
+
+SQL_GET_LOCK = text("SELECT GET_LOCK(:name, 0)")
+SQL_RELEASE_LOCK = text("SELECT RELEASE_LOCK(:name)")
+
+# 일 배치 statement별 파티션 pruning 확인용 (app_daily_actions는 reconcile 모드에서는 실행 안 됨)
+DAILY_BATCH_STATEMENTS = {
+    "hub_daily": SQL_HUB_DAILY_BY_USER,
+    "app_daily": SQL_APP_DAILY_BY_USER,
+    "app_daily_actions": SQL_UPDATE_APP_DAILY_ACTIONS,
+}
+
+
+def _month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.year * 12 + (d.month - 1) + n, 12)
+    return date(y, m + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def _bound(less_than: str | None) -> date | None:
+    # PARTITION_DESCRIPTION: "'2026-11-01 00:00:00'" / "'2026-11-01'" / "MAXVALUE"
+    if not less_than or less_than.upper() == "MAXVALUE":
+        return None
+    return date.fromisoformat(less_than.strip("'")[:10])
+
+
+async def list_partitions(db: AsyncSession, table: str) -> list[dict]:
+    res = await db.execute(SQL_LIST_PARTITIONS, {"table": table})
+    return [dict(r) for r in res.mappings().all()]
+
+
+async def partition_overview(db: AsyncSession) -> dict[str, list[dict]]:
+    return {table: await list_partitions(db, table) for table in PARTITIONED_TABLES}
+
+
+async def ensure_future_partitions(db: AsyncSession, table: str, months_ahead: int, today: date) -> list[str]:
+    """
+    이번 달 ~ months_ahead개월 뒤까지 월 파티션을 pmax에서 REORGANIZE로 분리
+    - pmax에 데이터가 없으면 메타데이터 작업이라 즉시 끝남 (미리 만들어 두는 이유)
+    """
+    parts = await list_partitions(db, table)
+    if not parts or parts[-1]["name"] != "pmax":
+        return []
+    last_bound = max((b for b in (_bound(p["less_than"]) for p in parts) if b is not None), default=None)
+
+    new_parts = []
+    for i in range(months_ahead + 1):
+        month = _add_months(_month_start(today), i)
+        upper = _add_months(month, 1)
+        if last_bound is not None and upper <= last_bound:
+            continue
+        new_parts.append((_partition_name(month), upper))
+    if not new_parts:
+        return []
+
+    defs = ", ".join(f"PARTITION {name} VALUES LESS THAN ('{upper:%Y-%m-%d}')" for name, upper in new_parts)
+    await db.execute(text(
+        f"ALTER TABLE `{table}` REORGANIZE PARTITION pmax INTO ({defs}, PARTITION pmax VALUES LESS THAN (MAXVALUE))"
+    ))
+    return [name for name, _ in new_parts]
+
+
+async def drop_expired_partitions(db: AsyncSession, table: str, retain_months: int, archive: bool, today: date) -> list[str]:
+    """
+    상한이 (이번 달 1일 - retain_months) 이하인 파티션 제거
+    - archive=True: 빈 {table}_archive_{partition} 테이블과 EXCHANGE PARTITION 후 DROP (둘 다 메타데이터 작업)
+    - archive=False: DROP PARTITION
+    """
+    cutoff = _add_months(_month_start(today), -retain_months)
+    parts = await list_partitions(db, table)
+    expired = [p["name"] for p in parts if (b := _bound(p["less_than"])) is not None and b <= cutoff]
+
+    done = []
+    for name in expired:
+        if archive:
+            archive_table = f"{table}_archive_{name}"
+            exists = (await db.execute(SQL_TABLE_EXISTS, {"table": archive_table})).first()
+            if exists:
+                # 이전 실행이 EXCHANGE까지 하고 멈춘 경우 등: 데이터를 되돌려 넣지 않도록 수동 확인
+                logger.warning(f"[PARTITION] {archive_table} already exists, skip {table}.{name}")
+                continue
+            await db.execute(text(f"CREATE TABLE `{archive_table}` LIKE `{table}`"))
+            await db.execute(text(f"ALTER TABLE `{archive_table}` REMOVE PARTITIONING"))
+            await db.execute(text(f"ALTER TABLE `{table}` EXCHANGE PARTITION {name} WITH TABLE `{archive_table}`"))
+        await db.execute(text(f"ALTER TABLE `{table}` DROP PARTITION {name}"))
+        done.append(name)
+    return done
+
+
+async def purge_session_keys(db: AsyncSession, retain_months: int, today: date) -> int:
+    # commit은 호출한 쪽 (중간 commit 시 session이 connection을 반납해 GET_LOCK을 잡은 connection이 바뀜)
+    cutoff = _add_months(_month_start(today), -retain_months)
+    purged = 0
+    while True:
+        res = await db.execute(SQL_PURGE_SESSION_KEYS, {"cutoff": cutoff})
+        purged += res.rowcount or 0
+        if (res.rowcount or 0) < 10000:
+            return purged
+
+
+async def run_partition_maintenance(db: AsyncSession, today: date | None = None) -> dict:
+    """
+    파티션 롤오버 1회 실행 (여러 worker가 동시에 돌지 않도록 GET_LOCK)
+    - 파티셔닝 안 된 테이블(003 미적용)은 건너뜀
+    - app_run_session_keys도 보관 기간(PARTITION_RETAIN_MONTHS)이 지난 키 삭제
+    """
+    today = today or date.today()
+    got = (await db.execute(SQL_GET_LOCK, {"name": LOCK_NAME})).scalar()
+    if not got:
+        return {"ok": False, "skipped": "locked"}
+
+    result: dict[str, dict] = {}
+    try:
+        for table in PARTITIONED_TABLES:
+            if not await list_partitions(db, table):
+                result[table] = {"partitioned": False}
+                continue
+            created = await ensure_future_partitions(db, table, settings.PARTITION_MONTHS_AHEAD, today)
+            removed = await drop_expired_partitions(
+                db, table, settings.PARTITION_RETAIN_MONTHS, settings.PARTITION_ARCHIVE, today
+            )
+            result[table] = {"partitioned": True, "created": created, "removed": removed}
+            if created or removed:
+                logger.info(f"[PARTITION] {table}: created={created} removed={removed}")
+        result["app_run_session_keys"] = {"purged": await purge_session_keys(db, settings.PARTITION_RETAIN_MONTHS, today)}
+    finally:
+        await db.execute(SQL_RELEASE_LOCK, {"name": LOCK_NAME})
+        await db.commit()
+    return {"ok": True, "tables": result}
+
+
+async def explain_daily_batch(db: AsyncSession, metric_date: str) -> dict[str, list[dict]]:
+    """
+    일 배치 SQL의 EXPLAIN partitions 컬럼 확인
+    - 정상: 이벤트 테이블은 해당 일자가 속한 월 파티션 1개만
+    - app_daily_actions의 rs(app_run_sessions)는 id 조인이라 전체 파티션 (파티션별 PK 1회 탐색)
+    """
+    out = {}
+    for key, stmt in DAILY_BATCH_STATEMENTS.items():
+        res = await db.execute(text("EXPLAIN " + stmt.text.strip().rstrip(";")), {"d": metric_date})
+        out[key] = [
+            {"table": r["table"], "partitions": r["partitions"], "type": r["type"], "rows": r["rows"]}
+            for r in res.mappings().all()
+        ]
+    await db.rollback()
+    return out
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from typing import Any, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+from app.db.profiler import sql_profiler
+
+# 목록 조회용 동적 WHERE 빌더
+# - (:x IS NULL OR col = :x) 형태는 MySQL이 실행 계획을 값과 무관하게 한 번 정하므로
+#   필터가 있어도 인덱스 range/ref 접근을 못 쓰고 full scan / filesort가 되기 쉬움
+# - 실제로 값이 주어진 필터의 조건만 붙이고, 필터 조합마다 text()를 1번만 만들어 재사용
+# - 조합별 SQL은 sql_profiler에 "이름[필터,...]"로 등록 -> /metrics/sql/top에서 조합별 통계
+# - SELECT 컬럼도 ?fields= 기준으로 줄임 (큰 TEXT/JSON 컬럼은 목록 기본 필드에서 제외)
+
+
+class Predicate(NamedTuple):
+    # sql: WHERE에 붙일 조건 (param 이름은 filters dict의 key와 같아야 함, 다른 param을 함께 써도 됨)
+    # join: 이 필터가 있을 때만 필요한 JOIN (같은 JOIN은 1번만 붙음)
+    sql: str
+    join: str | None = None
+
+
+def day_start(d: date | str | None) -> datetime | None:
+    # YYYY-MM-DD -> 그날 00:00:00 (컬럼에 함수/CONCAT 없이 범위 비교하도록 datetime으로 bind)
+    if d is None:
+        return None
+    if isinstance(d, str):
+        d = date.fromisoformat(d)
+    return datetime.combine(d, time.min)
+
+
+class ListQuery:
+    """
+    SELECT (필드) FROM ... [JOIN] WHERE (고정 조건 + 주어진 필터) ORDER BY ... [LIMIT :limit OFFSET :offset]
+    - columns: 응답 필드 이름 -> SQL 식 (정의 순서 = SELECT 순서)
+    - default_fields: ?fields= 없을 때 목록 기본 필드 (큰 컬럼 제외), None이면 전체
+    - required_fields: 항상 포함 (id, keyset cursor 정렬 키 등)
+    - filters: param 이름 -> 조건. param 값이 None이면 조건을 통째로 뺌
+    - where: 항상 붙는 조건 (notices 노출 기간 등)
+    - statement는 (필터 조합, paged, 필드 조합)별로 1번만 조립해 dict에 캐시
+      (필드 조합은 fields_for()가 정의 순서로 정규화하므로 순서만 다른 요청은 같은 key)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: dict[str, str],
+        from_: str,
+        filters: dict[str, str | Predicate],
+        order_by: str,
+        where: tuple[str, ...] = (),
+        default_fields: tuple[str, ...] | None = None,
+        required_fields: tuple[str, ...] = ("id",),
+    ):
+        self.name = name
+        self.columns = columns
+        self.from_ = from_.strip()
+        self.filters = {k: v if isinstance(v, Predicate) else Predicate(v) for k, v in filters.items()}
+        self.order_by = order_by
+        self.where = where
+        self.all_fields = tuple(columns)
+        self.required_fields = required_fields
+        self.default_fields = self._normalize(default_fields) if default_fields else self.all_fields
+        self._statements: dict[tuple[tuple[str, ...], bool, tuple[str, ...]], TextClause] = {}
+        # EXPLAIN용: 조합별 마지막 호출 param
+        self._last_params: dict[tuple[tuple[str, ...], tuple[str, ...]], dict[str, Any]] = {}
+        _QUERIES[name] = self
+
+    def _normalize(self, fields) -> tuple[str, ...]:
+        wanted = set(fields) | set(self.required_fields)
+        return tuple(f for f in self.all_fields if f in wanted)
+
+    def fields_for(self, spec: str | None) -> tuple[str, ...]:
+        """
+        ?fields= 해석: 없으면 default_fields, "*"면 전체, "a,b,c"면 해당 필드 + required_fields
+        - 모르는 필드는 ValueError
+        """
+        if not spec:
+            return self.default_fields
+        if spec.strip() == "*":
+            return self.all_fields
+        names = [f.strip() for f in spec.split(",") if f.strip()]
+        unknown = [f for f in names if f not in self.columns]
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(unknown)}")
+        return self._normalize(names)
+
+    def statement(
+        self, active: tuple[str, ...], paged: bool = True, fields: tuple[str, ...] | None = None
+    ) -> TextClause:
+        key = (active, paged, fields or self.default_fields)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = self._statements[key] = self._compile(*key)
+        return stmt
+
+    def _compile(self, active: tuple[str, ...], paged: bool, fields: tuple[str, ...]) -> TextClause:
+        joins: list[str] = []
+        conds = list(self.where)
+        for key in active:
+            pred = self.filters[key]
+            if pred.join and pred.join not in joins:
+                joins.append(pred.join)
+            conds.append(pred.sql)
+
+        select = ",\n  ".join(
+            expr if expr.rsplit(".", 1)[-1] == field else f"{expr} AS {field}"
+            for field, expr in ((f, self.columns[f]) for f in fields)
+        )
+        parts = [f"SELECT\n  {select}", self.from_, *joins]
+        if conds:
+            parts.append("WHERE " + "\n  AND ".join(f"({c})" for c in conds))
+        parts.append(f"ORDER BY {self.order_by}")
+        if paged:
+            parts.append("LIMIT :limit OFFSET :offset")
+        sql = "\n".join(parts)
+
+        # profiler 이름: 기본 필드면 생략, 아니면 필드 수만 (조합이 많아져도 이름이 길어지지 않게)
+        name = self.name if paged else f"{self.name}:all"
+        label = f"{name}[{','.join(active)}]" if active else name
+        if fields != self.default_fields:
+            label += f"{{{len(fields)} fields}}"
+        sql_profiler.register_statement(label, sql)
+        return text(sql)
+
+    def bind(
+        self, params: dict[str, Any], paged: bool = True, fields: tuple[str, ...] | None = None
+    ) -> tuple[TextClause, dict[str, Any]]:
+        # 필터 key 순서(정의 순)로 조합을 정해 같은 필터 집합은 항상 같은 statement
+        # paged=False: LIMIT/OFFSET 없이 전체 (export 스트리밍, 페이지 없는 목록)
+        # fields: fields_for()로 정규화한 값 (None이면 default_fields)
+        active = tuple(k for k in self.filters if params.get(k) is not None)
+        fields = fields or self.default_fields
+        if paged:
+            self._last_params[(active, fields)] = params
+        return self.statement(active, paged, fields), params
+
+    async def execute(
+        self, db: AsyncSession, params: dict[str, Any], paged: bool = True, fields: tuple[str, ...] | None = None
+    ):
+        stmt, bound = self.bind(params, paged=paged, fields=fields)
+        return await db.execute(stmt, bound)
+
+
+# 이름 -> ListQuery (EXPLAIN 점검용)
+_QUERIES: dict[str, ListQuery] = {}
+
+
+async def explain_list_queries(db: AsyncSession) -> dict[str, list[dict]]:
+    """
+    지금까지 실행된 필터 조합별로 마지막 param으로 EXPLAIN
+    - key: 가능한 인덱스 중 실제 선택, type: ref/range면 인덱스 탐색, ALL이면 full scan
+    - Extra에 Using filesort가 없으면 ORDER BY도 인덱스 순서로 해결
+    """
+    out: dict[str, list[dict]] = {}
+    for name, query in _QUERIES.items():
+        plans = []
+        for (active, fields), params in list(query._last_params.items()):
+            res = await db.execute(text("EXPLAIN " + query.statement(active, True, fields).text), params)
+            plans.append({
+                "filters": list(active),
+                "fields": len(fields),
+                "plan": [
+                    {
+                        "table": r["table"],
+                        "type": r["type"],
+                        "key": r["key"],
+                        "rows": r["rows"],
+                        "extra": r["Extra"],
+                    }
+                    for r in res.mappings().all()
+                ],
+            })
+        out[name] = plans
+    await db.rollback()
+    return out
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from loguru import logger
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache, register_cache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.services.app_event_service import session_id_param, session_id_str
+from app.services.metrics_service import invalidate_series, reconcile_mode, utc_day_closed
+
+# DB 저장 성공 시점 증분 -> 주기적으로 hub_daily_metrics / app_daily_metrics에 더하기 upsert
+# - 건수(page_open/search/launch/action/runtime)는 덧셈
+# - 고유 사용자(dau/unique_users)는 프로세스가 본 사용자 수로 GREATEST (하한값)
+#   -> 정확한 값은 run_daily_batch(야간 재계산)가 덮어씀
+# - 끝난 지 flush 주기*2 지난 날짜는 배치가 확정하는 값이므로 버림 (reconcile 모드의 action_count만 계속 더함)
+
+SQL_ADD_HUB_DAILY = text("""
+INSERT INTO hub_daily_metrics (metric_date, dau, page_open_count, search_count, created_at)
+VALUES (:d, :dau, :page_open_count, :search_count, NOW())
+ON DUPLICATE KEY UPDATE
+  dau = GREATEST(dau, VALUES(dau)),
+  page_open_count = page_open_count + VALUES(page_open_count),
+  search_count = search_count + VALUES(search_count),
+  created_at = VALUES(created_at);
+""")
+
+# apps에 없는 app_id는 건너뜀 (app_daily_metrics FK)
+SQL_ADD_APP_DAILY = text("""
+INSERT INTO app_daily_metrics (metric_date, app_id, unique_users, launch_count, total_runtime_sec, action_count, created_at)
+SELECT :d, a.id, :unique_users, :launch_count, :total_runtime_sec, :action_count, NOW()
+FROM apps a
+WHERE a.id = :app_id
+ON DUPLICATE KEY UPDATE
+  unique_users = GREATEST(unique_users, VALUES(unique_users)),
+  launch_count = launch_count + VALUES(launch_count),
+  total_runtime_sec = total_runtime_sec + VALUES(total_runtime_sec),
+  action_count = action_count + VALUES(action_count),
+  created_at = VALUES(created_at);
+""")
+
+# 캐시에 없는 세션(다른 worker가 시작 / TTL 만료)의 action 귀속용
+SQL_SESSION_APPS = text("""
+SELECT id, app_id, started_at
+FROM app_run_sessions
+WHERE id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+RESOLVE_CHUNK = 1000
+
+HUB_FIELDS = ("page_open_count", "search_count")
+APP_FIELDS = ("launch_count", "total_runtime_sec", "action_count")
+
+
+class RealtimeMetrics:
+    """
+    당일 지표 실시간 반영 (METRICS_REALTIME_ENABLED=true일 때만)
+    - DB에 실제로 쓴 쪽(라우터 직접 저장 / write-behind flush / spool replay)이 commit 후 record_* 호출
+      (spool로 넘어간 요청은 replay 때 1번만, 중복/버려진 행은 세지 않음)
+    - flush_sec마다 증분을 1회 upsert (실패하면 다음 flush로 다시 합침)
+    - 세션 시작 정보(app_id, started_at)를 캐시해 두고 action/종료를 앱별로 귀속
+      (캐시 miss인 action은 flush 때 세션을 조회해 귀속, 종료는 건너뜀 -> 실행 시간은 야간 배치가 재계산)
+    """
+
+    def __init__(self, enabled: bool, flush_sec: float, sessions: TTLCache):
+        self.enabled = enabled
+        self.flush_interval = float(flush_sec)
+
+        self._hub: dict[date, dict[str, int]] = defaultdict(lambda: dict.fromkeys(HUB_FIELDS, 0))
+        self._app: dict[tuple[date, int], dict[str, int]] = defaultdict(lambda: dict.fromkeys(APP_FIELDS, 0))
+        # 고유 사용자: 날짜별 전체 집합 유지 (flush마다 비우지 않음, 오래된 날짜만 정리)
+        self._hub_users: dict[date, set[int]] = defaultdict(set)
+        self._app_users: dict[tuple[date, int], set[int]] = defaultdict(set)
+        self._sessions = sessions
+        # 캐시 miss action: (날짜, session_id) -> 건수 (flush 때 조회해서 귀속)
+        self._unresolved: dict[tuple[date, str], int] = defaultdict(int)
+
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.unattributed = 0
+        self.late_dropped = 0
+
+    # -------------------------
+    # lifecycle
+    # -------------------------
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="realtime-metrics")
+        logger.info("[METRICS] realtime counters started")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    # -------------------------
+    # 수집 경로 (DB commit 후 호출)
+    # -------------------------
+    def record_hub_events(self, user_id: int, events: list[dict]) -> None:
+        if not self.enabled:
+            return
+        for ev in events:
+            d = ev["occurred_at"].date()
+            counters = self._hub[d]
+            if ev["event_type"] == "page_open":
+                counters["page_open_count"] += 1
+            elif ev["event_type"] == "search":
+                counters["search_count"] += 1
+            self._hub_users[d].add(int(user_id))
+
+    def record_session_start(self, session_id: str, app_id: int, user_id: int | None, started_at: datetime) -> None:
+        if not self.enabled:
+            return
+        key = (started_at.date(), int(app_id))
+        self._app[key]["launch_count"] += 1
+        if user_id:
+            self._app_users[key].add(int(user_id))
+        self._sessions.set(session_id, (int(app_id), started_at))
+
+    def record_session_end(self, session_id: str, ended_at: datetime) -> None:
+        # 같은 세션의 두 번째 종료(재시도)는 세지 않도록 pop
+        if not self.enabled:
+            return
+        info = self._sessions.get(session_id)
+        if info is None:
+            self.unattributed += 1
+            return
+        self._sessions.pop(session_id)
+        app_id, started_at = info
+        if (started_at.tzinfo is None) != (ended_at.tzinfo is None):
+            # naive/aware가 섞이면 빼기 불가 -> 야간 배치에 맡김
+            self.unattributed += 1
+            return
+        # 배치와 같은 기준: started_at 날짜에 TIMESTAMPDIFF(SECOND, started_at, ended_at)
+        self._app[(started_at.date(), app_id)]["total_runtime_sec"] += int((ended_at - started_at).total_seconds())
+
+    def record_written(self, sessions: list[dict], actions: list[dict], ends: list[dict]) -> None:
+        # write-behind flush / spool replay: commit된 row만 (세션 -> action -> 종료 순, 같은 batch의 action도 귀속)
+        if not self.enabled:
+            return
+        for row in sessions:
+            self.record_session_start(row["id"], row["app_id"], row["user_id"], row["started_at"])
+        self.record_actions(actions)
+        for row in ends:
+            self.record_session_end(row["id"], row["ended_at"])
+
+    def record_actions(self, rows: list[dict]) -> None:
+        # rows: session_id, occurred_at
+        if not self.enabled:
+            return
+        for row in rows:
+            d = row["occurred_at"].date()
+            info = self._sessions.get(row["session_id"])
+            if info is None:
+                self._unresolved[(d, row["session_id"])] += 1
+                continue
+            self._app[(d, info[0])]["action_count"] += 1
+
+    # -------------------------
+    # flush
+    # -------------------------
+    async def flush(self) -> None:
+        if not self.enabled:
+            return
+        async with self._lock:
+            hub, self._hub = self._hub, defaultdict(lambda: dict.fromkeys(HUB_FIELDS, 0))
+            app, self._app = self._app, defaultdict(lambda: dict.fromkeys(APP_FIELDS, 0))
+            unresolved, self._unresolved = self._unresolved, defaultdict(int)
+            if not hub and not app and not unresolved:
+                return
+
+            leftover = unresolved
+            try:
+                async with AsyncSessionLocal() as db:
+                    if unresolved:
+                        leftover = await self._attribute(db, unresolved, app)
+                    hub_rows, app_rows = self._rows(hub, app)
+                    if hub_rows:
+                        await db.execute(SQL_ADD_HUB_DAILY, hub_rows)
+                    if app_rows:
+                        await db.execute(SQL_ADD_APP_DAILY, app_rows)
+                    await db.commit()
+                self.flushed_rows += len(hub_rows) + len(app_rows)
+                invalidate_series({row["d"] for row in hub_rows} | {row["d"] for row in app_rows})
+                self._keep_unresolved(leftover)
+            except Exception as e:
+                # 증분을 되돌려 놓고 다음 flush에서 재시도
+                self.failed_flushes += 1
+                self._merge_back(hub, app, leftover)
+                logger.warning(f"[METRICS] realtime flush failed (will retry): {e}")
+            self._prune_users()
+
+    async def _attribute(
+        self, db: AsyncSession, unresolved: dict[tuple[date, str], int], app: dict
+    ) -> dict[tuple[date, str], int]:
+        # 캐시 miss action을 세션 조회로 앱에 귀속 (조회가 끝난 뒤에만 app에 더함), 반환: 아직 못 찾은 것
+        ids = list({sid for _, sid in unresolved})
+        found: dict[str, tuple[int, datetime]] = {}
+        for i in range(0, len(ids), RESOLVE_CHUNK):
+            res = await db.execute(SQL_SESSION_APPS, {"ids": [session_id_param(sid) for sid in ids[i:i + RESOLVE_CHUNK]]})
+            for sid, app_id, started_at in res.all():
+                found[session_id_str(sid)] = (int(app_id), started_at)
+
+        leftover = {}
+        for (d, sid), n in unresolved.items():
+            info = found.get(sid)
+            if info is None:
+                # 다른 worker의 write-behind queue / spool에 아직 있는 세션일 수 있음
+                leftover[(d, sid)] = n
+                continue
+            app[(d, info[0])]["action_count"] += n
+        for sid, info in found.items():
+            self._sessions.set(sid, info)
+        return leftover
+
+    def _rows(self, hub: dict, app: dict) -> tuple[list[dict], list[dict]]:
+        # 끝난 지 flush 주기*2 지난 날짜: 배치가 다시 계산하는 값은 버림 (배치보다 늦게 더해지면 이중 집계)
+        now = datetime.now(timezone.utc)
+        grace = self.flush_interval * 2
+        keep_actions = reconcile_mode()
+        hub_rows, app_rows = [], []
+        for d, counters in hub.items():
+            if utc_day_closed(d, now, grace):
+                self.late_dropped += sum(counters.values())
+                continue
+            hub_rows.append({"d": d, "dau": len(self._hub_users.get(d, ())), **counters})
+        for (d, app_id), counters in app.items():
+            unique_users = len(self._app_users.get((d, app_id), ()))
+            if utc_day_closed(d, now, grace):
+                actions = counters["action_count"] if keep_actions else 0
+                self.late_dropped += counters["launch_count"] + counters["action_count"] - actions
+                if not actions:
+                    continue
+                counters, unique_users = {**dict.fromkeys(APP_FIELDS, 0), "action_count": actions}, 0
+            app_rows.append({"d": d, "app_id": app_id, "unique_users": unique_users, **counters})
+        return hub_rows, app_rows
+
+    def _keep_unresolved(self, leftover: dict[tuple[date, str], int]) -> None:
+        # 어제/오늘 날짜만 다음 flush에서 다시 조회, 그보다 오래된 것은 포기 (backfill로 보정)
+        keep_from = datetime.now(timezone.utc).date() - timedelta(days=1)
+        for (d, sid), n in leftover.items():
+            if d >= keep_from:
+                self._unresolved[(d, sid)] += n
+            else:
+                self.unattributed += n
+
+    def _merge_back(self, hub: dict, app: dict, unresolved: dict) -> None:
+        for d, counters in hub.items():
+            for k, v in counters.items():
+                self._hub[d][k] += v
+        for key, counters in app.items():
+            for k, v in counters.items():
+                self._app[key][k] += v
+        for key, n in unresolved.items():
+            self._unresolved[key] += n
+
+    def _prune_users(self) -> None:
+        # 어제/오늘(UTC) 이외 날짜의 사용자 집합은 버림 (늦게 온 이벤트는 하한값만 약해짐)
+        keep_from = datetime.now(timezone.utc).date() - timedelta(days=1)
+        for d in [d for d in self._hub_users if d < keep_from]:
+            del self._hub_users[d]
+        for key in [key for key in self._app_users if key[0] < keep_from]:
+            del self._app_users[key]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending_hub_days": len(self._hub),
+            "pending_app_rows": len(self._app),
+            "unresolved_actions": sum(self._unresolved.values()),
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+            "unattributed": self.unattributed,
+            "late_dropped": self.late_dropped,
+        }
+
+
+# session_id -> (app_id, started_at): 이 프로세스에서 저장한 세션 + flush 때 조회한 세션
+_session_info = register_cache(
+    "realtime_session",
+    TTLCache(max_size=settings.SESSION_CACHE_MAX_SIZE, ttl_sec=settings.METRICS_REALTIME_SESSION_TTL_SEC),
+)
+
+realtime_metrics = RealtimeMetrics(
+    enabled=settings.METRICS_REALTIME_ENABLED,
+    flush_sec=settings.METRICS_REALTIME_FLUSH_SEC,
+    sessions=_session_info,
+)
+
+
+def _collect_realtime_metrics():
+    st = realtime_metrics.stats()
+    yield ("apphub_realtime_metrics_failed_flushes_total", "counter", "Realtime counter flushes that failed", [({}, st["failed_flushes"])])
+    yield ("apphub_realtime_metrics_unattributed_total", "counter", "Action/end events not attributed to an app (left to the nightly batch)", [({}, st["unattributed"])])
+    yield ("apphub_realtime_metrics_late_dropped_total", "counter", "Increments dropped because the UTC day was already closed for the batch", [({}, st["late_dropped"])])
+
+
+metrics.add_collector(_collect_realtime_metrics)
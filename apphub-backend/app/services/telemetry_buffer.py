@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.services.app_event_service import (
+    SQL_END_SESSION,
+    add_action_events_dedup,
+    create_sessions_dedup,
+    session_id_param,
+)
+from app.services.realtime_metrics import realtime_metrics
+from app.services.telemetry_spool import (
+    DB_UNAVAILABLE_ERRORS,
+    KIND_ACTION,
+    KIND_END,
+    KIND_SESSION,
+    telemetry_spool,
+)
+
+# 종류별 flush 순서: 세션 INSERT -> action INSERT(FK) -> 세션 종료 UPDATE
+
+_flush_seconds = metrics.histogram(
+    "apphub_telemetry_flush_seconds",
+    "Write-behind telemetry flush latency",
+).labels()
+_flush_rows = metrics.histogram(
+    "apphub_telemetry_flush_rows",
+    "Rows written per write-behind telemetry flush",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+).labels()
+
+
+class TelemetryBackpressure(Exception):
+    """queue가 가득 차서 ENQUEUE_TIMEOUT 안에 넣지 못함 -> 라우터에서 503 처리"""
+
+
+class TelemetryWriteBehind:
+    """
+    app_run_sessions / app_action_events write-behind buffer (TELEMETRY_WRITE_BEHIND=true일 때만)
+    - 요청은 bounded asyncio.Queue에 넣고 바로 응답
+    - 백그라운드 task가 flush_ms 경과 또는 flush_rows 도달 시 multi-row INSERT로 기록
+    - queue 여유가 없으면 enqueue_timeout_ms 동안 대기 후 TelemetryBackpressure
+      (batch 요청은 전체가 들어갈 자리가 생길 때만 넣음 -> 일부만 들어가고 503 나는 일 없음)
+    - flush 중 데이터 오류(길이 초과, enum 등)는 batch를 반씩 나눠 재시도 -> 문제 행만 버림
+    - 아직 flush 안 된 세션 id는 pending으로 기억 (action/end 요청의 존재 확인용)
+    """
+
+    def __init__(self, enabled: bool, max_queue: int, flush_ms: int, flush_rows: int, enqueue_timeout_ms: int):
+        self.enabled = enabled
+        self.max_queue = int(max_queue)
+        self.flush_interval = flush_ms / 1000.0
+        self.flush_rows = int(flush_rows)
+        self.enqueue_timeout = enqueue_timeout_ms / 1000.0
+
+        self._queue: asyncio.Queue[tuple[str, dict]] | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        # _drain으로 queue 자리가 났을 때 (submit_many 대기용)
+        self._space = asyncio.Event()
+        self._stopping = False
+        self._pending_sessions: set[str] = set()
+
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+
+    # -------------------------
+    # lifecycle
+    # -------------------------
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name="telemetry-write-behind")
+        logger.info("[TELEMETRY] write-behind buffer started")
+
+    async def stop(self) -> None:
+        """shutdown 시 호출: 남은 이벤트를 모두 flush (진행 중인 flush는 끊지 않음)"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        logger.info("[TELEMETRY] write-behind buffer drained")
+
+    # -------------------------
+    # 요청 경로
+    # -------------------------
+    async def submit(self, kind: str, row: dict) -> None:
+        await self.submit_many([(kind, row)])
+
+    async def submit_many(self, items: list[tuple[str, dict]]) -> None:
+        """
+        items 전체를 한 번에 넣거나(all) 하나도 넣지 않음(none)
+        - 자리 확인 ~ put_nowait 사이에 await가 없으므로 다른 요청이 끼어들 수 없음
+        """
+        if not items:
+            return
+        if len(items) > self.max_queue:
+            self.rejected += len(items)
+            raise TelemetryBackpressure("telemetry batch is larger than the queue")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.enqueue_timeout
+        while self.max_queue - self._queue.qsize() < len(items):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.rejected += len(items)
+                raise TelemetryBackpressure("telemetry queue is full")
+            # flush를 앞당기고 자리가 날 때까지 대기
+            self._space.clear()
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        for kind, row in items:
+            self._queue.put_nowait((kind, row))
+            if kind == KIND_SESSION:
+                self._pending_sessions.add(row["id"])
+        self.enqueued += len(items)
+        if self._queue.qsize() >= self.flush_rows:
+            self._wakeup.set()
+
+    def is_pending_session(self, session_id: str) -> bool:
+        return session_id in self._pending_sessions
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+        }
+
+    # -------------------------
+    # 백그라운드 flush
+    # -------------------------
+    async def _run(self) -> None:
+        while True:
+            # flush_ms마다, 또는 flush_rows 이상 쌓이면 즉시 flush
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._queue.qsize() > 0:
+                await self._flush(self._drain(self.flush_rows))
+                if self._queue.qsize() < self.flush_rows and not self._stopping:
+                    break
+
+            if self._stopping and self._queue.empty():
+                return
+
+    def _drain(self, n: int) -> list[tuple[str, dict]]:
+        out = []
+        while len(out) < n and not self._queue.empty():
+            out.append(self._queue.get_nowait())
+        if out:
+            self._space.set()
+        return out
+
+    async def _flush(self, batch: list[tuple[str, dict]]) -> None:
+        if not batch:
+            return
+        if telemetry_spool.active:
+            # DB 장애 중: spool이 빌 때까지는 순서 유지를 위해 spool로
+            await self._spool(batch)
+            self._release_pending(batch)
+            return
+
+        start = time.perf_counter()
+        # 데이터 오류가 난 묶음은 반으로 나눠 앞쪽부터 다시 (원래 순서 유지 -> 세션이 action보다 먼저)
+        chunks = [batch]
+        try:
+            while chunks:
+                chunk = chunks.pop(0)
+                try:
+                    await self._write(chunk)
+                    self.flushed_rows += len(chunk)
+                except DB_UNAVAILABLE_ERRORS as e:
+                    # 이미 쓴 묶음은 빼고 나머지만 spool (중복 방지)
+                    rest = [item for c in (chunk, *chunks) for item in c]
+                    if not telemetry_spool.enabled:
+                        self.failed_rows += len(rest)
+                        logger.exception(f"[TELEMETRY] flush failed ({len(rest)} rows dropped): {e}")
+                        return
+                    telemetry_spool.mark_degraded(e)
+                    await self._spool(rest)
+                    return
+                except Exception as e:
+                    if len(chunk) > 1:
+                        mid = len(chunk) // 2
+                        chunks[:0] = [chunk[:mid], chunk[mid:]]
+                        continue
+                    kind, row = chunk[0]
+                    self.failed_rows += 1
+                    logger.error(f"[TELEMETRY] dropping bad {kind} row (session={row.get('session_id') or row.get('id')}): {e}")
+        finally:
+            self._release_pending(batch)
+            _flush_seconds.observe(time.perf_counter() - start)
+            _flush_rows.observe(len(batch))
+
+    async def _write(self, batch: list[tuple[str, dict]]) -> None:
+        # batch 1개 = transaction 1개 (실패하면 전체 rollback)
+        sessions = [row for kind, row in batch if kind == KIND_SESSION]
+        actions = [row for kind, row in batch if kind == KIND_ACTION]
+        ends = [row for kind, row in batch if kind == KIND_END]
+        async with AsyncSessionLocal() as db:
+            if sessions:
+                # 중복 키(다른 프로세스에서 이미 받은 재시도)만 skip, 데이터 오류는 _flush에서 행 단위로 분리
+                sessions = await create_sessions_dedup(db, sessions)
+            if actions:
+                actions = await add_action_events_dedup(db, actions, count_new=realtime_metrics.enabled)
+            if ends:
+                await db.execute(SQL_END_SESSION, [{**row, "id": session_id_param(row["id"])} for row in ends])
+            await db.commit()
+        # 실시간 지표는 commit된 row만 (실패한 batch는 _flush가 나눠 재시도 / spool replay에서 기록)
+        realtime_metrics.record_written(sessions, actions, ends)
+
+    def _release_pending(self, batch: list[tuple[str, dict]]) -> None:
+        for kind, row in batch:
+            if kind == KIND_SESSION:
+                self._pending_sessions.discard(row["id"])
+
+    async def _spool(self, batch: list[tuple[str, dict]]) -> None:
+        try:
+            await telemetry_spool.append(batch)
+            self.flushed_rows += len(batch)
+        except Exception as e:
+            self.failed_rows += len(batch)
+            logger.exception(f"[TELEMETRY] spool write failed ({len(batch)} rows dropped): {e}")
+
+
+telemetry_buffer = TelemetryWriteBehind(
+    enabled=settings.TELEMETRY_WRITE_BEHIND,
+    max_queue=settings.TELEMETRY_QUEUE_MAX,
+    flush_ms=settings.TELEMETRY_FLUSH_MS,
+    flush_rows=settings.TELEMETRY_FLUSH_ROWS,
+    enqueue_timeout_ms=settings.TELEMETRY_ENQUEUE_TIMEOUT_MS,
+)
+
+
+def _collect_telemetry_metrics():
+    st = telemetry_buffer.stats()
+    yield ("apphub_telemetry_queue_depth", "gauge", "Telemetry events waiting for flush", [({}, st["queued"])])
+    yield ("apphub_telemetry_rejected_total", "counter", "Telemetry events rejected by backpressure", [({}, st["rejected"])])
+    yield ("apphub_telemetry_failed_rows_total", "counter", "Telemetry rows lost in failed flushes", [({}, st["failed_rows"])])
+
+
+metrics.add_collector(_collect_telemetry_metrics)
@@ -0,0 +1,544 @@
+from __future__ import annotations
+
+import asyncio
+import glob
+import os
+import shutil
+import socket
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, TypeVar
+
+import orjson
+from loguru import logger
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.services.app_event_service import (
+    SQL_END_SESSION,
+    add_action_events_dedup,
+    create_sessions_dedup,
+    get_existing_session_ids,
+    session_id_param,
+    session_id_str,
+)
+from app.services.realtime_metrics import realtime_metrics
+
+T = TypeVar("T")
+
+# 텔레메트리 레코드 종류 (write-behind buffer / spool 공통)
+KIND_SESSION = "session"
+KIND_ACTION = "action"
+KIND_END = "end"
+
+# replay 시 중복 방지: 세션/키 있는 action은 PK/unique index 기준 skip, 키 없는 action은 아래 자연키 개수 비교
+SQL_ACTION_KEYS_BY_SESSIONS = text("""
+SELECT session_id, occurred_at, action_type, action_name
+FROM app_action_events
+WHERE session_id IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+# DB가 느리거나 죽었을 때로 보는 예외 (IntegrityError 같은 데이터 오류는 제외)
+DB_UNAVAILABLE_ERRORS = (asyncio.TimeoutError, PoolTimeoutError, OperationalError, InterfaceError)
+
+_DATETIME_KEYS = ("started_at", "ended_at", "occurred_at")
+_SEGMENT_GLOB = "seg-*.jsonl"
+# 프로세스별 하위 디렉터리의 소유 표시: 살아 있는 동안 이 파일에 배타 lock 유지
+_OWNER_LOCK = ".owner.lock"
+
+
+def _try_lock(fd: int) -> bool:
+    # 비차단 배타 lock (다른 프로세스가 잡고 있으면 False, 프로세스가 죽으면 OS가 해제)
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _finish(batch: list[tuple[bytes, asyncio.Future]], error: BaseException | None = None) -> None:
+    # append()에서 기다리는 요청에 결과 전달
+    for _, fut in batch:
+        if not fut.done():
+            if error is None:
+                fut.set_result(None)
+            else:
+                fut.set_exception(error)
+
+
+def _decode_records(raw: bytes, source: str) -> list[tuple[str, dict]]:
+    records: list[tuple[str, dict]] = []
+    for line in raw.splitlines():
+        try:
+            kind, row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # fsync 전에 죽어서 잘린 마지막 줄
+            logger.warning(f"[SPOOL] skipping truncated record in {source}")
+            continue
+        for key in _DATETIME_KEYS:
+            if isinstance(row.get(key), str):
+                row[key] = datetime.fromisoformat(row[key])
+        records.append((kind, row))
+    return records
+
+
+class TelemetrySpool:
+    """
+    DB 장애/지연 시 텔레메트리를 로컬 디스크에 쌓아두는 append-only spool (TELEMETRY_SPOOL_ENABLED=true)
+    - DB 쓰기가 TELEMETRY_DB_BUDGET_MS를 넘기거나 연결 오류면 spool에 기록하고 바로 응답
+    - 한 번 spool로 넘어가면(degraded) spool이 빌 때까지 이후 쓰기도 spool로 (순서 보장)
+    - 파일은 segment 단위(seg-<ns>.jsonl), 동시에 들어온 쓰기는 한 번의 write + fsync로 묶음(group commit)
+    - 프로세스마다 TELEMETRY_SPOOL_DIR/<host>-<pid>-<기동 ns>/ 에만 쓰고 replay (worker/컨테이너가 여럿이어도
+      남이 쓰는 중인 segment를 읽거나 지우지 않음)
+    - 소유 프로세스가 죽은 디렉터리(owner lock이 풀림)는 lock을 잡은 1개 프로세스가 segment를 자기 디렉터리로
+      rename해서 가져감 (재기동으로 pid가 바뀐 경우 포함)
+    - 백그라운드 replayer가 주기적으로 segment를 DB에 bulk 반영 후 삭제 (at-least-once)
+      -> 세션은 app_run_session_keys / PK, action은 ON DUPLICATE KEY no-op(idempotency_key) + (session_id, occurred_at, action_type, action_name) 개수 비교로 중복 제거
+    - 데이터 오류(길이 초과, enum 등)가 난 chunk는 반씩 나눠 재시도 -> 문제 행만 버림 (segment 전체가 막히지 않게)
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        directory: str,
+        segment_bytes: int,
+        db_budget_ms: int,
+        replay_interval_sec: float,
+        replay_chunk_rows: int,
+    ):
+        self.enabled = enabled
+        self.root = directory
+        self.directory: str | None = None  # start()에서 만드는 이 프로세스 전용 하위 디렉터리
+        self._owner_fd: int | None = None
+        self.segment_bytes = int(segment_bytes)
+        self.db_budget = db_budget_ms / 1000.0
+        self.replay_interval = float(replay_interval_sec)
+        self.replay_chunk_rows = int(replay_chunk_rows)
+
+        self.degraded = False
+        self._pending: list[tuple[bytes, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._io_lock = asyncio.Lock()
+        self._stopping = False
+        self._writer_task: asyncio.Task | None = None
+        self._replayer_task: asyncio.Task | None = None
+        self._fp = None
+        self._segment_path: str | None = None
+
+        self.spooled = 0
+        self.replayed = 0
+        self.deduped = 0
+        self.orphaned = 0
+        self.dropped = 0
+        self.fsyncs = 0
+
+    @property
+    def active(self) -> bool:
+        return self.enabled and self.degraded
+
+    # -------------------------
+    # lifecycle
+    # -------------------------
+    async def start(self) -> None:
+        if not self.enabled or self._writer_task is not None:
+            return
+        self._claim_directory()
+        # 죽은 프로세스(이전 기동 포함)가 남긴 segment가 있으면 가져와서 replay 끝날 때까지 spool 모드
+        self._adopt_orphans()
+        if self._segments():
+            self.degraded = True
+        self._stopping = False
+        self._writer_task = asyncio.create_task(self._writer(), name="telemetry-spool-writer")
+        self._replayer_task = asyncio.create_task(self._replayer(), name="telemetry-spool-replayer")
+        logger.info(f"[SPOOL] started dir={self.directory} degraded={self.degraded}")
+
+    async def stop(self) -> None:
+        """shutdown 시: 대기 중인 쓰기 fsync 후 종료 (남은 segment는 다음 기동 때 replay)"""
+        if self._writer_task is None:
+            return
+        self._replayer_task.cancel()
+        try:
+            await self._replayer_task
+        except asyncio.CancelledError:
+            pass
+        self._stopping = True
+        self._wakeup.set()
+        await self._writer_task
+        self._writer_task = self._replayer_task = None
+        self._close_segment()
+        self._release_owner()
+
+    def _claim_directory(self) -> None:
+        """
+        이 프로세스 전용 하위 디렉터리를 만들고 owner lock을 잡음
+        - 이름에 기동 시각을 넣어 재기동(같은 host/pid)과 겹치지 않음 -> 이전 디렉터리는 orphan으로 가져옴
+        - lock을 잡기 전에 다른 프로세스의 orphan 정리에 걸렸으면(lock 실패 / 파일 삭제됨) 새 이름으로 다시
+        """
+        for _ in range(5):
+            path = os.path.join(self.root, f"{socket.gethostname()}-{os.getpid()}-{time.time_ns()}")
+            os.makedirs(path)
+            try:
+                fd = os.open(os.path.join(path, _OWNER_LOCK), os.O_RDWR | os.O_CREAT)
+            except OSError:
+                continue
+            if _try_lock(fd) and os.fstat(fd).st_nlink > 0:
+                self.directory, self._owner_fd = path, fd
+                return
+            os.close(fd)
+        raise RuntimeError(f"could not claim a spool directory under {self.root}")
+
+    def _release_owner(self) -> None:
+        # 남은 segment가 없으면 디렉터리 정리, 있으면 lock만 풀어서 다른 프로세스/다음 기동이 가져가게 함
+        if self._owner_fd is None:
+            return
+        empty = not self._segments()
+        os.close(self._owner_fd)
+        self._owner_fd = None
+        if empty:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    # -------------------------
+    # 요청 경로
+    # -------------------------
+    async def run_or_spool(
+        self,
+        db: AsyncSession,
+        records: list[tuple[str, dict]],
+        write: Callable[[], Awaitable[T]],
+    ) -> tuple[T | None, bool]:
+        """
+        write()를 DB budget 안에서 실행, 실패/초과 시 records를 spool에 기록
+        반환: (write 결과 | None, spool 여부)
+        """
+        if not self.enabled:
+            return await write(), False
+        if not self.degraded:
+            try:
+                return await asyncio.wait_for(write(), self.db_budget), False
+            except DB_UNAVAILABLE_ERRORS as e:
+                self.mark_degraded(e)
+                await _discard(db)
+        await self.append(records)
+        return None, True
+
+    async def read_or_fallback(
+        self,
+        db: AsyncSession,
+        read: Callable[[], Awaitable[T]],
+        fallback: Callable[[], T],
+    ) -> T:
+        """텔레메트리 경로의 DB 조회 (존재 확인 등): 장애 중이면 fallback() (캐시 기반) 결과 사용"""
+        if not self.enabled:
+            return await read()
+        if not self.degraded:
+            try:
+                return await asyncio.wait_for(read(), self.db_budget)
+            except DB_UNAVAILABLE_ERRORS as e:
+                self.mark_degraded(e)
+                await _discard(db)
+        return fallback()
+
+    def mark_degraded(self, reason: BaseException) -> None:
+        if not self.degraded:
+            logger.warning(f"[SPOOL] DB unavailable, spooling telemetry: {type(reason).__name__}: {reason}")
+        self.degraded = True
+
+    async def append(self, records: list[tuple[str, dict]]) -> None:
+        """records를 spool에 기록 (fsync 완료 후 반환)"""
+        if not records:
+            return
+        data = b"".join(orjson.dumps([kind, row]) + b"\n" for kind, row in records)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((data, fut))
+        self._wakeup.set()
+        await fut
+        self.spooled += len(records)
+
+    def stats(self) -> dict:
+        segments = self._segments()
+        return {
+            "enabled": self.enabled,
+            "degraded": self.degraded,
+            "segments": len(segments),
+            "bytes": sum(_size(p) for p in segments),
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "deduped": self.deduped,
+            "orphaned": self.orphaned,
+            "dropped": self.dropped,
+            "fsyncs": self.fsyncs,
+        }
+
+    # -------------------------
+    # writer (group commit)
+    # -------------------------
+    async def _writer(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # write/fsync 도중 들어온 요청은 다음 회차에 한꺼번에 처리됨
+            while self._pending:
+                # batch는 lock 안에서 꺼냄 -> replayer가 lock을 쥐고 마무리하는 동안 들어온 요청은 _pending에 남음
+                async with self._io_lock:
+                    batch, self._pending = self._pending, []
+                    if not batch:
+                        break
+                    try:
+                        await asyncio.to_thread(self._write_sync, b"".join(d for d, _ in batch))
+                    except Exception as e:
+                        logger.exception(f"[SPOOL] write failed: {e}")
+                        _finish(batch, e)
+                        continue
+                _finish(batch)
+            if self._stopping:
+                return
+
+    def _write_sync(self, data: bytes) -> None:
+        if self._fp is None:
+            self._segment_path = os.path.join(self.directory, f"seg-{time.time_ns():020d}.jsonl")
+            self._fp = open(self._segment_path, "ab")
+        self._fp.write(data)
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self.fsyncs += 1
+        if self._fp.tell() >= self.segment_bytes:
+            self._close_segment()
+
+    def _close_segment(self) -> None:
+        if self._fp is not None:
+            try:
+                self._fp.close()
+            finally:
+                self._fp = None
+                self._segment_path = None
+
+    def _segments(self) -> list[str]:
+        if self.directory is None:
+            return []
+        return sorted(glob.glob(os.path.join(self.directory, _SEGMENT_GLOB)))
+
+    def _adopt_orphans(self) -> int:
+        """
+        소유 프로세스가 죽은 다른 하위 디렉터리의 segment를 내 디렉터리로 옮김 (옮긴 개수 반환)
+        - owner lock을 잡을 수 있어야만 가져감 -> 살아 있는 프로세스가 쓰는 중인 파일은 건드리지 않음
+        - rename은 같은 파일시스템 안에서 원자적이라 두 프로세스가 같은 segment를 replay하지 않음
+        """
+        moved = 0
+        for entry in os.scandir(self.root):
+            if not entry.is_dir() or entry.path == self.directory:
+                continue
+            try:
+                # lock 파일이 아직 없으면 막 만들어지는 중인 디렉터리 -> 건드리지 않음
+                fd = os.open(os.path.join(entry.path, _OWNER_LOCK), os.O_RDWR)
+            except OSError:
+                continue
+            try:
+                if not _try_lock(fd):
+                    continue  # 살아 있는 프로세스
+                for path in sorted(glob.glob(os.path.join(entry.path, _SEGMENT_GLOB))):
+                    # 이름(seg-<ns>) 유지 -> 내 segment와 시간 순으로 섞여 replay
+                    os.rename(path, os.path.join(self.directory, os.path.basename(path)))
+                    moved += 1
+                # lock을 쥔 채로 삭제 (그 사이 다른 프로세스가 같은 디렉터리를 잡지 못하게)
+                shutil.rmtree(entry.path, ignore_errors=True)
+            finally:
+                os.close(fd)
+        if moved:
+            logger.info(f"[SPOOL] adopted {moved} segments from stopped processes")
+        return moved
+
+    # -------------------------
+    # replayer
+    # -------------------------
+    async def _replayer(self) -> None:
+        while True:
+            await asyncio.sleep(self.replay_interval)
+            try:
+                if self._adopt_orphans():
+                    # 가져온 segment는 지금 DB에 쓰는 것보다 오래된 기록 -> 순서 유지를 위해 spool 모드로
+                    self.degraded = True
+            except OSError as e:
+                logger.warning(f"[SPOOL] orphan scan failed: {e}")
+            if not self.degraded:
+                continue
+            try:
+                await self._replay_all()
+            except DB_UNAVAILABLE_ERRORS as e:
+                logger.info(f"[SPOOL] DB still unavailable, replay postponed: {type(e).__name__}")
+            except Exception as e:
+                logger.exception(f"[SPOOL] replay failed: {e}")
+
+    async def _replay_all(self) -> None:
+        """
+        segment replay 후 direct DB 쓰기로 복귀
+        - lock 없이: 닫힌 segment를 replay (그 사이 들어온 쓰기는 새 segment로) -> 쓰는 중인 segment 1개만 남을 때까지 반복
+        - 마무리는 _io_lock 안에서: 마지막 segment + 아직 파일에 안 쓴 _pending까지 replay하고, lock을 놓기 전에
+          degraded=False (쓰기가 계속 들어와도 새 segment가 생기지 않으므로 spool 모드에서 빠져나옴)
+        """
+        while True:
+            async with self._io_lock:
+                # 쓰는 중인 segment를 닫아서 replay 대상에 포함
+                self._close_segment()
+            segments = self._segments()
+            if len(segments) <= 1:
+                break
+            for path in segments:
+                await self._replay_segment(path)
+                os.remove(path)
+
+        async with self._io_lock:
+            self._close_segment()
+            for path in self._segments():
+                await self._replay_segment(path)
+                os.remove(path)
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    await self._replay_records(
+                        _decode_records(b"".join(d for d, _ in batch), "pending"), "pending"
+                    )
+                except BaseException:
+                    # 파일에 쓰지 않은 요청 -> writer가 segment에 기록하도록 되돌림 (이미 쓴 행은 다음 replay에서 dedup)
+                    self._pending[:0] = batch
+                    self._wakeup.set()
+                    raise
+                _finish(batch)
+            self.degraded = False
+        logger.info(f"[SPOOL] drained, back to direct DB writes (replayed={self.replayed})")
+
+    async def _replay_segment(self, path: str) -> None:
+        raw = await asyncio.to_thread(_read_bytes, path)
+        await self._replay_records(_decode_records(raw, os.path.basename(path)), os.path.basename(path))
+
+    async def _replay_records(self, records: list[tuple[str, dict]], source: str) -> None:
+        for i in range(0, len(records), self.replay_chunk_rows):
+            await self._replay_chunk(records[i : i + self.replay_chunk_rows])
+        logger.info(f"[SPOOL] replayed {len(records)} records from {source}")
+
+    async def _replay_chunk(self, records: list[tuple[str, dict]]) -> None:
+        # DB 장애 오류는 그대로 올려서 segment를 남김 (다음 회차에 처음부터, 이미 쓴 행은 dedup)
+        chunks = [records]
+        while chunks:
+            chunk = chunks.pop(0)
+            try:
+                await self._write_chunk(chunk)
+            except DB_UNAVAILABLE_ERRORS:
+                raise
+            except Exception as e:
+                if len(chunk) > 1:
+                    mid = len(chunk) // 2
+                    chunks[:0] = [chunk[:mid], chunk[mid:]]
+                    continue
+                kind, row = chunk[0]
+                self.dropped += 1
+                logger.error(f"[SPOOL] dropping bad {kind} record (session={row.get('session_id') or row.get('id')}): {e}")
+
+    async def _write_chunk(self, records: list[tuple[str, dict]]) -> None:
+        sessions = [row for kind, row in records if kind == KIND_SESSION]
+        actions = [row for kind, row in records if kind == KIND_ACTION]
+        ends = [row for kind, row in records if kind == KIND_END]
+
+        async with AsyncSessionLocal() as db:
+            if sessions:
+                sessions = await create_sessions_dedup(db, sessions)
+            if actions:
+                actions = await self._dedup_actions(db, actions)
+                actions = await add_action_events_dedup(db, actions, count_new=realtime_metrics.enabled)
+            if ends:
+                await db.execute(SQL_END_SESSION, [{**row, "id": session_id_param(row["id"])} for row in ends])
+            await db.commit()
+        self.replayed += len(records)
+        # 실시간 지표: spool로 넘어간 요청은 여기서 1번만 (중복/세션 없는 action 제외)
+        realtime_metrics.record_written(sessions, actions, ends)
+
+    async def _dedup_actions(self, db: AsyncSession, actions: list[dict]) -> list[dict]:
+        ids = {row["session_id"] for row in actions}
+        alive = await get_existing_session_ids(db, ids, use_cache=False)
+        # 세션이 없는 action (장애 중 존재 확인 없이 받은 잘못된 id) -> FK 오류 대신 버림
+        orphans = [row for row in actions if row["session_id"] not in alive]
+        if orphans:
+            self.orphaned += len(orphans)
+            logger.warning(f"[SPOOL] dropping {len(orphans)} actions for unknown sessions")
+        actions = [row for row in actions if row["session_id"] in alive]
+        if not actions:
+            return []
+
+        res = await db.execute(
+            SQL_ACTION_KEYS_BY_SESSIONS,
+            {"ids": [session_id_param(sid) for sid in {row["session_id"] for row in actions}]},
+        )
+        existing = Counter(
+            (session_id_str(r.session_id), _second(r.occurred_at), r.action_type, r.action_name)
+            for r in res
+        )
+        out = []
+        for row in actions:
+            key = (row["session_id"], _second(row["occurred_at"]), row["action_type"], row["action_name"])
+            if existing[key] > 0:
+                # 이전 replay/timeout 된 요청으로 이미 들어간 행
+                existing[key] -= 1
+                self.deduped += 1
+                continue
+            out.append(row)
+        return out
+
+
+async def _discard(db: AsyncSession) -> None:
+    # timeout으로 중단된 connection은 상태를 알 수 없으므로 pool에 돌려보내지 않음
+    try:
+        await db.invalidate()
+    except Exception:
+        pass
+
+
+def _second(value: datetime) -> datetime:
+    # occurred_at 컬럼은 datetime(0) -> 초 단위 반올림 후 비교
+    value = value.replace(tzinfo=None)
+    rounded = value.replace(microsecond=0)
+    return rounded + timedelta(seconds=1) if value.microsecond >= 500_000 else rounded
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+telemetry_spool = TelemetrySpool(
+    enabled=settings.TELEMETRY_SPOOL_ENABLED,
+    directory=settings.TELEMETRY_SPOOL_DIR,
+    segment_bytes=settings.TELEMETRY_SPOOL_SEGMENT_MB * 1024 * 1024,
+    db_budget_ms=settings.TELEMETRY_DB_BUDGET_MS,
+    replay_interval_sec=settings.TELEMETRY_SPOOL_REPLAY_SEC,
+    replay_chunk_rows=settings.TELEMETRY_SPOOL_REPLAY_CHUNK,
+)
+
+
+def _collect_spool_metrics():
+    st = telemetry_spool.stats()
+    yield ("apphub_telemetry_spool_degraded", "gauge", "1 while telemetry is written to the local spool", [({}, int(st["degraded"]))])
+    yield ("apphub_telemetry_spool_bytes", "gauge", "Bytes waiting in spool segments", [({}, st["bytes"])])
+    yield ("apphub_telemetry_spool_segments", "gauge", "Spool segment files waiting for replay", [({}, st["segments"])])
+    for key in ("spooled", "replayed", "deduped", "orphaned", "dropped"):
+        yield (f"apphub_telemetry_spool_{key}_total", "counter", f"Telemetry records {key} via spool", [({}, st[key])])
+
+
+metrics.add_collector(_collect_spool_metrics)
@@ -1,6 +1,13 @@
+import asyncio
+
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from app.core.cache import TTLCache, register_cache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
 SQL_USER_BY_KNOX = text("""
 SELECT
   u.id,
@@ -18,7 +25,159 @@ WHERE u.knox_id = :knox_id
 LIMIT 1
 """)
 
+SQL_USER_ID_BY_KNOX = text("""
+SELECT id
+FROM users
+WHERE knox_id = :knox_id
+LIMIT 1
+""")
+
+SQL_ALL_USER_IDS = text("""
+SELECT knox_id, id
+FROM users
+""")
+
+# 인증(get_current_user) 전용 캐시: knox_id -> user row
+# - 없는 사용자는 캐시하지 않음 (신규 등록 즉시 반영)
+# - role / is_active 변경 시 invalidate_user_cache() 호출 필요
+_user_cache = register_cache(
+    "user",
+    TTLCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl_sec=settings.USER_CACHE_TTL_SEC),
+)
+
+# 텔레메트리(start_session)용 knox_id -> user_id 캐시 (id 하나만 저장)
+# - 없는 knox_id는 0으로 짧게(KNOX_ID_CACHE_NEGATIVE_TTL_SEC) 캐시
+# - startup 시 + KNOX_ID_CACHE_REWARM_SEC마다 users 전체로 다시 채움 (KNOX_ID_CACHE_WARM, knox_id_warmer)
+_knox_id_cache = register_cache(
+    "knox_user_id",
+    TTLCache(max_size=settings.KNOX_ID_CACHE_MAX_SIZE, ttl_sec=settings.KNOX_ID_CACHE_TTL_SEC),
+)
+
+
 async def get_user_by_knox_id(db: AsyncSession, knox_id: str) -> dict | None:
     res = await db.execute(SQL_USER_BY_KNOX, {"knox_id": knox_id})
     row = res.mappings().first()
     return dict(row) if row else None
+
+
+async def get_user_by_knox_id_cached(db: AsyncSession, knox_id: str) -> dict | None:
+    """캐시 hit이면 DB 조회 없이 반환, miss면 SQL_USER_BY_KNOX 조회 후 캐시"""
+    me = _user_cache.get(knox_id)
+    if me is not None:
+        return dict(me)
+
+    me = await get_user_by_knox_id(db, knox_id)
+    if me:
+        _user_cache.set(knox_id, me)
+        return dict(me)
+    return None
+
+
+async def resolve_user_id(db: AsyncSession, knox_id: str) -> int | None:
+    """knox_id -> user_id (없으면 None), 캐시 miss일 때만 SQL_USER_ID_BY_KNOX 조회"""
+    user_id = _knox_id_cache.get(knox_id)
+    if user_id is not None:
+        return user_id or None
+
+    res = await db.execute(SQL_USER_ID_BY_KNOX, {"knox_id": knox_id})
+    user_id = res.scalar_one_or_none()
+    if user_id is None:
+        _knox_id_cache.set(knox_id, 0, ttl_sec=settings.KNOX_ID_CACHE_NEGATIVE_TTL_SEC)
+        return None
+    _knox_id_cache.set(knox_id, int(user_id))
+    return int(user_id)
+
+
+def cached_user_id(knox_id: str) -> int | None:
+    # DB 조회 없이 캐시만 확인 (DB 장애 중 텔레메트리 경로용)
+    user_id = _knox_id_cache.get(knox_id)
+    if user_id is None:
+        me = _user_cache.get(knox_id)
+        return me["id"] if me is not None else None
+    return user_id or None
+
+
+async def warm_knox_id_cache(db: AsyncSession) -> int:
+    """users 전체로 knox_id -> user_id 캐시 채우기 (max_size까지)"""
+    res = await db.stream(SQL_ALL_USER_IDS)
+    n = 0
+    try:
+        async for knox_id, user_id in res:
+            if n >= _knox_id_cache.max_size:
+                break
+            _knox_id_cache.set(knox_id, int(user_id))
+            n += 1
+    finally:
+        # max_size에서 중간에 멈추면 남은 row를 버리고 cursor 정리 (connection을 pool에 돌려주기 전)
+        await res.close()
+    return n
+
+
+class KnoxIdCacheWarmer:
+    """
+    knox_id -> user_id 캐시 적재 (KNOX_ID_CACHE_WARM=true일 때만)
+    - 기동 시 1회 + interval_sec마다 다시 적재 (TTL보다 짧으면 적재된 항목은 만료 전에 갱신)
+      -> 전날 밤 기동한 프로세스도 아침 실행 몰림 때 캐시가 차 있음
+    - 삭제된 사용자는 다시 채워지지 않으므로 TTL 후 사라짐 (다른 worker에서 삭제해도 최대 TTL)
+    - 실패해도 기동/요청 처리는 계속 (다음 주기에 재시도)
+    """
+
+    def __init__(self, enabled: bool, interval_sec: int):
+        self.enabled = enabled
+        self.interval = interval_sec
+        self._task: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        await self.warm()
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="knox-id-cache-warm")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            if not self._stopping.is_set():
+                await self.warm()
+
+    async def warm(self) -> int | None:
+        try:
+            async with AsyncSessionLocal() as db:
+                n = await warm_knox_id_cache(db)
+            logger.info(f"[CACHE] knox_id -> user_id warmed: {n} users")
+            return n
+        except Exception as e:
+            logger.warning(f"[CACHE] knox_id cache warm-up skipped: {e}")
+            return None
+
+
+knox_id_warmer = KnoxIdCacheWarmer(
+    enabled=settings.KNOX_ID_CACHE_WARM,
+    interval_sec=settings.KNOX_ID_CACHE_REWARM_SEC,
+)
+
+
+def invalidate_user_cache(knox_id: str | None = None) -> None:
+    """knox_id 지정 시 해당 사용자만, None이면 전체 무효화 (knox_id -> user_id 캐시 포함)"""
+    if knox_id is None:
+        _user_cache.clear()
+        _knox_id_cache.clear()
+    else:
+        _user_cache.pop(knox_id)
+        _knox_id_cache.pop(knox_id)
+
+
+def user_cache_stats() -> dict:
+    return _user_cache.stats()
+
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any
+
+import orjson
+
+# keyset(cursor) 페이지네이션용 opaque 토큰
+# - 내용: 마지막 행의 [정렬 키, id] (id 순 목록은 정렬 키 None)
+# - 다음 페이지는 WHERE (정렬 키, id) < (cursor) 로 바로 찾아가므로 OFFSET처럼 앞 행을 버리지 않음
+# - 응답 헤더 X-Next-Cursor로 내려주고, 다음 요청의 ?cursor= 로 받음
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    raw = orjson.dumps([sort_value, row_id])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str | None, *, datetime_sort: bool = False) -> tuple[Any, Any]:
+    """
+    토큰 -> (정렬 키, id), 토큰이 없으면 (None, None)
+    - datetime_sort=True면 정렬 키를 datetime으로 복원
+    - 형식이 잘못되면 ValueError (라우터에서 400)
+    """
+    if not token:
+        return None, None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_value, row_id = orjson.loads(raw)
+        if datetime_sort:
+            sort_value = datetime.fromisoformat(sort_value)
+    except (ValueError, TypeError, orjson.JSONDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+    if row_id is None:
+        raise ValueError("invalid cursor")
+    return sort_value, row_id
+
+
+def next_cursor(rows: list[dict], limit: int, sort_key: str | None = None, id_key: str = "id") -> str | None:
+    # 한 페이지를 꽉 채웠을 때만 다음 cursor (마지막 페이지면 None)
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(last[sort_key] if sort_key else None, last[id_key])
+
+
+def cursor_headers(rows: list[dict], limit: int, sort_key: str | None = None) -> dict[str, str] | None:
+    # Response를 직접 만들어 반환하는 목록용 (다음 페이지가 있으면 X-Next-Cursor)
+    nxt = next_cursor(rows, limit, sort_key=sort_key)
+    return {NEXT_CURSOR_HEADER: nxt} if nxt else None
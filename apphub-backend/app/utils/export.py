@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Literal
+
+import orjson
+
+# export 스트리밍 인코더
+# - 입력: row dict 묶음(chunk)의 async iterator, 출력: 전송할 bytes의 async iterator
+# - chunk 1개씩만 인코딩해서 내보내므로 결과 크기와 무관하게 메모리는 chunk 크기만큼
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _csv_value(v: Any) -> Any:
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, (dict, list)):
+        return orjson.dumps(v).decode()
+    return v
+
+
+async def ndjson_chunks(chunks: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        if rows:
+            yield b"".join(orjson.dumps(r) + b"\n" for r in rows)
+
+
+async def csv_chunks(chunks: AsyncIterator[list[dict]], columns: list[str]) -> AsyncIterator[bytes]:
+    # 첫 chunk에 BOM + header (엑셀에서 한글 깨짐 방지)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")
+    writer.writerow(columns)
+    async for rows in chunks:
+        for r in rows:
+            writer.writerow([_csv_value(r.get(c)) for c in columns])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        # 결과가 0건이어도 header는 보냄
+        yield buf.getvalue().encode()
+
+
+async def gzip_chunks(data: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    # wbits=31: gzip 헤더/트레일러 (파일로 저장하면 그대로 .gz)
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for part in data:
+        out = comp.compress(part)
+        if out:
+            yield out
+    yield comp.flush()
+
+
+def encode_export(
+    chunks: AsyncIterator[list[dict]],
+    fmt: ExportFormat,
+    columns: list[str],
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    body = ndjson_chunks(chunks) if fmt == "ndjson" else csv_chunks(chunks, columns)
+    return gzip_chunks(body) if gzip else body
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import zlib
+from typing import Iterable
+
+# HyperLogLog (고유 사용자 수 근사)
+# - P=12: register 4096개, 표준 오차 약 1.04/sqrt(4096) = 1.6%
+# - 같은 값은 프로세스/서버가 달라도 같은 hash (blake2b 64bit) -> 날짜별 sketch를 합칠 수 있음
+# - 직렬화: 헤더 2byte(version, p) + zlib(register bytes)
+#   하루 사용자가 적을수록 register 대부분이 0이라 수십~수백 byte
+
+P = 12
+M = 1 << P
+_VERSION = 1
+_ALPHA = 0.7213 / (1 + 1.079 / M)
+_POW2_NEG = [2.0 ** -r for r in range(65)]
+
+
+def _hash64(value: int | str) -> int:
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    __slots__ = ("registers",)
+
+    def __init__(self, registers: bytearray | None = None):
+        self.registers = registers if registers is not None else bytearray(M)
+
+    def add(self, value: int | str) -> None:
+        h = _hash64(value)
+        idx = h >> (64 - P)
+        rest = h & ((1 << (64 - P)) - 1)
+        # rest의 leading zero 수 + 1 (64-P bit 기준)
+        rank = (64 - P) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def update(self, values: Iterable[int | str]) -> "HyperLogLog":
+        for v in values:
+            self.add(v)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        # 합집합 = register별 max
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self) -> int:
+        regs = self.registers
+        e = _ALPHA * M * M / sum(_POW2_NEG[r] for r in regs)
+        if e <= 2.5 * M:
+            zeros = regs.count(0)
+            if zeros:
+                # 작은 값 보정 (linear counting)
+                e = M * math.log(M / zeros)
+        return int(round(e))
+
+    def to_bytes(self) -> bytes:
+        return bytes((_VERSION, P)) + zlib.compress(bytes(self.registers), 6)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        if len(data) < 2 or data[0] != _VERSION or data[1] != P:
+            raise ValueError("unsupported HLL sketch format")
+        registers = bytearray(zlib.decompress(data[2:]))
+        if len(registers) != M:
+            raise ValueError("corrupted HLL sketch")
+        return cls(registers)
+
+
+def merge_sketches(sketches: Iterable[bytes | None]) -> HyperLogLog | None:
+    """
+    직렬화된 sketch 여러 개 합치기 (None/빈 값은 건너뜀, 하나도 없으면 None)
+    - register 위치별 max를 map(max, *registers) 한 번으로 계산 (1년치 365개도 100ms 안쪽)
+    """
+    registers = [HyperLogLog.from_bytes(data).registers for data in sketches if data]
+    if not registers:
+        return None
+    if len(registers) == 1:
+        return HyperLogLog(registers[0])
+    return HyperLogLog(bytearray(map(max, *registers)))
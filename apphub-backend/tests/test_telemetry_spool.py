@@ -0,0 +1,69 @@
+"""
+telemetry spool: 쓰기가 계속 들어오는 중에도 replay가 끝나면 direct DB 쓰기로 복귀하는지
+
+    cd apphub-backend && python -m pytest -q tests
+"""
+import asyncio
+import os
+
+# Settings 필수 값 (DB에는 연결하지 않음)
+for key in ("DB_HOST", "DB_USER", "DB_PASSWORD", "DB_NAME"):
+    os.environ.setdefault(key, "test")
+
+from app.services.telemetry_spool import KIND_ACTION, TelemetrySpool  # noqa: E402
+
+
+def _make_spool(root) -> TelemetrySpool:
+    return TelemetrySpool(
+        enabled=True,
+        directory=str(root),
+        segment_bytes=1 << 20,
+        db_budget_ms=300,
+        replay_interval_sec=0.05,
+        replay_chunk_rows=100,
+    )
+
+
+def test_replay_leaves_degraded_mode_under_steady_ingest(tmp_path):
+    async def scenario() -> tuple[bool, list[int], int]:
+        spool = _make_spool(tmp_path)
+        written: list[int] = []
+
+        async def fake_write_chunk(records):
+            await asyncio.sleep(0.005)  # DB 왕복
+            written.extend(row["n"] for _, row in records)
+
+        spool._write_chunk = fake_write_chunk
+        await spool.start()
+        spool.mark_degraded(RuntimeError("db down"))
+
+        sent = 0
+
+        async def direct(n: int) -> None:
+            written.append(n)
+
+        async def ingest(seconds: float) -> None:
+            nonlocal sent
+            loop = asyncio.get_running_loop()
+            until = loop.time() + seconds
+            while loop.time() < until:
+                n = sent
+                sent += 1
+                await spool.run_or_spool(None, [(KIND_ACTION, {"n": n})], lambda n=n: direct(n))
+                await asyncio.sleep(0.001)
+
+        recovered = False
+        task = asyncio.create_task(ingest(3.0))
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if not spool.degraded:
+                recovered = True
+                break
+        await task
+        await spool.stop()
+        return recovered, written, sent
+
+    recovered, written, sent = asyncio.run(scenario())
+    assert recovered, "spool never left degraded mode while writes kept coming"
+    # 모든 요청이 정확히 1번, 받은 순서대로 저장
+    assert written == list(range(sent))